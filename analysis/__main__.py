@@ -0,0 +1,232 @@
+# /// script
+# dependencies = ["matplotlib", "numpy", "pandas", "pyarrow", "scipy"]
+# ///
+import argparse
+import ast
+import hashlib
+import importlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import sys
+import time
+import tomllib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Optional
+
+ANALYSIS_DIR = Path(__file__).parent
+DEFAULT_CONFIG = ANALYSIS_DIR / "figures.toml"
+DEFAULT_STATE = Path("plots") / ".figures.json"
+
+
+def main(argv: Optional[list[str]] = None):
+    # fmt: off
+    parser = argparse.ArgumentParser(description="Build the paper figures in parallel, skipping the ones that are up to date.")
+    parser.add_argument("figures", nargs="*", help="Names of the figures to build. Builds every figure in the config by default.")
+    parser.add_argument("--config", type=Path, default=DEFAULT_CONFIG, help="TOML file listing the script and arguments of each figure.")
+    parser.add_argument("--state_path", type=Path, default=DEFAULT_STATE, help="Where to record the build keys of the last build.")
+    parser.add_argument("--n_workers", type=int, default=os.cpu_count(), help="Number of worker processes.")
+    parser.add_argument("--force", action="store_true", default=False, help="If set, rebuild every figure even if it is up to date.")
+    args = parser.parse_args(argv)
+    # fmt: on
+
+    with open(args.config, "rb") as f:
+        figures: dict[str, dict[str, Any]] = tomllib.load(f)["figures"]
+    unknown = set(args.figures) - set(figures)
+    if unknown:
+        parser.error(f"Unknown figures: {', '.join(sorted(unknown))}")
+    names = args.figures or list(figures)
+
+    state = json.loads(args.state_path.read_text()) if args.state_path.exists() else {}
+    keys = {name: build_key(figures[name]) for name in names}
+    stale = [
+        name
+        for name in names
+        if args.force
+        or state.get(name) != keys[name]
+        or not all(Path(path).exists() for path in figure_outputs(figures[name]))
+    ]
+    for name in names:
+        if name not in stale:
+            print(f"{name:<24} up to date")
+
+    # Import matplotlib and the plotting modules once in the parent, so that
+    # forked workers start with them already loaded
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    modules = sorted({figures[name]["script"] for name in stale})
+    for module in modules:
+        importlib.import_module(f"analysis.{module}")
+    # Parse the leaderboard once too, so that the workers share it instead of
+    # each parsing the CSV and racing to write its snapshot
+    from analysis import utils
+
+    for path in sorted(
+        {p for name in stale for p in leaderboard_inputs(figures[name])}
+    ):
+        try:
+            utils.load_leaderboard(Path(path))
+        except Exception as e:
+            # The figures reading it will fail and report the error themselves
+            print(f"Could not preload {path}: {type(e).__name__}: {e}")
+
+    failed = []
+    start = time.perf_counter()
+    context = multiprocessing.get_context(
+        "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    )
+    n_workers = max(1, min(args.n_workers or 1, len(stale)))
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=context) as executor:
+        futures = {
+            executor.submit(
+                render, figures[name]["script"], figures[name]["args"]
+            ): name
+            for name in stale
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            elapsed, error = future.result()
+            if error:
+                failed.append(name)
+                print(f"{name:<24} FAILED after {elapsed:.2f}s: {error}")
+                state.pop(name, None)
+            else:
+                print(f"{name:<24} rendered in {elapsed:.2f}s")
+                state[name] = keys[name]
+
+    args.state_path.parent.mkdir(parents=True, exist_ok=True)
+    args.state_path.write_text(json.dumps(state, indent=2))
+    print(
+        f"Built {len(stale) - len(failed)} of {len(names)} figures "
+        f"in {time.perf_counter() - start:.2f}s ({len(names) - len(stale)} up to date)"
+    )
+    if failed:
+        sys.exit(1)
+
+
+def render(script: str, argv: list[str]) -> tuple[float, Optional[str]]:
+    """Render one figure in a worker and return its render time and error, if any"""
+    import contextlib
+    import io
+
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    try:
+        for path in figure_outputs({"args": argv}):
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        module = importlib.import_module(f"analysis.{script}")
+        # Keep the figure scripts' tables and logs out of the build output
+        with contextlib.redirect_stdout(io.StringIO()):
+            module.main(argv)
+    except (Exception, SystemExit) as e:  # argparse errors raise SystemExit
+        return time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    finally:
+        plt.close("all")
+    return time.perf_counter() - start, None
+
+
+def build_key(figure: dict[str, Any]) -> str:
+    """Hash the code, arguments and input files of a figure
+
+    The code is the script and every module of `analysis` and `filbench_eval`
+    that it imports, directly or not.
+    """
+    digest = hashlib.sha256()
+    for path in script_sources(figure["script"]):
+        digest.update(str(path.relative_to(path.parents[1])).encode())
+        digest.update(path.read_bytes())
+    digest.update(json.dumps(figure["args"]).encode())
+    for path in figure_inputs(figure):
+        digest.update(path.encode())
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def script_sources(script: str) -> list[Path]:
+    """Find the source files of a script and of the local modules it imports"""
+    seen: dict[str, Path] = {}
+    queue = [f"analysis.{script}"]
+    while queue:
+        name = queue.pop()
+        if name in seen:
+            continue
+        path = _module_path(name)
+        if path is None:
+            continue
+        seen[name] = path
+        # Importing a submodule runs the __init__ of its packages as well
+        parts = name.split(".")
+        queue.extend(".".join(parts[:idx]) for idx in range(1, len(parts)))
+        package = name if path.name == "__init__.py" else name.rpartition(".")[0]
+        tree = ast.parse(path.read_bytes())
+        # Scripts import lazily in `main`, while the lazy imports of library
+        # modules only run for the functions that need them
+        nodes = ast.walk(tree) if name == f"analysis.{script}" else tree.body
+        for node in nodes:
+            if isinstance(node, ast.Import):
+                queue.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    anchor = package.rsplit(".", node.level - 1)[0]
+                    base = f"{anchor}.{base}" if base else anchor
+                # `from package import name` may import a submodule
+                queue.append(base)
+                queue.extend(f"{base}.{alias.name}" for alias in node.names)
+    return [seen[name] for name in sorted(seen)]
+
+
+def _module_path(name: str) -> Optional[Path]:
+    """The source file of a module of `analysis` or `filbench_eval`, if it is one"""
+    package, _, rest = name.partition(".")
+    if package == "analysis":
+        root = ANALYSIS_DIR
+    elif package == "filbench_eval":
+        # Locate the package without importing it
+        spec = importlib.util.find_spec(package)
+        if spec is None or not spec.submodule_search_locations:
+            return None
+        root = Path(spec.submodule_search_locations[0])
+    else:
+        return None
+    path = root.joinpath(*rest.split(".")) if rest else root
+    if (path / "__init__.py").is_file():
+        return path / "__init__.py"
+    if path.with_suffix(".py").is_file():
+        return path.with_suffix(".py")
+    return None
+
+
+def leaderboard_inputs(figure: dict[str, Any]) -> list[str]:
+    """The leaderboard CSV that a figure's script reads with `load_leaderboard`"""
+    script_path = ANALYSIS_DIR / f"{figure['script']}.py"
+    if "load_leaderboard" not in script_path.read_text():
+        return []
+    argv = figure["args"]
+    return [
+        argv[idx + 1]
+        for idx, arg in enumerate(argv[:-1])
+        if arg == "--input_path" and Path(argv[idx + 1]).is_file()
+    ]
+
+
+def figure_outputs(figure: dict[str, Any]) -> list[str]:
+    argv = figure["args"]
+    return [
+        argv[idx + 1] for idx, arg in enumerate(argv[:-1]) if arg == "--output_path"
+    ]
+
+
+def figure_inputs(figure: dict[str, Any]) -> list[str]:
+    outputs = set(figure_outputs(figure))
+    return [
+        arg
+        for arg in figure["args"]
+        if not arg.startswith("--") and arg not in outputs and Path(arg).is_file()
+    ]
+
+
+if __name__ == "__main__":
+    main()
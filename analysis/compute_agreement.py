@@ -2,7 +2,6 @@
 # dependencies = [
 #   "pandas",
 #   "scipy",
-#   "statsmodels",
 # ]
 # ///
 
@@ -10,18 +9,20 @@ import argparse
 import random
 from ast import literal_eval
 from pathlib import Path
+from typing import Optional
 
 import numpy as np
 import pandas as pd
-from rouge_score import rouge_scorer
-from statsmodels.stats.inter_rater import fleiss_kappa
 
+from filbench_eval.agreement import category_counts, fleiss_kappa
+from filbench_eval.rouge import RougeLScorer
 
-def main():
+
+def main(argv: Optional[list[str]] = None):
     # fmt: off
     parser = argparse.ArgumentParser(description="Compute human annotation IAA and gold-reference IAA")
     parser.add_argument("--input_path", type=Path, help="Path to the annotations file.")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     # fmt: on
 
     # Load annotations and fix some typings for consistency
@@ -54,15 +55,11 @@ def main():
 
     # Compute IAA for MCF (Inter-annotator)
     annotator_columns = ["annotator_1", "annotator_2", "annotator_3"]
-    unique_categories = sorted(set(mcf_df[annotator_columns].values.flatten()))
-    kappa_matrix = []
-    for _, row in mcf_df.iterrows():
-        # Count the number of times each category is assigned by the annotators
-        category_counts = [0] * len(unique_categories)
-        for annotator in annotator_columns:
-            category_index = unique_categories.index(row[annotator])
-            category_counts[category_index] += 1
-        kappa_matrix.append(category_counts)
+    unique_categories = np.unique(mcf_df[annotator_columns].to_numpy())
+    # Count the number of times each category is assigned by the annotators
+    kappa_matrix = category_counts(
+        mcf_df[annotator_columns].to_numpy(), categories=unique_categories
+    )
     kappa_score = fleiss_kappa(kappa_matrix)
     print(f"Intra-annotator Fleiss' Kappa for MCF tasks: {kappa_score:.4f}")
 
@@ -84,15 +81,11 @@ def main():
     mcf_df["majority_response"] = mcf_df.apply(majority_vote_or_random, axis=1)
 
     # Prepare data for Fleiss' Kappa computation
-    kappa_matrix_gold = []
-    for _, row in mcf_df.iterrows():
-        # Count the number of times each category is assigned by the majority response and gold answer
-        category_counts = [0] * len(unique_categories)
-        majority_index = unique_categories.index(row["majority_response"])
-        gold_index = unique_categories.index(row["gold_answer"])
-        category_counts[majority_index] += 1
-        category_counts[gold_index] += 1
-        kappa_matrix_gold.append(category_counts)
+    # Count the number of times each category is assigned by the majority response and gold answer
+    kappa_matrix_gold = category_counts(
+        mcf_df[["majority_response", "gold_answer"]].to_numpy(),
+        categories=unique_categories,
+    )
 
     # Compute Fleiss' Kappa between majority response and gold_answer
     kappa_score_gold = fleiss_kappa(kappa_matrix_gold)
@@ -100,17 +93,18 @@ def main():
     print("\n")
 
     # Compute ROUGE-L
-    scorer = rouge_scorer.RougeScorer(["rougeL"], use_stemmer=True)
+    scorer = RougeLScorer(use_stemmer=True)
     annotator_pairs = [
         ("annotator_1", "annotator_2"),
         ("annotator_1", "annotator_3"),
         ("annotator_2", "annotator_3"),
     ]
-    rouge_l_scores = {pair: [] for pair in annotator_pairs}
-    for _, row in gen_df.iterrows():
-        for annotator1, annotator2 in annotator_pairs:
-            score = scorer.score(row[annotator1], row[annotator2])
-            rouge_l_scores[(annotator1, annotator2)].append(score["rougeL"].fmeasure)
+    rouge_l_scores = {
+        (annotator1, annotator2): scorer.score(
+            gen_df[annotator1].tolist(), gen_df[annotator2].tolist()
+        )
+        for annotator1, annotator2 in annotator_pairs
+    }
     all_average_rouge_l_scores = [np.mean(scores) for scores in rouge_l_scores.values()]
     overall_average_rouge_l = np.mean(all_average_rouge_l_scores)
     print(
@@ -118,14 +112,13 @@ def main():
     )
 
     # Compute ROUGE-L between gold_answer and each annotator, then average
-    inter_rouge_l_scores = []
-    for _, row in mcf_df.iterrows():
-        scores = []
-        for annotator in annotator_columns:
-            score = scorer.score(row["gold_answer"], row[annotator])
-            scores.append(score["rougeL"].fmeasure)
-        average_score = np.mean(scores)
-        inter_rouge_l_scores.append(average_score)
+    inter_rouge_l_scores = np.mean(
+        [
+            scorer.score(mcf_df["gold_answer"].tolist(), mcf_df[annotator].tolist())
+            for annotator in annotator_columns
+        ],
+        axis=0,
+    )
 
     # Average the ROUGE-L scores across all instances
     overall_inter_rouge_l = np.mean(inter_rouge_l_scores)
@@ -1,18 +1,21 @@
 # /// script
-# dependencies = ["matplotlib", "pandas", "scipy", "statsmodels", "datasets"]
+# dependencies = ["matplotlib", "pandas", "scipy", "datasets"]
 # ///
 import argparse
-import hashlib
-from functools import reduce
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
-import numpy as np
 import pandas as pd
-from datasets import load_dataset
-from statsmodels.stats.inter_rater import fleiss_kappa
 
 from analysis.utils import TASK_SET
+from filbench_eval.agreement import category_counts, fleiss_kappa_batch
+from filbench_eval.cache import DEFAULT_CACHE_DIR
+from filbench_eval.predictions import (
+    PredictionsCache,
+    build_prediction_tables,
+    load_mcf_predictions,
+    load_prompt_texts,
+)
 
 MODEL_SET = {
     "sea": [
@@ -34,51 +37,51 @@ MODEL_SET = {
 }
 
 
-def format_model(model_name: str) -> str:
-    return model_name.replace("/", "__")
-
-
-def format_task(task_name: str) -> str:
-    return task_name.replace("|", "_")
-
-
-def main():
+def main(argv: Optional[list[str]] = None):
     # fmt: off
     parser = argparse.ArgumentParser(description="Check agreement and plot.")
     parser.add_argument("--model_set", type=str, choices=list(MODEL_SET.keys()), default="sea", help="Model set to check agreement on.")
     parser.add_argument("--output_dir", default=None, help="Where to store results as CSV files")
     parser.add_argument("--task_set", type=str, choices=list(TASK_SET.keys()), default="text-classification", help="Task set to check model agreement on.")
     parser.add_argument("--num_samples", type=int, default=-1, help="If set to > 0, will sample instances (good for testing).")
-    args = parser.parse_args()
+    parser.add_argument("--n_workers", type=int, default=8, help="Number of concurrent downloads.")
+    parser.add_argument("--cache_dir", type=Path, default=DEFAULT_CACHE_DIR / "predictions", help="Where to cache the downloaded predictions.")
+    parser.add_argument("--refresh", action="store_true", default=False, help="Download the predictions again even if they are cached.")
+    args = parser.parse_args(argv)
     # fmt: on
 
     model_names = MODEL_SET[args.model_set]
     task_names = TASK_SET[args.task_set]
 
-    task_model_results = get_task_model_results(model_names, task_names)
-    task_agreement_table = combine_model_results(task_model_results)
+    cache = PredictionsCache(args.cache_dir)
+    task_model_results = load_mcf_predictions(
+        model_names,
+        task_names,
+        cache=cache,
+        n_workers=args.n_workers,
+        refresh=args.refresh,
+    )
+    # The prompt texts are only needed for the CSV files
+    texts = load_prompt_texts(task_names, cache) if args.output_dir else None
+    task_prediction_table = build_prediction_tables(task_model_results, texts)
     if args.output_dir:
         print(f"Saving agreement results to {args.output_dir}")
         output_dir = Path(args.output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
-        for task, table in task_agreement_table.items():
+        for task, table in task_prediction_table.items():
             output_path = output_dir / f"{task.replace('|', '_')}.csv"
-            table.to_csv(output_path, index=False)
+            table.to_frame().to_csv(output_path, index=False)
             print(f"Saved to {output_path}")
 
-    task_fleiss_kappa: dict[str, Union[str, int, float]] = [
+    kappas = fleiss_kappa_batch(
         {
-            "task": task,
-            "n_samples": len(agreement_table),
-            "fleiss_kappa": fleiss_kappa(
-                prepare_data_for_fleiss_kappa(
-                    agreement_table.drop(
-                        columns=["prompt_hash", "instruction", "example", "gold"]
-                    )
-                )
-            ),
+            task: category_counts(table.predictions.T)
+            for task, table in task_prediction_table.items()
         }
-        for task, agreement_table in task_agreement_table.items()
+    )
+    task_fleiss_kappa: list[dict[str, Union[str, int, float]]] = [
+        {"task": task, "n_samples": len(table), "fleiss_kappa": kappas[task]}
+        for task, table in task_prediction_table.items()
     ]
     kappa_df = pd.DataFrame(task_fleiss_kappa)
     # fmt: off
@@ -87,122 +90,5 @@ def main():
     print(f"Weighted average: {weighted_avg}")
 
 
-def get_task_model_results(
-    model_names: list[str], task_names: list[str]
-) -> dict[str, dict[str, pd.DataFrame]]:
-    task_model_results: dict[str, dict[str, pd.DataFrame]] = {}
-    for task in task_names:
-        task_model_results[task] = {}
-        for model in model_names:
-            results_ds_name = f"filbench/details_{format_model(model)}_private"
-            print(f"Loading results for {model} ({task})...")
-            # fmt: off
-            df = load_dataset(results_ds_name, format_task(task), split="latest").to_pandas()
-            df["prompt_hash"] = df["example"].apply(lambda x: hashlib.sha256(x.encode()).hexdigest())
-            df["mcf_predictions"] = df["predictions"].apply(lambda x: np.argmax([bool(idx[1]) for idx in x]))
-            df["gold"] = df["gold_index"].apply(lambda x: int(x[0]))
-            # fmt: on
-            df = df[
-                [
-                    "prompt_hash",
-                    "instruction",
-                    "example",
-                    "mcf_predictions",
-                    "gold",
-                ]
-            ]
-
-            task_model_results[task][model] = df
-    return task_model_results
-
-
-def combine_model_results(
-    task_model_results: dict[str, dict[str, pd.DataFrame]],
-) -> dict[str, pd.DataFrame]:
-    combined_results = {}
-
-    # Process each task separately
-    for task, model_dfs in task_model_results.items():
-        if not model_dfs:
-            continue
-
-        # Find common prompt_hashes across all models for this task
-        prompt_hash_sets = []
-        for model, df in model_dfs.items():
-            if "prompt_hash" in df.columns:
-                prompt_hash_sets.append(set(df["prompt_hash"]))
-
-        # Get intersection of prompt_hashes if there are any models
-        if prompt_hash_sets:
-            common_prompt_hashes = reduce(
-                lambda x, y: x.intersection(y), prompt_hash_sets
-            )
-        else:
-            continue
-
-        # Filter each model's DataFrame to only include common prompt_hashes
-        # and select only necessary columns
-        filtered_dfs = {}
-        for model, df in model_dfs.items():
-            if "prompt_hash" in df.columns:
-                filtered_df = df[df["prompt_hash"].isin(common_prompt_hashes)].copy()
-
-                # Keep only needed columns
-                cols_to_keep = ["prompt_hash", "instruction", "example", "gold"]
-                if "mcf_predictions" in filtered_df.columns:
-                    cols_to_keep.append("mcf_predictions")
-
-                # Only keep columns that exist in the DataFrame
-                valid_cols = [col for col in cols_to_keep if col in filtered_df.columns]
-                filtered_df = filtered_df[valid_cols]
-
-                # Rename mcf_predictions column to model name
-                if "mcf_predictions" in filtered_df.columns:
-                    filtered_df = filtered_df.rename(columns={"mcf_predictions": model})
-
-                filtered_dfs[model] = filtered_df
-
-        # Merge all DataFrames for this task
-        if filtered_dfs:
-            # Start with the first DataFrame as base
-            base_model = next(iter(filtered_dfs))
-            result_df = filtered_dfs[base_model].copy()
-
-            # Merge with other models' DataFrames
-            for model, df in filtered_dfs.items():
-                if model != base_model:
-                    # Only merge the model column (renamed from mcf_predictions)
-                    if model in df.columns:
-                        merge_cols = ["prompt_hash"]
-                        result_df = pd.merge(
-                            result_df,
-                            df[merge_cols + [model]],
-                            on=merge_cols,
-                            how="inner",
-                        )
-
-            combined_results[task] = result_df
-
-    return combined_results
-
-
-def prepare_data_for_fleiss_kappa(df):
-    """
-    Convert a dataframe of model predictions to the format required by statsmodels.
-    """
-    n_categories = len(np.unique(df.values))
-    n_samples = df.shape[0]
-
-    # Initialize the table
-    table = np.zeros((n_samples, n_categories))
-
-    # Fill the table with counts
-    for i in range(n_samples):
-        for category in range(n_categories):
-            table[i, category] = (df.iloc[i, :] == category).sum()
-
-    return table
-
-
 if __name__ == "__main__":
     main()
@@ -1,26 +1,26 @@
 # /// script
-# dependencies = ["matplotlib", "numpy", "pandas"]
+# dependencies = ["matplotlib", "numpy", "pandas", "pyarrow"]
 # ///
 import argparse
 from pathlib import Path
+from typing import Optional
 
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 
-from analysis.utils import COLORS, PLOT_PARAMS
+from analysis.utils import COLORS, PLOT_PARAMS, load_leaderboard
 
 plt.rcParams.update(PLOT_PARAMS)
 
 
-def main():
+def main(argv: Optional[list[str]] = None):
     # fmt: off
     parser = argparse.ArgumentParser(description="Plot impact of LM size.")
     parser.add_argument("--input_path", type=Path, help="Path to the leaderboard results.")
     parser.add_argument("--output_path", type=Path, default="plots/continuous_ft.pdf", help="Path to save the results.")
     parser.add_argument("--figsize", type=int, nargs=2, default=[6, 6], help="Matplotlib figure size.")
     parser.add_argument("--svg", action="store_true", default=False, help="If set, will also save an SVG version.")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     # fmt: on
 
     models = [
@@ -32,10 +32,9 @@ def main():
         "meta-llama/Llama-3.1-8B-Instruct",
     ]
 
-    df = pd.read_csv(args.input_path)
-    df = df[df["Incomplete"]]  # It is inversed because of how toggle works in Gradio
-    df = df[df["# Parameters"] != -1]  # Only keep models where # Parameters != -1
-    df = df[["Model", "Average"]]
+    df = load_leaderboard(
+        args.input_path, columns=["Model", "Average"], known_params=True
+    )
     df = df[df["Model"].isin(models)]
     df = df.reset_index(drop=True)
 
@@ -3,6 +3,7 @@
 # ///
 import argparse
 from pathlib import Path
+from typing import Optional
 
 import matplotlib.pyplot as plt
 
@@ -51,13 +52,13 @@ GENERATION_RESULTS = {
 }
 
 
-def main():
+def main(argv: Optional[list[str]] = None):
     # fmt: off
     parser = argparse.ArgumentParser(description="Plot k-shot generation results.")
     parser.add_argument("--output_path", type=Path, default="plots/generation_results.pdf", help="Path to save the results.")
     parser.add_argument("--figsize", type=int, nargs=2, default=[6, 8], help="Matplotlib figure size.")
     parser.add_argument("--svg", action="store_true", default=False, help="If set, will also save an SVG version.")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     # fmt: on
 
     fig, ax = plt.subplots(figsize=args.figsize)
@@ -1,19 +1,19 @@
 # /// script
-# dependencies = ["matplotlib", "pandas", "scipy"]
+# dependencies = ["matplotlib", "pandas", "pyarrow", "scipy"]
 # ///
 import argparse
 from pathlib import Path
+from typing import Optional
 
 import matplotlib.pyplot as plt
-import pandas as pd
 from scipy.stats import spearmanr
 
-from analysis.utils import COLORS, PLOT_PARAMS
+from analysis.utils import COLORS, PLOT_PARAMS, load_leaderboard
 
 plt.rcParams.update(PLOT_PARAMS)
 
 
-def main():
+def main(argv: Optional[list[str]] = None):
     # fmt: off
     parser = argparse.ArgumentParser(description="Plot impact of LM size.")
     parser.add_argument("--input_path", type=Path, help="Path to the leaderboard results.")
@@ -21,15 +21,15 @@ def main():
     parser.add_argument("--max_params", type=int, default=400, help="Set the maximum param size to show in graph.")
     parser.add_argument("--figsize", type=int, nargs=2, default=[6, 6], help="Matplotlib figure size.")
     parser.add_argument("--svg", action="store_true", default=False, help="If set, will also save an SVG version.")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     # fmt: on
 
-    df = pd.read_csv(args.input_path)
-    df = df[df["Incomplete"]]  # It is inversed because of how toggle works in Gradio
-    df = df[df["# Parameters"] != -1]  # Only keep models where # Parameters != -1
-    df = df[["Model", "Average", "# Parameters", "Multilingual"]]
-    df = df[df["# Parameters"] <= args.max_params]
-    df = df.reset_index(drop=True)
+    df = load_leaderboard(
+        args.input_path,
+        columns=["Model", "Average", "# Parameters", "Multilingual"],
+        known_params=True,
+        max_params=args.max_params,
+    )
     rho, p_value = spearmanr(df["Average"], df["# Parameters"])
     print(f"Spearman rho: {rho}, p-value: {p_value:.4f}")  # Significant if p < 0.05
 
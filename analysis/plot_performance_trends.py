@@ -1,30 +1,35 @@
 # /// script
-# dependencies = ["pandas", "numpy", "matplotlib"]
+# dependencies = ["pandas", "pyarrow", "numpy", "matplotlib"]
 # ///
 import argparse
 from pathlib import Path
+from typing import Optional
 
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 
-from analysis.utils import CATEGORY_2_CODE, CATEGORY_COLORS, COLORS, PLOT_PARAMS
+from analysis.utils import (
+    CATEGORY_2_CODE,
+    CATEGORY_COLORS,
+    COLORS,
+    PLOT_PARAMS,
+    load_leaderboard,
+)
 
 plt.rcParams.update(PLOT_PARAMS)
 
 
-def main():
+def main(argv: Optional[list[str]] = None):
     # fmt: off
     parser = argparse.ArgumentParser(description="Plot performance trends")
     parser.add_argument("--input_path", type=Path, help="Path to the leaderboard results.")
     parser.add_argument("--output_path", type=Path, default="plots/performance_trends.pdf", help="Path to save the results.")
     parser.add_argument("--figsize", type=int, nargs=2, default=[14, 7], help="Matplotlib figure size.")
     parser.add_argument("--svg", action="store_true", default=False, help="If set, will also save an SVG version.")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     # fmt: on
 
-    df = pd.read_csv(args.input_path)
-    df = df[df["Incomplete"]]  # It is inversed because of how toggle works in Gradio
+    df = load_leaderboard(args.input_path)
     df = df[
         [
             "Model",
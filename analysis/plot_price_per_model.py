@@ -1,19 +1,20 @@
 # /// script
-# dependencies = ["pandas", "matplotlib"]
+# dependencies = ["pandas", "pyarrow", "matplotlib"]
 # ///
 
 import argparse
 from pathlib import Path
+from typing import Optional
 
 import matplotlib.pyplot as plt
 import pandas as pd
 
-from analysis.utils import COLORS, PLOT_PARAMS
+from analysis.utils import COLORS, PLOT_PARAMS, load_leaderboard
 
 plt.rcParams.update(PLOT_PARAMS)
 
 
-def main():
+def main(argv: Optional[list[str]] = None):
     # fmt: off
     parser = argparse.ArgumentParser(description="Plot cost-efficiency chart.")
     parser.add_argument("--input_path", type=Path, help="Path to the leaderboard results.")
@@ -21,13 +22,12 @@ def main():
     parser.add_argument("--output_path", type=Path, default="plots/price_per_model.pdf", help="Path to save the results.")
     parser.add_argument("--figsize", type=int, nargs=2, default=[6, 6], help="Matplotlib figure size.")
     parser.add_argument("--svg", action="store_true", default=False, help="If set, will also save an SVG version.")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     # fmt: on
 
-    scores_df = pd.read_csv(args.input_path)
-    scores_df = scores_df[scores_df["Incomplete"]]
-    scores_df = scores_df[["Model", "Average", "# Parameters", "Multilingual"]]
-    scores_df = scores_df.reset_index(drop=True)
+    scores_df = load_leaderboard(
+        args.input_path, columns=["Model", "Average", "# Parameters", "Multilingual"]
+    )
     price_df = pd.read_csv(args.cost_data)
     df = price_df.merge(scores_df, on="Model", how="left")
     df = df.sort_values(by=["Average"], ascending=False).reset_index(drop=True)
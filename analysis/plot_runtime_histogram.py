@@ -4,48 +4,68 @@
 
 import argparse
 from pathlib import Path
+from typing import Optional
 
 import matplotlib.pyplot as plt
 import numpy as np
 
 from analysis.utils import COLORS, PLOT_PARAMS
+from filbench_eval.runtimes import RuntimeHistory, throughput_stats
 
 plt.rcParams.update(PLOT_PARAMS)
 
+# Runtimes of a single run of each task, reported in the paper
+PAPER_RUNTIME_IN_MIN = {
+    "balita_tgl_mcf": 88,
+    "belebele_ceb_mcf": 7 + 56 / 60,
+    "belebele_fil_mcf": 8,
+    "cebuaner_ceb_mcf": 7 + 10 / 60,
+    "dengue_filipino_fil": 11 + 10 / 60,
+    "firecs_fil_mcf": 9 + 44 / 60,
+    "global_mmlu_all_tgl_mcf": 26 + 57 / 60,
+    "include_tgl_mcf": 6 + 29 / 60,
+    "newsphnli_fil_mcf": 46 + 38 / 60,
+    "ntrex128_fil": 9 + 49 / 60,
+    "sib200_ceb_mcf": 6 + 21 / 60,
+    "sib200_tgl_mcf": 5 + 55 / 60,
+    "stingraybench_tgl_mcf": 6 + 17 / 60,
+    "tatoeba_ceb": 6 + 34 / 60,
+    "tatoeba_tgl": 7 + 24 / 60,
+    "tico19_tgl": 8 + 16 / 60,
+    "tlunifiedner_tgl_mcf": 6 + 43 / 60,
+    "universalner_tgl_mcf": 6 + 16 / 60,
+    "universalner_ceb_mcf": 5 + 52 / 60,
+    "kalahi_tgl_mcf": 7,
+    "readability_ceb_mcf": 7 + 28 / 60,
+}
 
-def main():
+
+def main(argv: Optional[list[str]] = None):
     # fmt: off
     parser = argparse.ArgumentParser(description="Plot performance trends")
     parser.add_argument("--output_path", type=Path, default="plots/runtime_histogram.pdf", help="Path to save the results.")
+    parser.add_argument("--history", type=Path, default=None, help="Runtime history from `filbench collect-runtimes`. Uses the runtimes of the paper's run if not set.")
+    parser.add_argument("--model", type=str, default=None, help="Only use the runs of this model from the runtime history.")
+    parser.add_argument("--include_apportioned", action="store_true", default=False, help="If set, also use runs that evaluated several tasks, whose wall time is split between the tasks.")
     parser.add_argument("--bins", type=int, default=10, help="Number of bins in the histogram")
     parser.add_argument("--figsize", type=int, nargs=2, default=[6, 6], help="Matplotlib figure size.")
     parser.add_argument("--svg", action="store_true", default=False, help="If set, will also save an SVG version.")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     # fmt: on
 
-    runtime_in_min = {
-        "balita_tgl_mcf": 88,
-        "belebele_ceb_mcf": 7 + 56 / 60,
-        "belebele_fil_mcf": 8,
-        "cebuaner_ceb_mcf": 7 + 10 / 60,
-        "dengue_filipino_fil": 11 + 10 / 60,
-        "firecs_fil_mcf": 9 + 44 / 60,
-        "global_mmlu_all_tgl_mcf": 26 + 57 / 60,
-        "include_tgl_mcf": 6 + 29 / 60,
-        "newsphnli_fil_mcf": 46 + 38 / 60,
-        "ntrex128_fil": 9 + 49 / 60,
-        "sib200_ceb_mcf": 6 + 21 / 60,
-        "sib200_tgl_mcf": 5 + 55 / 60,
-        "stingraybench_tgl_mcf": 6 + 17 / 60,
-        "tatoeba_ceb": 6 + 34 / 60,
-        "tatoeba_tgl": 7 + 24 / 60,
-        "tico19_tgl": 8 + 16 / 60,
-        "tlunifiedner_tgl_mcf": 6 + 43 / 60,
-        "universalner_tgl_mcf": 6 + 16 / 60,
-        "universalner_ceb_mcf": 5 + 52 / 60,
-        "kalahi_tgl_mcf": 7,
-        "readability_ceb_mcf": 7 + 28 / 60,
-    }
+    if args.history:
+        stats = throughput_stats(
+            RuntimeHistory(args.history).records(),
+            model=args.model,
+            include_apportioned=args.include_apportioned,
+        )
+        if not stats:
+            parser.error(f"No measured runtimes in {args.history}")
+        runtime_in_min = {
+            task: stat.median_seconds / 60 for task, stat in stats.items()
+        }
+    else:
+        runtime_in_min = PAPER_RUNTIME_IN_MIN
 
     fig, ax = plt.subplots(figsize=args.figsize)
     runtimes = list(runtime_in_min.values())
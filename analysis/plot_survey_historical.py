@@ -4,6 +4,7 @@
 
 import argparse
 from pathlib import Path
+from typing import Optional
 
 import matplotlib.pyplot as plt
 import pandas as pd
@@ -13,7 +14,7 @@ from analysis.utils import PLOT_PARAMS
 plt.rcParams.update(PLOT_PARAMS)
 
 
-def main():
+def main(argv: Optional[list[str]] = None):
     # fmt: off
     parser = argparse.ArgumentParser(description="Plot paper data through the years.")
     parser.add_argument("--input_path", type=Path, help="Path to the paper annotations file.")
@@ -21,7 +22,7 @@ def main():
     parser.add_argument("--aggregate", action="store_true", default=False, help="If set, do some aggregation.")
     parser.add_argument("--figsize", type=int, nargs=2, default=[10, 6], help="Matplotlib figure size.")
     parser.add_argument("--svg", action="store_true", default=False, help="If set, will also save an SVG version.")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     # fmt: on
 
     df = pd.read_csv(args.input_path, skiprows=1)
@@ -1,26 +1,25 @@
 # /// script
-# dependencies = ["pandas"]
+# dependencies = ["pandas", "pyarrow"]
 # ///
 
 import argparse
 from pathlib import Path
+from typing import Optional
 
-import pandas as pd
+from analysis.utils import load_leaderboard
 
 
-def main():
+def main(argv: Optional[list[str]] = None):
     # fmt: off
     parser = argparse.ArgumentParser(description="Print leaderboard LaTeX.")
     parser.add_argument("--input_path", type=Path, help="Path to the leaderboard results.")
     parser.add_argument("--max_params", type=int, default=400, help="Set the maximum param size to show in graph.")
     parser.add_argument("--top_n", type=int, default=None, help="Print only top n results.")
     parser.add_argument("--aggregate", action="store_true", help="If set, will only show the aggregate results.")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     # fmt: on
 
-    df = pd.read_csv(args.input_path)
-    df = df[df["Incomplete"]]  # It is inversed because of how toggle works in Gradio
-    df = df[df["# Parameters"] <= args.max_params]
+    df = load_leaderboard(args.input_path, max_params=args.max_params)
 
     if args.top_n:
         df = df.head(args.top_n)
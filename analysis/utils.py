@@ -1,3 +1,11 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
 FONT_SIZES = {"small": 14, "medium": 18, "large": 24}
 
 PLOT_PARAMS = {
@@ -136,3 +144,107 @@ TASK_SET = {
     ],
     "nli": ["filbench|newsphnli_fil_mcf|0"],
 }
+
+# Columns of the leaderboard CSV that are always stored as text
+LEADERBOARD_TEXT_COLUMNS = ["Model", "Multilingual"]
+# In-process cache of parsed leaderboards, keyed by (path, mtime_ns, size)
+_LEADERBOARDS: dict[tuple[str, int, int], pd.DataFrame] = {}
+
+
+def load_leaderboard(
+    input_path: Path,
+    columns: Optional[list[str]] = None,
+    known_params: bool = False,
+    max_params: Optional[float] = None,
+) -> pd.DataFrame:
+    """Load the complete results of the leaderboard CSV
+
+    The CSV is parsed once into a normalized Parquet snapshot next to it
+    (.<name>.snapshot.parquet), which later runs read instead. The snapshot is
+    reused while the CSV's mtime and size are unchanged, or if its contents
+    hash to the same value, and parsed tables are also kept in memory so that
+    scripts run in the same process share them.
+
+    input_path (Path): path to the leaderboard CSV.
+    columns (Optional[list[str]]): if set, only keep these columns.
+    known_params (bool): only keep models with a known number of parameters.
+    max_params (Optional[float]): only keep models with at most this many parameters (in billions).
+    RETURNS (pd.DataFrame): the leaderboard rows, in the order of the CSV.
+    """
+    df = _leaderboard_snapshot(Path(input_path))
+    df = df[df["Incomplete"]]  # It is inversed because of how toggle works in Gradio
+    if known_params:
+        df = df[df["# Parameters"] != -1]
+    if max_params is not None:
+        df = df[df["# Parameters"] <= max_params]
+    if columns:
+        df = df[columns]
+    return df.reset_index(drop=True)
+
+
+def _leaderboard_snapshot(input_path: Path) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    stat = input_path.stat()
+    key = (str(input_path.resolve()), stat.st_mtime_ns, stat.st_size)
+    if key in _LEADERBOARDS:
+        return _LEADERBOARDS[key]
+
+    snapshot_path = input_path.with_name(f".{input_path.name}.snapshot.parquet")
+    signature = {
+        b"mtime_ns": str(stat.st_mtime_ns).encode(),
+        b"size": str(stat.st_size).encode(),
+    }
+    table = None
+    if snapshot_path.exists():
+        table = pq.read_table(snapshot_path)
+        metadata = table.schema.metadata or {}
+        if any(metadata.get(field) != value for field, value in signature.items()):
+            # Touched but maybe not changed (e.g., after a checkout): compare contents
+            digest = hashlib.sha256(input_path.read_bytes()).hexdigest().encode()
+            table = table if metadata.get(b"sha256") == digest else None
+            if table is not None:
+                table = table.replace_schema_metadata({**metadata, **signature})
+                _write_snapshot(table, snapshot_path)
+
+    if table is None:
+        df = _normalize_leaderboard(pd.read_csv(input_path))
+        digest = hashlib.sha256(input_path.read_bytes()).hexdigest().encode()
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), **signature, b"sha256": digest}
+        )
+        _write_snapshot(table, snapshot_path)
+
+    _LEADERBOARDS[key] = table.to_pandas()
+    return _LEADERBOARDS[key]
+
+
+def _normalize_leaderboard(df: pd.DataFrame) -> pd.DataFrame:
+    # Numeric columns keep the dtypes inferred by read_csv (e.g., int64 stays int64)
+    df = df.copy()
+    df["Incomplete"] = df["Incomplete"].astype(str).str.strip().str.lower() == "true"
+    for col in df.columns:
+        if col in LEADERBOARD_TEXT_COLUMNS or df[col].dtype == object:
+            df[col] = df[col].astype("string")
+    return df
+
+
+def _write_snapshot(table, path: Path):
+    # The snapshot only saves parsing time, so a read-only directory isn't an error
+    import pyarrow.parquet as pq
+
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    except OSError:
+        return
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
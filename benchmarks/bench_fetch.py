@@ -0,0 +1,95 @@
+# /// script
+# dependencies = ["aiohttp", "pytest", "rich"]
+# ///
+"""Measure the HTTP fetch path of results files against a local mock Hub.
+
+The mock Hub of the test suite (tests/conftest.py) serves synthetic lighteval
+details datasets (results files among many details files) through the two
+endpoints the fetcher uses, with ETags and 304 Not Modified responses, and an
+artificial round-trip delay per request. Each phase checks that the fetched
+results match the synthetic runs.
+Run from the root directory:
+
+    python benchmarks/bench_fetch.py --num_models 50 --latency_ms 50
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from filbench_eval.compute_score import merge_runs
+from filbench_eval.fetch import HubFetcher
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "tests"))
+from conftest import MockHub  # noqa: E402
+
+
+def main():
+    # fmt: off
+    parser = argparse.ArgumentParser(description="Benchmark fetching results files over HTTP.")
+    parser.add_argument("--num_models", type=int, default=50, help="Number of synthetic models.")
+    parser.add_argument("--num_runs", type=int, default=12, help="Number of lighteval runs per model.")
+    parser.add_argument("--latency_ms", type=float, default=50.0, help="Round-trip delay of each mock Hub request, in milliseconds.")
+    parser.add_argument("--max_connections", type=int, default=16, help="Maximum number of concurrent connections.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic runs.")
+    args = parser.parse_args()
+    # fmt: on
+
+    rng = random.Random(args.seed)
+    hub = MockHub(args.latency_ms)
+    models = [f"org/details_model_{i}" for i in range(args.num_models)]
+    for model in models:
+        for idx in range(args.num_runs):
+            hub.add_run(rng, model, idx)
+    endpoint = hub.start()
+
+    cache_dir = None  # cache of the last cold phase, reused by the warm phases
+    phases = [
+        ("cold, 1 connection", 1, None),
+        (f"cold, {args.max_connections} connections", args.max_connections, None),
+        ("warm, unchanged", args.max_connections, None),
+        ("warm, new run in 10% of models", args.max_connections, 0.1),
+    ]
+    table = Table(title="Fetching results files from a mock Hub")
+    table.add_column("Phase", justify="left", style="cyan")
+    table.add_column("Wall time (s)", justify="right", style="magenta")
+    table.add_column("Requests/model", justify="right")
+    table.add_column("304s", justify="right")
+    table.add_column("KB/model", justify="right")
+    for name, max_connections, new_fraction in phases:
+        if new_fraction:
+            for model in rng.sample(models, k=max(1, int(new_fraction * len(models)))):
+                hub.add_run(rng, model, args.num_runs)
+        cold = name.startswith("cold")
+        cache = Path(tempfile.mkdtemp()) if cold else cache_dir
+        fetcher = HubFetcher(
+            endpoint=endpoint, max_connections=max_connections, cache_dir=cache
+        )
+        start = time.perf_counter()
+        results = fetcher.fetch(models)
+        wall_time = time.perf_counter() - start
+        for result in results:
+            assert result.ok, result.error
+            expected = merge_runs(hub.runs[result.dataset_id])
+            assert result.parsed_results == expected, result.dataset_id
+        table.add_row(
+            name,
+            f"{wall_time:.2f}",
+            f"{sum(result.requests for result in results) / len(results):.1f}",
+            str(sum(result.not_modified for result in results)),
+            f"{sum(result.bytes for result in results) / len(results) / 1024:.1f}",
+        )
+        if cold:
+            cache_dir = cache
+    hub.stop()
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# /// script
+# dependencies = ["numpy", "rouge_score"]
+# ///
+"""Compare the batched ROUGE-L scorer against rouge_score on synthetic data.
+
+The default sizes mimic scoring tatoeba_tgl (2,499 references) for many models.
+Run from the root directory:
+
+    python benchmarks/bench_rouge.py --num_models 20
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+from rouge_score import rouge_scorer
+
+from filbench_eval.rouge import RougeLScorer
+
+
+def main():
+    # fmt: off
+    parser = argparse.ArgumentParser(description="Benchmark the batched ROUGE-L scorer.")
+    parser.add_argument("--num_samples", type=int, default=2499, help="Number of references.")
+    parser.add_argument("--num_models", type=int, default=20, help="Number of models whose predictions are scored.")
+    parser.add_argument("--n_workers", type=int, default=1, help="Number of worker processes for the batched scorer.")
+    parser.add_argument("--use_stemmer", action="store_true", default=False, help="If set, will apply the Porter stemmer.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic sentences.")
+    args = parser.parse_args()
+    # fmt: on
+
+    rng = random.Random(args.seed)
+    vocab = [f"salita{i}" for i in range(2000)]
+
+    def sentence() -> str:
+        return " ".join(rng.choice(vocab) for _ in range(rng.randint(3, 25)))
+
+    references = [sentence() for _ in range(args.num_samples)]
+    # Models share part of their outputs, as they often do on short translations
+    predictions = [
+        [
+            references[i] if rng.random() < 0.2 else sentence()
+            for i in range(args.num_samples)
+        ]
+        for _ in range(args.num_models)
+    ]
+    targets = references * args.num_models
+    flat_predictions = [pred for model_preds in predictions for pred in model_preds]
+
+    start = time.perf_counter()
+    scorer = rouge_scorer.RougeScorer(["rougeL"], use_stemmer=args.use_stemmer)
+    expected = np.array(
+        [
+            scorer.score(target, pred)["rougeL"].fmeasure
+            for target, pred in zip(targets, flat_predictions)
+        ]
+    )
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = RougeLScorer(use_stemmer=args.use_stemmer, n_workers=args.n_workers)
+    scores = batched.score(targets, flat_predictions)
+    batched_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched.score(targets, flat_predictions)
+    warm_time = time.perf_counter() - start
+
+    print(f"Pairs scored: {len(targets)}")
+    print(f"rouge_score:            {reference_time:.3f}s")
+    print(
+        f"RougeLScorer (cold):    {batched_time:.3f}s ({reference_time / batched_time:.1f}x)"
+    )
+    print(
+        f"RougeLScorer (warm):    {warm_time:.3f}s ({reference_time / warm_time:.1f}x)"
+    )
+    print(f"Max abs. difference:    {np.abs(scores - expected).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
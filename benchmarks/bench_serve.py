@@ -0,0 +1,145 @@
+# /// script
+# dependencies = ["aiohttp", "numpy", "rich"]
+# ///
+"""Measure the latency of `filbench serve` under concurrent load.
+
+By default, the server runs in-process with a synthetic loader that sleeps
+for --load_ms (standing in for downloading and parsing a results dataset), so
+that the numbers only reflect the service itself. Pass --url and --models to
+load-test a running `filbench serve` instead. Run from the root directory:
+
+    python benchmarks/bench_serve.py --num_models 50 --concurrency 64
+    python benchmarks/bench_serve.py --url http://127.0.0.1:8080 --models org/details_a org/details_b
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+from aiohttp import ClientSession, TCPConnector, web
+from rich.console import Console
+from rich.table import Table
+
+from filbench_eval.compute_score import Tasks, build_report
+from filbench_eval.serve import ReportService, make_app
+
+
+def synthetic_loader(load_ms: float, seed: int):
+    def load(hf_path: str, revision, refresh: bool):
+        time.sleep(load_ms / 1000)
+        rng = random.Random(f"{seed}-{hf_path}")
+        results = {
+            task.value.benchmark: {task.value.metric: rng.random()} for task in Tasks
+        }
+        return build_report(
+            {"config": {"model_name": hf_path}, "results": results, "versions": {}}
+        )
+
+    return load
+
+
+async def run_phase(
+    session: ClientSession, url: str, paths: list[str], concurrency: int
+) -> tuple[np.ndarray, float]:
+    """Send every request with at most `concurrency` in flight, and time each one"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def request(path: str):
+        async with semaphore:
+            start = time.perf_counter()
+            async with session.get(f"{url}{path}") as response:
+                await response.read()
+                response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(path) for path in paths))
+    return np.array(latencies) * 1000, time.perf_counter() - start
+
+
+async def bench(args):
+    runner = None
+    url = args.url
+    if url is None:
+        service = ReportService(
+            loader=synthetic_loader(args.load_ms, args.seed), n_workers=args.n_workers
+        )
+        runner = web.AppRunner(make_app(service))
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+    models = args.models or [f"org/details_model_{i}" for i in range(args.num_models)]
+
+    rng = random.Random(args.seed)
+    # Every model is requested several times at once, so cold requests collapse into one load
+    cold = [f"/score/{model}" for model in models for _ in range(args.repeat)]
+    rng.shuffle(cold)
+    warm = [f"/score/{rng.choice(models)}" for _ in range(args.num_requests)]
+    mixed = [
+        "/leaderboard?limit=10" if rng.random() < 0.2 else path
+        for path in warm[: args.num_requests // 2]
+    ]
+
+    phases = []
+    connector = TCPConnector(limit=args.concurrency)
+    async with ClientSession(connector=connector) as session:
+        for name, paths in [
+            ("cold (single flight)", cold),
+            ("warm (LRU hits)", warm),
+            ("warm + leaderboard", mixed),
+        ]:
+            latencies, wall_time = await run_phase(
+                session, url, paths, args.concurrency
+            )
+            phases.append((name, latencies, wall_time))
+        async with session.get(f"{url}/stats") as response:
+            stats = await response.json()
+    if runner is not None:
+        await runner.cleanup()
+    return phases, stats, len(models)
+
+
+def main():
+    # fmt: off
+    parser = argparse.ArgumentParser(description="Benchmark the latency of filbench serve.")
+    parser.add_argument("--url", type=str, default=None, help="URL of a running filbench serve. If not set, serves synthetic reports in-process.")
+    parser.add_argument("--models", nargs="*", default=None, help="HF dataset IDs to request. Defaults to --num_models synthetic models.")
+    parser.add_argument("--num_models", type=int, default=50, help="Number of synthetic models.")
+    parser.add_argument("--repeat", type=int, default=8, help="Concurrent requests per model in the cold phase.")
+    parser.add_argument("--num_requests", type=int, default=5000, help="Number of requests in the warm phase.")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum number of requests in flight.")
+    parser.add_argument("--load_ms", type=float, default=200.0, help="Time the synthetic loader takes per model, in milliseconds.")
+    parser.add_argument("--n_workers", type=int, default=4, help="Number of threads loading reports in the in-process server.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the request mix and synthetic scores.")
+    args = parser.parse_args()
+    # fmt: on
+
+    phases, stats, num_models = asyncio.run(bench(args))
+
+    console = Console()
+    table = Table(title="filbench serve latency")
+    table.add_column("Phase", justify="left", style="cyan")
+    table.add_column("Requests", justify="right")
+    table.add_column("p50 (ms)", justify="right", style="magenta")
+    table.add_column("p99 (ms)", justify="right", style="magenta")
+    table.add_column("Requests/s", justify="right")
+    for name, latencies, wall_time in phases:
+        table.add_row(
+            name,
+            str(len(latencies)),
+            f"{np.percentile(latencies, 50):.2f}",
+            f"{np.percentile(latencies, 99):.2f}",
+            f"{len(latencies) / wall_time:.0f}",
+        )
+    console.print(table)
+    console.print(
+        f"Loads: {stats['loads']} for {num_models} models "
+        f"(hits: {stats['hits']}, misses: {stats['misses']}, errors: {stats['errors']})"
+    )
+
+
+if __name__ == "__main__":
+    main()
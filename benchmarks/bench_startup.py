@@ -0,0 +1,90 @@
+# /// script
+# dependencies = ["typer", "rich"]
+# ///
+"""Measure the startup time of the filbench CLI and the import cost of its modules.
+
+Each measurement runs in a fresh interpreter so that nothing is cached between runs.
+Run from the root directory:
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+
+import argparse
+import pkgutil
+import statistics
+import subprocess
+import sys
+import time
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+import filbench_eval
+
+
+def main():
+    # fmt: off
+    parser = argparse.ArgumentParser(description="Benchmark filbench CLI startup time.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs per measurement.")
+    parser.add_argument("--max_help_seconds", type=float, default=None, help="If set, exit with an error when any --help call is slower (median).")
+    args = parser.parse_args()
+    # fmt: on
+
+    commands = sorted(typer.main.get_command(filbench_eval.app).commands)
+    cli = "from filbench_eval import app; app()"
+    help_times = {"filbench --help": time_python([cli, "--help"], args.repeat)}
+    for command in commands:
+        help_times[f"filbench {command} --help"] = time_python(
+            [cli, command, "--help"], args.repeat
+        )
+
+    modules = sorted(
+        f"filbench_eval.{module.name}"
+        for module in pkgutil.iter_modules(filbench_eval.__path__)
+    )
+    import_times = {
+        f"import {module}": time_python([f"import {module}"], args.repeat)
+        for module in modules
+    }
+
+    baseline = time_python(["pass"], args.repeat)
+    console = Console()
+    for title, timings in [
+        ("CLI startup", help_times),
+        ("Module imports", import_times),
+    ]:
+        table = Table(title=f"{title} (median of {args.repeat} runs)")
+        table.add_column("Target", justify="left", style="cyan", no_wrap=True)
+        table.add_column("Time (s)", justify="right", style="magenta")
+        table.add_column("Over bare Python (s)", justify="right")
+        for name, seconds in timings.items():
+            table.add_row(name, f"{seconds:.3f}", f"{seconds - baseline:.3f}")
+        console.print(table)
+
+    slowest = max(help_times.values())
+    if args.max_help_seconds is not None and slowest > args.max_help_seconds:
+        console.print(
+            f"[red]Slowest --help took {slowest:.3f}s (limit: {args.max_help_seconds}s)[/red]"
+        )
+        sys.exit(1)
+
+
+def time_python(argv: list[str], repeat: int) -> float:
+    """Median wall time of `python -c <argv[0]> <argv[1:]...>` in a fresh process"""
+    code, *rest = argv
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", code, *rest],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    main()
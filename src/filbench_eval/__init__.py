@@ -1,11 +1,13 @@
 import json
+import time
 from pathlib import Path
 
 import typer
 from wasabi import msg
 
-from .compute_score import compute_score, pretty_report
-from .submit import status, submit
+# Heavy modules (datasets, numpy, huggingface_hub, rich, pyarrow) are imported
+# inside each command so that `filbench --help` and light commands start fast.
+# Run `python benchmarks/bench_startup.py` to check for regressions.
 
 app = typer.Typer(
     name="filbench",
@@ -16,22 +18,562 @@ app = typer.Typer(
 @app.command(name="compute-score")
 def compute_score_cmd(
     # fmt: off
-    hf_path: str = typer.Argument(..., help="Path to the HF dataset containing the results for a given model."),
+    hf_path: str = typer.Argument(None, help="Path to the HF dataset containing the results for a given model."),
     output_path: Path = typer.Option(None, help="Path to the output JSON file."),
+    from_dir: Path = typer.Option(None, help="Read lighteval results_*.json files from a local directory instead of the HF dataset."),
+    revision: str = typer.Option(None, help="Branch, tag or commit hash of the HF dataset."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not read or write the local parsed results cache."),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore cached results and redownload the dataset."),
+    preview: Path = typer.Option(None, help="Path to the preview.json of a preview run (see filbench preview). Scores the subsampled tasks and reports standard errors."),
+    backend: str = typer.Option("datasets", help="How to read the HF dataset: 'datasets' loads the results config, 'http' downloads only the results files (with its own ETag cache)."),
     # fmt: on
 ) -> None:
     """Compute the FilBench score for a given model."""
-    msg.text(f"Computing score for {hf_path}...")
-    model_report = compute_score(hf_path)
+    from .cache import ResultsCache
+    from .compute_score import (
+        build_report,
+        compile_tasks,
+        compute_score,
+        default_output_path,
+        pretty_report,
+    )
+    from .local import parse_results_dir
+
+    if bool(hf_path) == bool(from_dir):
+        msg.fail("Pass either an HF dataset path or --from-dir.", exits=1)
+
+    sample_sizes = None
+    if preview:
+        from .preview import read_preview
+
+        sample_sizes = read_preview(preview)
+
+    if from_dir:
+        msg.text(f"Computing score for results in {from_dir}...")
+        model_report = build_report(parse_results_dir(from_dir), preview=sample_sizes)
+        hf_path = model_report.get("config", {}).get("model_name") or from_dir.name
+    else:
+        msg.text(f"Computing score for {hf_path}...")
+        cache = None if no_cache else ResultsCache()
+        model_report = compute_score(
+            hf_path,
+            cache=cache,
+            refresh=refresh,
+            revision=revision,
+            preview=sample_sizes,
+            backend=backend,
+        )
 
     if not output_path:
-        output_path = Path(f"scores_{hf_path.replace('/', '___')}.json")
+        output_path = default_output_path(hf_path)
         msg.text(f"Saving model results to: {output_path}")
 
     with open(output_path, "w") as f:
         json.dump(model_report, f)
 
     pretty_report(model_report, output_path)
+    missing = [
+        benchmark
+        for benchmark in compile_tasks().benchmarks
+        if benchmark not in model_report.get("results", {})
+    ]
+    if missing:
+        msg.warn(
+            f"{len(missing)} tasks have no results and count as a score of 0: {', '.join(missing)}. "
+            "Use `filbench partial-score` to score a sweep that is still running."
+        )
+    if preview:
+        from .preview import pretty_estimate
+
+        pretty_estimate(model_report["preview"])
+
+
+@app.command(name="compute-score-batch")
+def compute_score_batch_cmd(
+    # fmt: off
+    hf_paths: list[str] = typer.Argument(None, help="Paths to the HF datasets containing the results for each model."),
+    manifest: Path = typer.Option(None, help="Path to a text file with one HF dataset ID per line."),
+    output_dir: Path = typer.Option(Path("."), help="Directory to save the per-model JSON reports and the summary table."),
+    n_workers: int = typer.Option(4, help="Number of worker processes."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not read or write the local parsed results cache."),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore cached results and redownload the datasets."),
+    backend: str = typer.Option("datasets", help="How to read the HF datasets: 'datasets' loads the results config of each model on a process pool, 'http' downloads only the results files of all models concurrently (n_workers connections)."),
+    # fmt: on
+) -> None:
+    """Compute the FilBench score for several models in parallel."""
+    from .batch import (
+        compute_scores_batch,
+        pretty_summary,
+        read_manifest,
+        write_summary,
+    )
+    from .cache import ResultsCache
+
+    hf_paths = list(hf_paths or [])
+    if manifest:
+        hf_paths.extend(read_manifest(manifest))
+    if not hf_paths:
+        msg.fail("No datasets to score. Pass dataset IDs or a --manifest.", exits=1)
+
+    msg.text(f"Computing scores for {len(hf_paths)} models with {n_workers} workers...")
+    start = time.perf_counter()
+    cache = None if no_cache else ResultsCache()
+    results = compute_scores_batch(
+        hf_paths,
+        output_dir,
+        n_workers=n_workers,
+        cache=cache,
+        refresh=refresh,
+        backend=backend,
+    )
+    wall_time = time.perf_counter() - start
+
+    summary_path = output_dir / "summary.csv"
+    write_summary(results, summary_path)
+    msg.text(f"Saved summary table to: {summary_path}")
+    pretty_summary(results, wall_time)
+    if not all(result.ok for result in results):
+        raise typer.Exit(code=1)
+
+
+@app.command(name="partial-score")
+def partial_score_cmd(
+    # fmt: off
+    hf_path: str = typer.Argument(None, help="Path to the HF dataset containing the results for a given model."),
+    from_dir: Path = typer.Option(None, help="Read lighteval results_*.json files from a local directory instead of the HF dataset."),
+    reference: list[Path] = typer.Option(None, help="Score reports of other models (files or directories) or a submissions store, to impute the missing tasks."),
+    output_path: Path = typer.Option(None, help="If set, save the estimates to this JSON file."),
+    revision: str = typer.Option(None, help="Branch, tag or commit hash of the HF dataset."),
+    # fmt: on
+) -> None:
+    """Score a sweep that is still running, with its coverage and bounds on the final scores."""
+    from .compute_score import load_runs
+    from .local import find_results_files
+    from .partial import (
+        PartialScorer,
+        ReferenceModel,
+        load_reference_results,
+        pretty_partial,
+    )
+
+    if bool(hf_path) == bool(from_dir):
+        msg.fail("Pass either an HF dataset path or --from-dir.", exits=1)
+
+    model = None
+    if reference:
+        model = ReferenceModel.fit(load_reference_results(reference))
+        if model is None:
+            msg.warn(
+                "Need at least 3 complete reference models to impute missing tasks."
+            )
+    scorer = PartialScorer(reference=model)
+    if from_dir:
+        for path in find_results_files(from_dir):
+            with open(path, "r") as f:
+                scorer.add_run(json.load(f))
+    else:
+        scorer.add_runs(run for _, run in load_runs(hf_path, revision=revision))
+
+    estimate = scorer.estimate()
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(estimate, f, indent=2)
+        msg.text(f"Saved partial scores to: {output_path}")
+    pretty_partial(estimate)
+
+
+@app.command(name="bootstrap")
+def bootstrap_cmd(
+    # fmt: off
+    hf_path: str = typer.Argument(..., help="Path to the HF dataset containing the results for a given model."),
+    output_path: Path = typer.Option(None, help="Path to the output JSON file."),
+    n_resamples: int = typer.Option(10_000, help="Number of bootstrap resamples."),
+    confidence: float = typer.Option(0.95, help="Confidence level of the intervals."),
+    seed: int = typer.Option(0, help="Random seed for resampling."),
+    revision: str = typer.Option(None, help="Branch, tag or commit hash of the HF dataset."),
+    cube_dir: Path = typer.Option(None, help="Read the per-sample metrics from a prediction cube (see build-cube) instead of the HF dataset."),
+    # fmt: on
+) -> None:
+    """Compute bootstrap confidence intervals of the FilBench score from per-sample details."""
+    from .bootstrap import bootstrap_report, load_task_samples, pretty_bootstrap
+
+    if cube_dir:
+        from .cube import PredictionCube
+
+        cube = PredictionCube(cube_dir)
+        if hf_path not in cube.models:
+            msg.fail(f"{hf_path} is not in the prediction cube at {cube_dir}.", exits=1)
+        task_samples = cube.task_samples(hf_path)
+    else:
+        msg.text(f"Loading per-sample details for {hf_path}...")
+        task_samples = load_task_samples(hf_path, revision=revision)
+    start = time.perf_counter()
+    report = bootstrap_report(
+        task_samples, n_resamples=n_resamples, confidence=confidence, seed=seed
+    )
+    msg.text(f"Drew {n_resamples} resamples in {time.perf_counter() - start:.2f}s")
+
+    if not output_path:
+        output_path = Path(f"bootstrap_{hf_path.replace('/', '___')}.json")
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    msg.text(f"Saved confidence intervals to: {output_path}")
+    pretty_bootstrap(report)
+
+
+@app.command(name="verify")
+def verify_cmd(
+    # fmt: off
+    hf_path: str = typer.Argument(..., help="Path to the HF dataset containing the results for a given model."),
+    chunk_size: int = typer.Option(10_000, help="Number of details rows to process at once."),
+    tolerance: float = typer.Option(1e-6, help="Largest allowed difference between recomputed and stored metrics."),
+    revision: str = typer.Option(None, help="Branch, tag or commit hash of the HF dataset."),
+    # fmt: on
+) -> None:
+    """Recompute task metrics from the per-sample details and compare them with the stored results."""
+    from .compute_score import parse_outputs
+    from .metrics import pretty_checks, recompute_metrics
+
+    msg.text(f"Recomputing metrics for {hf_path}...")
+    results = parse_outputs(hf_path, revision=revision).get("results")
+    checks = recompute_metrics(
+        hf_path, results, chunk_size=chunk_size, tolerance=tolerance, revision=revision
+    )
+    pretty_checks(checks, tolerance=tolerance)
+    mismatches = [check for check in checks if not check.ok(tolerance)]
+    if mismatches:
+        msg.fail(f"Found {len(mismatches)} mismatches out of {len(checks)} checks.")
+        raise typer.Exit(code=1)
+    msg.good(f"All {len(checks)} recomputed metrics match the stored results.")
+
+
+@app.command(name="build-cube")
+def build_cube_cmd(
+    # fmt: off
+    hf_paths: list[str] = typer.Argument(None, help="Paths to the HF datasets containing the results for each model."),
+    manifest: Path = typer.Option(None, help="Path to a text file with one HF dataset ID per line."),
+    cube_dir: Path = typer.Option(None, help="Directory of the prediction cube. Defaults to ~/.cache/filbench/cube."),
+    n_workers: int = typer.Option(8, help="Number of details configs to download concurrently."),
+    refresh: bool = typer.Option(False, "--refresh", help="Reload models that are already in the cube."),
+    # fmt: on
+) -> None:
+    """Add the per-sample predictions and metrics of models to a memory-mappable prediction cube."""
+    from .batch import read_manifest
+    from .cube import PredictionCube, load_cube_samples
+
+    hf_paths = list(hf_paths or [])
+    if manifest:
+        hf_paths.extend(read_manifest(manifest))
+    if not hf_paths:
+        msg.fail("No datasets to add. Pass dataset IDs or a --manifest.", exits=1)
+
+    cube = PredictionCube(cube_dir) if cube_dir else PredictionCube()
+    for hf_path in hf_paths:
+        if hf_path in cube.models and not refresh:
+            msg.info(f"Skipping {hf_path}, already in the cube.")
+            continue
+        start = time.perf_counter()
+        samples = load_cube_samples(hf_path, n_workers=n_workers)
+        cube.add_model(hf_path, samples)
+        elapsed = time.perf_counter() - start
+        msg.good(f"Added {hf_path} ({len(samples)} tasks) in {elapsed:.2f}s")
+    msg.text(
+        f"Prediction cube at {cube.root}: {len(cube.models)} models, {len(cube.tasks)} tasks"
+    )
+
+
+@app.command(name="pairwise")
+def pairwise_cmd(
+    # fmt: off
+    models: list[str] = typer.Argument(None, help="Models (HF dataset IDs) to compare. Defaults to every model in the cube."),
+    cube_dir: Path = typer.Option(None, help="Directory of the prediction cube. Defaults to ~/.cache/filbench/cube."),
+    output_path: Path = typer.Option(Path("pairwise.json"), help="Path to the output JSON file."),
+    n_resamples: int = typer.Option(1000, help="Number of paired bootstrap resamples."),
+    alpha: float = typer.Option(0.05, help="Significance level for the tied clusters."),
+    seed: int = typer.Option(0, help="Random seed for resampling."),
+    # fmt: on
+) -> None:
+    """Compute Cohen's kappa and paired significance tests between every pair of models."""
+    from .cube import PredictionCube
+    from .pairwise import pairwise_report, pretty_pairwise
+
+    cube = PredictionCube(cube_dir) if cube_dir else PredictionCube()
+    models = list(models or cube.models)
+    missing = [model for model in models if model not in cube.models]
+    if missing:
+        msg.fail(f"Not in the prediction cube: {', '.join(missing)}", exits=1)
+    if len(models) < 2:
+        msg.fail(
+            "Need at least two models to compare. Add them with build-cube.", exits=1
+        )
+
+    msg.text(
+        f"Comparing {len(models)} models ({len(models) * (len(models) - 1) // 2} pairs)..."
+    )
+    start = time.perf_counter()
+    report = pairwise_report(
+        cube, models=models, n_resamples=n_resamples, alpha=alpha, seed=seed
+    )
+    msg.text(f"Computed pairwise tests in {time.perf_counter() - start:.2f}s")
+    with open(output_path, "w") as f:
+        json.dump(report, f)
+    msg.text(f"Saved pairwise matrices to: {output_path}")
+    pretty_pairwise(report)
+
+
+@app.command(name="collect-runtimes")
+def collect_runtimes_cmd(
+    # fmt: off
+    hf_paths: list[str] = typer.Argument(None, help="Paths to the HF datasets containing the results for each model."),
+    manifest: Path = typer.Option(None, help="Path to a text file with one HF dataset ID per line."),
+    from_dir: Path = typer.Option(None, help="Read lighteval results_*.json files from a local directory instead of the HF datasets."),
+    history_path: Path = typer.Option(None, help="Path to the runtime history. Defaults to ~/.cache/filbench/runtimes.jsonl."),
+    # fmt: on
+) -> None:
+    """Record the measured runtime and sample count of every task run in the runtime history."""
+    from .batch import read_manifest
+    from .runtimes import RuntimeHistory, collect_local_runtimes, collect_runtimes
+
+    hf_paths = list(hf_paths or [])
+    if manifest:
+        hf_paths.extend(read_manifest(manifest))
+    if not hf_paths and not from_dir:
+        msg.fail(
+            "No results to read. Pass dataset IDs, a --manifest or --from-dir.", exits=1
+        )
+
+    history = RuntimeHistory(history_path) if history_path else RuntimeHistory()
+    sources = [(hf_path, collect_runtimes) for hf_path in hf_paths]
+    if from_dir:
+        sources.append((from_dir, collect_local_runtimes))
+    for source, collect in sources:
+        records = collect(source)
+        added = history.add(records)
+        msg.good(f"Recorded {added} new task runs from {source} ({len(records)} found)")
+    msg.text(f"Runtime history at {history.path}: {len(history.records())} task runs")
+
+
+@app.command(name="runtime-stats")
+def runtime_stats_cmd(
+    # fmt: off
+    history_path: Path = typer.Option(None, help="Path to the runtime history. Defaults to ~/.cache/filbench/runtimes.jsonl."),
+    model: str = typer.Option(None, help="Only use the runs of this model."),
+    include_apportioned: bool = typer.Option(False, "--include-apportioned", help="Also use runs that evaluated several tasks, whose wall time is split between the tasks by number of samples."),
+    output_path: Path = typer.Option(None, help="If set, also save the statistics to this JSON file."),
+    # fmt: on
+) -> None:
+    """Show the measured throughput (samples/sec) of each task from the runtime history."""
+    from dataclasses import asdict
+
+    from .runtimes import RuntimeHistory, pretty_throughput, throughput_stats
+
+    history = RuntimeHistory(history_path) if history_path else RuntimeHistory()
+    records = history.records()
+    stats = throughput_stats(
+        records, model=model, include_apportioned=include_apportioned
+    )
+    if not records:
+        msg.fail(
+            f"No measured runtimes in {history.path}. Run collect-runtimes first.",
+            exits=1,
+        )
+    if not stats:
+        msg.fail(
+            f"No runtimes measured from single-task runs in {history.path}. "
+            "Pass --include-apportioned to use runs that evaluated several tasks.",
+            exits=1,
+        )
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump({task: asdict(stat) for task, stat in stats.items()}, f, indent=2)
+        msg.text(f"Saved throughput statistics to: {output_path}")
+    pretty_throughput(stats)
+
+
+@app.command(name="plan")
+def plan_cmd(
+    # fmt: off
+    n_workers: int = typer.Option(..., help="Number of workers (e.g. GPUs) running lighteval jobs in parallel."),
+    tasks_file: Path = typer.Option(None, help="Text file with one lighteval task spec per line (e.g. examples/tasks/all_filbench_tasks.txt). Defaults to every FilBench task."),
+    history_path: Path = typer.Option(None, help="Predict runtimes from a runtime history (see collect-runtimes) instead of the number of samples of each task."),
+    model: str = typer.Option(None, help="Only use the runs of this model from the runtime history."),
+    include_apportioned: bool = typer.Option(False, "--include-apportioned", help="Also use runs from the runtime history that evaluated several tasks, whose wall time is split between the tasks by number of samples."),
+    overhead: float = typer.Option(360.0, help="Seconds each job spends starting up, independent of its number of samples."),
+    max_shards: int = typer.Option(1, help="Split large tasks into up to this many sample shards when that shortens the makespan."),
+    output_dir: Path = typer.Option(Path("plan"), help="Directory to save the task specs of each worker and the plan."),
+    # fmt: on
+) -> None:
+    """Assign tasks to workers, longest first, so that the whole suite finishes as early as possible."""
+    from dataclasses import asdict
+
+    from .custom_tasks import write_custom_tasks
+    from .plan import (
+        RuntimeModel,
+        default_task_specs,
+        list_schedule,
+        make_jobs,
+        plan_tasks,
+        pretty_schedule,
+        read_task_specs,
+        shard_subsets,
+        write_worker_files,
+    )
+    from .runtimes import RuntimeHistory
+
+    if n_workers < 1:
+        msg.fail("--n-workers must be at least 1.", exits=1)
+    specs = read_task_specs(tasks_file) if tasks_file else default_task_specs()
+    if history_path:
+        records = RuntimeHistory(history_path).records()
+        if not records:
+            msg.fail(f"No measured runtimes in {history_path}.", exits=1)
+        runtime_model = RuntimeModel.from_history(
+            records,
+            overhead=overhead,
+            model=model,
+            include_apportioned=include_apportioned,
+        )
+        if not runtime_model.seconds_per_sample:
+            msg.warn(
+                f"No runtimes measured from single-task runs in {history_path}, "
+                "estimating runtimes from the number of samples. Pass "
+                "--include-apportioned to use runs that evaluated several tasks."
+            )
+    else:
+        msg.info("No --history-path, estimating runtimes from the number of samples.")
+        runtime_model = RuntimeModel(overhead=overhead)
+
+    try:
+        schedule = plan_tasks(specs, n_workers, runtime_model, max_shards=max_shards)
+        baseline = list_schedule(make_jobs(specs, runtime_model), n_workers)
+    except ValueError as e:
+        msg.fail(str(e), exits=1)
+
+    paths = write_worker_files(schedule, output_dir)
+    plan = {
+        "n_workers": n_workers,
+        "makespan": schedule.makespan,
+        "lower_bound": schedule.lower_bound,
+        "loads": schedule.loads,
+        "workers": [[asdict(job) for job in jobs] for jobs in schedule.workers],
+    }
+    with open(output_dir / "plan.json", "w") as f:
+        json.dump(plan, f, indent=2)
+    msg.text(f"Saved the task specs of {len(paths)} workers to: {output_dir}")
+    subsets = shard_subsets(schedule)
+    if subsets:
+        custom_tasks_path = write_custom_tasks(subsets, output_dir, command="plan")
+        msg.info(
+            "Some tasks are split into sample shards, which lighteval only knows from "
+            f"the generated custom tasks file. Run the workers with --custom-tasks {custom_tasks_path.resolve()}"
+        )
+    pretty_schedule(schedule, baseline=baseline)
+
+
+@app.command(name="preview")
+def preview_cmd(
+    # fmt: off
+    target_stderr: float = typer.Option(2.0, help="Standard error to reach on each task score, in points on the 0-100 scale."),
+    seed: int = typer.Option(0, help="Random seed for picking the subsamples."),
+    cube_dir: Path = typer.Option(None, help="Prediction cube (see build-cube) to read gold labels from, to stratify the subsamples. Defaults to ~/.cache/filbench/cube."),
+    output_dir: Path = typer.Option(Path("preview"), help="Directory to save the subsamples (preview.json) and the lighteval task list (tasks.txt)."),
+    # fmt: on
+) -> None:
+    """Pick a stratified subsample of each task for a quick preview of the FilBench score."""
+    from .cube import PredictionCube
+    from .custom_tasks import write_custom_tasks
+    from .plan import RuntimeModel
+    from .preview import plan_preview, pretty_preview, preview_subsets, write_preview
+
+    cube = PredictionCube(cube_dir) if cube_dir else PredictionCube()
+    if not cube.tasks:
+        msg.warn(
+            f"No prediction cube at {cube.root}, the subsamples won't be stratified by label."
+        )
+    previews = plan_preview(target_stderr=target_stderr, seed=seed, cube=cube)
+    preview_path, tasks_path = write_preview(previews, output_dir, target_stderr, seed)
+    msg.text(
+        f"Saved the subsamples to {preview_path} and the task list to {tasks_path}"
+    )
+    subsets = preview_subsets(previews)
+    if subsets:
+        custom_tasks_path = write_custom_tasks(subsets, output_dir, command="preview")
+        msg.info(
+            "Preview tasks are only defined in the generated custom tasks file. Run "
+            f"lighteval with --custom-tasks {custom_tasks_path.resolve()}"
+        )
+
+    runtime_model = RuntimeModel()
+    predicted = runtime_model.overhead + sum(
+        runtime_model.seconds(preview.benchmark.split(":")[0], preview.sample_size)
+        - runtime_model.overhead
+        for preview in previews
+    )
+    pretty_preview(previews, predicted=predicted)
+
+
+@app.command(name="watch")
+def watch_cmd(
+    # fmt: off
+    sources: list[str] = typer.Argument(None, help="Local lighteval results directories or HF dataset IDs to watch."),
+    manifest: Path = typer.Option(None, help="Path to a text file with one HF dataset ID per line."),
+    output_dir: Path = typer.Option(Path("watch"), help="Directory to save the reports of each model and the combined leaderboard.csv."),
+    interval: float = typer.Option(60.0, help="Seconds between polls."),
+    once: bool = typer.Option(False, "--once", help="Poll every source once and exit."),
+    # fmt: on
+) -> None:
+    """Rescore models as new runs land, and keep a combined leaderboard up to date."""
+    from .batch import read_manifest
+    from .watch import Watcher, pretty_poll
+
+    sources = list(sources or [])
+    if manifest:
+        sources.extend(read_manifest(manifest))
+    if not sources:
+        msg.fail(
+            "No sources to watch. Pass directories, dataset IDs or a --manifest.",
+            exits=1,
+        )
+
+    watcher = Watcher(sources, output_dir)
+    msg.text(
+        f"Watching {len(sources)} sources, leaderboard at {watcher.leaderboard_path}"
+    )
+    try:
+        watcher.watch(interval, callback=pretty_poll, max_polls=1 if once else None)
+    except KeyboardInterrupt:
+        msg.text("Stopped watching.")
+
+
+@app.command(name="serve")
+def serve_cmd(
+    # fmt: off
+    host: str = typer.Option("127.0.0.1", help="Host to bind to."),
+    port: int = typer.Option(8080, help="Port to listen on."),
+    store_dir: Path = typer.Option(None, help="Local submissions store (see ingest-submissions) to answer leaderboard queries from. Defaults to the reports in memory."),
+    max_reports: int = typer.Option(128, help="Number of model reports to keep in memory."),
+    ttl: float = typer.Option(300.0, help="Seconds before the report of a branch (not a commit hash) is reloaded."),
+    n_workers: int = typer.Option(4, help="Number of threads loading reports."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not read or write the local parsed results cache."),
+    # fmt: on
+) -> None:
+    """Serve model reports, FilBench scores and leaderboard queries over HTTP."""
+    try:
+        import aiohttp  # noqa: F401
+    except ImportError:
+        msg.fail("filbench serve needs aiohttp: pip install aiohttp", exits=1)
+    from .cache import ResultsCache
+    from .serve import ReportService, default_loader, serve
+
+    service = ReportService(
+        loader=default_loader(None if no_cache else ResultsCache()),
+        max_reports=max_reports,
+        ttl=ttl,
+        n_workers=n_workers,
+        store_dir=store_dir,
+    )
+    msg.good(f"Serving FilBench scores on http://{host}:{port}")
+    serve(service, host=host, port=port)
 
 
 @app.command(name="submit")
@@ -42,10 +584,120 @@ def submit_cmd(
     # fmt: on
 ) -> None:
     """Submit the results to the leaderboard."""
-    dataset = "filbench/filbench-results-submission"
+    from .submit import DEFAULT_SUBMISSIONS_DATASET, status, submit
+
+    dataset = DEFAULT_SUBMISSIONS_DATASET
     output = submit(json_path, submissions_dataset=dataset, dry_run=dry_run)
     status(output.get("display_metadata"), submissions_dataset=dataset, dry_run=dry_run)
 
 
+@app.command(name="drain-submissions")
+def drain_submissions_cmd(
+    # fmt: off
+    spool_dir: Path = typer.Option(None, help="Directory of the submission spool. Defaults to ~/.cache/filbench/spool."),
+    retry_failed: bool = typer.Option(False, "--retry-failed", help="Also retry submissions that used up their attempts."),
+    max_attempts: int = typer.Option(5, help="Number of upload attempts per submission, across runs."),
+    local_repo: Path = typer.Option(None, help="Commit into this local directory instead of the Hugging Face Hub (for testing)."),
+    # fmt: on
+) -> None:
+    """Upload the submissions left in the local spool by interrupted or failed runs."""
+    from .spool import SubmissionSpool, pretty_outcomes
+    from .submit import LocalRepoClient
+
+    spool = SubmissionSpool(spool_dir) if spool_dir else SubmissionSpool()
+    if retry_failed:
+        msg.text(f"Retrying {spool.retry_failed()} failed submissions")
+    api = LocalRepoClient(local_repo) if local_repo else None
+    outcomes = spool.drain(api=api, max_attempts=max_attempts)
+    if not outcomes:
+        msg.good("No pending submissions.")
+        return
+    pretty_outcomes(outcomes)
+    failed = [outcome for outcome in outcomes if outcome.state != "done"]
+    if failed:
+        msg.fail(f"{len(failed)} of {len(outcomes)} submissions failed.", exits=1)
+    msg.good(f"Uploaded {len(outcomes)} submissions.")
+
+
+@app.command(name="submit-batch")
+def submit_batch_cmd(
+    # fmt: off
+    manifest: Path = typer.Argument(..., help="CSV or YAML file with the json_path and display metadata of each submission."),
+    dataset: str = typer.Option(None, help="HF dataset to submit to. Defaults to the one `submit` uses (filbench/filbench-results-submission)."),
+    local_repo: Path = typer.Option(None, help="Commit into this local directory instead of the Hugging Face Hub (for testing)."),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Validate the submissions without submitting them."),
+    # fmt: on
+) -> None:
+    """Submit several results to the leaderboard as a single PR."""
+    from .submit import (
+        DEFAULT_SUBMISSIONS_DATASET,
+        LocalRepoClient,
+        prepare_submissions,
+        pretty_batch_submissions,
+        read_submission_manifest,
+        submit_batch,
+    )
+
+    dataset = dataset or DEFAULT_SUBMISSIONS_DATASET
+    submissions = prepare_submissions(read_submission_manifest(manifest))
+    if not submissions:
+        msg.fail(f"No submissions in {manifest}.", exits=1)
+    invalid = [submission for submission in submissions if submission.errors]
+    if invalid:
+        pretty_batch_submissions(submissions)
+        msg.fail(
+            f"{len(invalid)} of {len(submissions)} submissions are invalid. Nothing was submitted.",
+            exits=1,
+        )
+
+    api = LocalRepoClient(local_repo) if local_repo else None
+    target = local_repo / dataset if local_repo else dataset
+    if not dry_run:
+        msg.info(f"Submitting {len(submissions)} files to {target} in one commit")
+    start = time.perf_counter()
+    commit = submit_batch(
+        submissions, submissions_dataset=dataset, api=api, dry_run=dry_run
+    )
+    elapsed = time.perf_counter() - start
+    pretty_batch_submissions(submissions)
+    if dry_run:
+        msg.info("Dry-run enabled. Will not submit results.")
+    else:
+        url = getattr(commit, "pr_url", None) or getattr(commit, "commit_url", target)
+        msg.good(f"Submitted {len(submissions)} files in {elapsed:.2f}s: {url}")
+
+
+@app.command(name="ingest-submissions")
+def ingest_submissions_cmd(
+    # fmt: off
+    paths: list[Path] = typer.Argument(..., help="Submission JSON files or directories containing them."),
+    store_dir: Path = typer.Option(Path("submissions_store"), help="Directory of the local submissions store."),
+    # fmt: on
+) -> None:
+    """Append new submissions to the local submissions store."""
+    from .store import SubmissionsStore
+
+    store = SubmissionsStore(store_dir)
+    num_rows = 0
+    for path in paths:
+        num_rows += store.ingest_dir(path) if path.is_dir() else store.ingest([path])
+    msg.good(f"Ingested {num_rows} new submissions into {store_dir}")
+
+
+@app.command(name="export-leaderboard")
+def export_leaderboard_cmd(
+    # fmt: off
+    output_path: Path = typer.Argument(..., help="Path to the output CSV or Parquet file."),
+    store_dir: Path = typer.Option(Path("submissions_store"), help="Directory of the local submissions store."),
+    include_report: bool = typer.Option(False, "--include-report", help="Also export the raw JSON report of each submission."),
+    # fmt: on
+) -> None:
+    """Export the latest submission of each model from the local submissions store."""
+    from .store import SubmissionsStore
+
+    SubmissionsStore(store_dir).export(output_path, include_report=include_report)
+    msg.good(f"Saved leaderboard to {output_path}")
+
+
 if __name__ == "__main__":
     app()
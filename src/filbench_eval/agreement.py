@@ -0,0 +1,99 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+def encode_labels(
+    labels: np.ndarray, categories: Optional[Sequence] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Encode a (n_items, n_raters) matrix of labels as integer category codes
+
+    labels (np.ndarray): the label that each rater gave to each item.
+    categories (Optional[Sequence]): the categories to encode against. Defaults
+        to the sorted unique labels.
+    RETURNS (tuple[np.ndarray, np.ndarray]): the codes, with the same shape as
+        the labels, and the categories each code refers to.
+    """
+    labels = np.asarray(labels)
+    if categories is None:
+        categories, codes = np.unique(labels, return_inverse=True)
+        return codes.reshape(labels.shape), categories
+
+    categories = np.asarray(categories)
+    order = np.argsort(categories, kind="stable")
+    positions = np.searchsorted(categories[order], labels)
+    positions = np.minimum(positions, len(categories) - 1)
+    codes = order[positions]
+    unknown = categories[codes] != labels
+    if unknown.any():
+        raise ValueError(f"Unknown categories: {sorted(set(labels[unknown]))}")
+    return codes, categories
+
+
+def category_counts(
+    labels: np.ndarray, categories: Optional[Sequence] = None
+) -> np.ndarray:
+    """Count how many raters assigned each category to each item
+
+    This is the (n_items, n_categories) table expected by Fleiss' kappa.
+
+    labels (np.ndarray): the (n_items, n_raters) labels.
+    categories (Optional[Sequence]): the categories to count. Defaults to the
+        sorted unique labels.
+    RETURNS (np.ndarray): the count of each category for each item.
+    """
+    codes, categories = encode_labels(labels, categories)
+    n_items, n_categories = codes.shape[0], len(categories)
+    flat = codes + np.arange(n_items)[:, None] * n_categories
+    counts = np.bincount(flat.ravel(), minlength=n_items * n_categories)
+    return counts.reshape(n_items, n_categories)
+
+
+def fleiss_kappa(table: np.ndarray) -> float:
+    """Compute Fleiss' kappa from a (n_items, n_categories) count table
+
+    Same as `statsmodels.stats.inter_rater.fleiss_kappa(table, method="fleiss")`.
+    """
+    return float(fleiss_kappa_batch({"": table})[""])
+
+
+def fleiss_kappa_batch(tables: dict[str, np.ndarray]) -> dict[str, float]:
+    """Compute Fleiss' kappa for several count tables at once
+
+    The tables are stacked into one matrix (padded to the largest number of
+    categories) and reduced per table with segment sums, so the cost doesn't
+    depend on a Python loop over items or categories.
+
+    tables (dict[str, np.ndarray]): the (n_items, n_categories) count table of
+        each task. Every item of a table must have the same number of raters.
+    RETURNS (dict[str, float]): Fleiss' kappa of each task.
+    """
+    names = [name for name, table in tables.items() if len(table)]
+    if not names:
+        return {name: float("nan") for name in tables}
+
+    n_categories = max(np.shape(tables[name])[1] for name in names)
+    stacked = np.concatenate(
+        [
+            np.pad(
+                np.asarray(tables[name], dtype=float),
+                ((0, 0), (0, n_categories - np.shape(tables[name])[1])),
+            )
+            for name in names
+        ]
+    )
+    n_items = np.array([len(tables[name]) for name in names])
+    starts = np.cumsum(n_items) - n_items
+
+    n_raters = stacked.sum(axis=1)
+    p_items = ((stacked**2).sum(axis=1) - n_raters) / (n_raters * (n_raters - 1))
+    p_mean = np.add.reduceat(p_items, starts) / n_items
+    category_totals = np.add.reduceat(stacked, starts, axis=0)
+    p_categories = category_totals / category_totals.sum(axis=1, keepdims=True)
+    p_expected = (p_categories**2).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kappas = (p_mean - p_expected) / (1 - p_expected)
+
+    results = {name: float("nan") for name in tables}
+    results.update(dict(zip(names, kappas.tolist())))
+    return results
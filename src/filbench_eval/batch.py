@@ -0,0 +1,223 @@
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+
+from .cache import ResultsCache
+from .compute_score import (
+    TaskCategory,
+    build_report,
+    compute_score,
+    default_output_path,
+)
+
+
+@dataclass
+class BatchResult:
+    hf_path: str
+    output_path: Optional[Path] = None
+    model_name: Optional[str] = None
+    filbench_score: Optional[float] = None
+    category_scores: dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def read_manifest(manifest_path: Path) -> list[str]:
+    """Read a manifest file containing one HF dataset ID per line
+
+    Empty lines and lines starting with '#' are ignored.
+
+    manifest_path (Path): path to the manifest file.
+    RETURNS (list[str]): the dataset IDs in the order they appear.
+    """
+    hf_paths = []
+    with open(manifest_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                hf_paths.append(line)
+    return hf_paths
+
+
+def compute_scores_batch(
+    hf_paths: list[str],
+    output_dir: Path,
+    n_workers: int = 4,
+    cache: Optional[ResultsCache] = None,
+    refresh: bool = False,
+    backend: str = "datasets",
+) -> list[BatchResult]:
+    """Compute the FilBench score for several models on a process pool
+
+    Each model is scored in a separate task so that a failure in one model
+    doesn't abort the others. Reports are written as they complete. With the
+    "http" backend, the results files of all models are fetched concurrently
+    in this process instead (see `fetch.HubFetcher`), and `n_workers` is the
+    number of connections.
+
+    hf_paths (list[str]): the HF datasets containing the results for each model.
+    output_dir (Path): directory where the per-model reports are saved.
+    n_workers (int): number of worker processes.
+    cache (Optional[ResultsCache]): if set, reuse parsed results for the same dataset commit.
+    refresh (bool): if True, ignore cached entries and redownload the datasets.
+    backend (str): "datasets" or "http", see `compute_score`.
+    RETURNS (list[BatchResult]): one result per dataset ID, in input order.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Preserve order but skip duplicates so that two workers never write the same file
+    hf_paths = list(dict.fromkeys(hf_paths))
+    if backend == "http":
+        return _score_fetched(hf_paths, output_dir, n_workers, refresh)
+    if backend != "datasets":
+        raise ValueError(f"Unknown backend: {backend}. Use 'datasets' or 'http'.")
+    results: dict[str, BatchResult] = {}
+    with ProcessPoolExecutor(max_workers=max(1, n_workers)) as executor:
+        futures = {
+            executor.submit(
+                _score_one,
+                hf_path,
+                output_dir / default_output_path(hf_path),
+                cache,
+                refresh,
+            ): hf_path
+            for hf_path in hf_paths
+        }
+        for future in as_completed(futures):
+            hf_path = futures[future]
+            try:
+                results[hf_path] = future.result()
+            except Exception as e:
+                # The worker itself died (e.g., BrokenProcessPool)
+                results[hf_path] = BatchResult(hf_path=hf_path, error=repr(e))
+    return [results[hf_path] for hf_path in hf_paths]
+
+
+def _score_one(
+    hf_path: str,
+    output_path: Path,
+    cache: Optional[ResultsCache] = None,
+    refresh: bool = False,
+) -> BatchResult:
+    start = time.perf_counter()
+    try:
+        model_report = compute_score(hf_path, cache=cache, refresh=refresh)
+        with open(output_path, "w") as f:
+            json.dump(model_report, f)
+    except Exception as e:
+        return BatchResult(
+            hf_path=hf_path,
+            elapsed=time.perf_counter() - start,
+            error=f"{type(e).__name__}: {e}",
+        )
+
+    return BatchResult(
+        hf_path=hf_path,
+        output_path=output_path,
+        model_name=model_report.get("config", {}).get("model_name"),
+        filbench_score=float(model_report.get("filbench_score")),
+        category_scores=model_report.get("category_scores", {}),
+        elapsed=time.perf_counter() - start,
+    )
+
+
+def _score_fetched(
+    hf_paths: list[str], output_dir: Path, max_connections: int, refresh: bool
+) -> list[BatchResult]:
+    from .fetch import HubFetcher
+
+    fetcher = HubFetcher(max_connections=max(1, max_connections))
+    results = []
+    for fetched in fetcher.fetch(hf_paths, refresh=refresh):
+        start = time.perf_counter()
+        hf_path = fetched.dataset_id
+        if not fetched.ok:
+            results.append(
+                BatchResult(
+                    hf_path=hf_path, elapsed=fetched.elapsed, error=fetched.error
+                )
+            )
+            continue
+        output_path = output_dir / default_output_path(hf_path)
+        try:
+            model_report = build_report(fetched.parsed_results)
+            with open(output_path, "w") as f:
+                json.dump(model_report, f)
+        except Exception as e:
+            results.append(
+                BatchResult(
+                    hf_path=hf_path,
+                    elapsed=fetched.elapsed + time.perf_counter() - start,
+                    error=f"{type(e).__name__}: {e}",
+                )
+            )
+            continue
+        results.append(
+            BatchResult(
+                hf_path=hf_path,
+                output_path=output_path,
+                model_name=model_report.get("config", {}).get("model_name"),
+                filbench_score=float(model_report.get("filbench_score")),
+                category_scores=model_report.get("category_scores", {}),
+                elapsed=fetched.elapsed + time.perf_counter() - start,
+            )
+        )
+    return results
+
+
+def write_summary(results: list[BatchResult], output_path: Path):
+    """Save the combined summary table as a CSV file"""
+    categories = [category.value for category in TaskCategory]
+    with open(output_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["hf_path", "model_name", "filbench_score"]
+            + categories
+            + ["elapsed_seconds", "report", "error"]
+        )
+        for result in results:
+            writer.writerow(
+                [result.hf_path, result.model_name, result.filbench_score]
+                + [result.category_scores.get(category) for category in categories]
+                + [
+                    round(result.elapsed, 3),
+                    result.output_path or "",
+                    result.error or "",
+                ]
+            )
+
+
+def pretty_summary(results: list[BatchResult], wall_time: float):
+    console = Console()
+    table = Table(title="FilBench Batch Scores")
+    table.add_column("Dataset", justify="left", style="cyan", no_wrap=True)
+    table.add_column("FilBench Score", justify="right", style="magenta")
+    table.add_column("Time (s)", justify="right")
+    table.add_column("Status", justify="left")
+    ranked = sorted(results, key=lambda r: (not r.ok, -(r.filbench_score or 0.0)))
+    for result in ranked:
+        table.add_row(
+            result.hf_path,
+            f"{result.filbench_score:.2f}" if result.ok else "-",
+            f"{result.elapsed:.2f}",
+            "[green]OK[/green]" if result.ok else f"[red]{escape(result.error)}[/red]",
+        )
+
+    console.print(table)
+    n_ok = sum(result.ok for result in results)
+    throughput = len(results) / wall_time if wall_time > 0 else float("inf")
+    console.print(
+        f"[bold]Scored:[/bold] {n_ok}/{len(results)} models in {wall_time:.2f}s "
+        f"({throughput:.2f} models/sec)"
+    )
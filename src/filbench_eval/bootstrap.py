@@ -0,0 +1,179 @@
+from typing import Any, Optional
+
+import numpy as np
+
+from .compute_score import compile_tasks
+from .details import detail_configs, load_details, sample_metrics
+
+# Above this many distinct values, resample indices instead of value counts
+MAX_UNIQUE_VALUES = 64
+# Upper bound on the number of elements in a (resamples, samples) index chunk
+CHUNK_ELEMENTS = 2**22
+
+
+def bootstrap_means(
+    values: np.ndarray,
+    n_resamples: int,
+    rng: np.random.Generator,
+    chunk_elements: int = CHUNK_ELEMENTS,
+) -> np.ndarray:
+    """Draw bootstrap replicates of the mean of a sample
+
+    Metrics like accuracy only take a handful of distinct values, so resampling
+    with replacement is the same as drawing how many times each distinct value
+    is picked from a multinomial. That needs (n_resamples x n_unique) numbers
+    instead of (n_resamples x n_samples) indices. Continuous metrics (e.g.,
+    ROUGE-L) fall back to resampling indices in bounded chunks.
+
+    values (np.ndarray): the per-sample metric values.
+    n_resamples (int): the number of bootstrap replicates.
+    rng (np.random.Generator): the random number generator.
+    chunk_elements (int): maximum size of an index chunk when resampling indices.
+    RETURNS (np.ndarray): the (n_resamples,) replicate means.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n == 0:
+        return np.zeros(n_resamples)
+
+    unique, counts = np.unique(values, return_counts=True)
+    if len(unique) <= MAX_UNIQUE_VALUES:
+        draws = rng.multinomial(n, counts / n, size=n_resamples)
+        return draws @ unique / n
+
+    means = np.empty(n_resamples)
+    rows_per_chunk = max(1, chunk_elements // n)
+    for start in range(0, n_resamples, rows_per_chunk):
+        stop = min(start + rows_per_chunk, n_resamples)
+        indices = rng.integers(0, n, size=(stop - start, n))
+        means[start:stop] = values[indices].mean(axis=1)
+    return means
+
+
+def bootstrap_report(
+    task_samples: dict[str, list[np.ndarray]],
+    n_resamples: int = 10_000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Compute bootstrap confidence intervals for the task, category and FilBench scores
+
+    Each task is resampled independently, and tasks made of several subsets are
+    stratified by subset (the task score is the average of its subset scores).
+    The replicates are then aggregated with the same sample weights as
+    `compute_filbench_score`, so the intervals account for every level.
+
+    task_samples (dict[str, list[np.ndarray]]): per-sample metric values of each
+        benchmark, with one array per subset.
+    n_resamples (int): the number of bootstrap replicates.
+    confidence (float): the confidence level of the intervals.
+    seed (int): the random seed.
+    RETURNS (dict[str, Any]): the point estimates and intervals at every level.
+    """
+    compiled = compile_tasks()
+    rng = np.random.default_rng(seed)
+    point = np.zeros(len(compiled.benchmarks))
+    replicates = np.zeros((n_resamples, len(compiled.benchmarks)))
+    num_samples = {}
+    for idx, benchmark in enumerate(compiled.benchmarks):
+        subsets = [np.asarray(s, dtype=float) for s in task_samples.get(benchmark, [])]
+        subsets = [s for s in subsets if len(s)]
+        if not subsets:
+            continue
+        point[idx] = np.mean([s.mean() for s in subsets])
+        replicates[:, idx] = np.mean(
+            [bootstrap_means(s, n_resamples, rng) for s in subsets], axis=0
+        )
+        num_samples[benchmark] = int(sum(len(s) for s in subsets))
+
+    point *= compiled.scale
+    replicates *= compiled.scale
+    category_point = compiled.weights @ point
+    category_replicates = replicates @ compiled.weights.T
+    filbench_replicates = category_replicates.mean(axis=1)
+
+    alpha = (1.0 - confidence) / 2
+    quantiles = [alpha, 1.0 - alpha]
+
+    def _interval(estimate: float, samples: np.ndarray) -> dict[str, float]:
+        lower, upper = np.quantile(samples, quantiles)
+        return {
+            "score": float(estimate),
+            "lower": float(lower),
+            "upper": float(upper),
+            "stderr": float(samples.std(ddof=1)),
+        }
+
+    return {
+        "n_resamples": n_resamples,
+        "confidence": confidence,
+        "seed": seed,
+        "tasks": {
+            benchmark: {
+                **_interval(point[idx], replicates[:, idx]),
+                "num_samples": num_samples[benchmark],
+            }
+            for idx, benchmark in enumerate(compiled.benchmarks)
+            if benchmark in num_samples
+        },
+        "category_scores": {
+            category: _interval(category_point[idx], category_replicates[:, idx])
+            for idx, category in enumerate(compiled.categories)
+        },
+        "filbench_score": _interval(category_point.mean(), filbench_replicates),
+    }
+
+
+def load_task_samples(
+    dataset_id: str, revision: Optional[str] = None
+) -> dict[str, list[np.ndarray]]:
+    """Load the per-sample metric values of every FilBench task from the details splits"""
+    compiled = compile_tasks()
+    metrics = dict(zip(compiled.benchmarks, compiled.metrics))
+    task_samples = {}
+    for benchmark, configs in detail_configs(dataset_id, revision=revision).items():
+        task_samples[benchmark] = [
+            sample_metrics(
+                load_details(dataset_id, config, ["metrics"], revision=revision),
+                metrics[benchmark],
+            )
+            for config in configs
+        ]
+    return task_samples
+
+
+def pretty_bootstrap(report: dict[str, Any]):
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    pct = round(report["confidence"] * 100)
+    table = Table(title=f"FilBench Scores with {pct}% Bootstrap CIs")
+    table.add_column("Task / Category", justify="left", style="cyan", no_wrap=True)
+    table.add_column("Score", justify="right", style="magenta")
+    table.add_column(f"{pct}% CI", justify="right")
+    table.add_column("N", justify="right")
+    for benchmark, interval in report["tasks"].items():
+        table.add_row(
+            benchmark,
+            f"{interval['score']:.2f}",
+            f"[{interval['lower']:.2f}, {interval['upper']:.2f}]",
+            str(interval["num_samples"]),
+        )
+    table.add_section()
+    for category, interval in report["category_scores"].items():
+        table.add_row(
+            f"[bold]{category}[/bold]",
+            f"{interval['score']:.2f}",
+            f"[{interval['lower']:.2f}, {interval['upper']:.2f}]",
+            "",
+        )
+    table.add_section()
+    interval = report["filbench_score"]
+    table.add_row(
+        "[bold]FilBench Score[/bold]",
+        f"{interval['score']:.2f}",
+        f"[{interval['lower']:.2f}, {interval['upper']:.2f}]",
+        "",
+    )
+    console.print(table)
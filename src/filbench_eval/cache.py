@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from .files import atomic_write
+
+DEFAULT_CACHE_DIR = Path(
+    os.getenv("FILBENCH_CACHE", Path.home() / ".cache" / "filbench")
+)
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024  # 256 MB
+DEFAULT_REVISION_TTL = 300.0  # seconds a resolved branch name is reused
+
+_COMMIT_SHA = re.compile(r"^[0-9a-f]{40}$")
+
+
+class ResultsCache:
+    """Content-addressed on-disk cache of parsed results
+
+    Each entry is the `{config, results, versions}` dictionary returned by
+    `parse_outputs`, keyed by the dataset ID and the commit hash it was parsed
+    from. Because a commit hash never changes its contents, entries never need
+    to be invalidated, only evicted. Eviction is least-recently-used: every
+    cache hit bumps the entry's mtime, and the oldest entries are removed once
+    the cache grows past `max_size` bytes.
+
+    Resolving a branch name into a commit hash takes a round-trip to the Hub,
+    so resolutions are kept in `revisions/` for `revision_ttl` seconds. They
+    also tell which entry to fall back to when the Hub can't be reached.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_CACHE_DIR / "results",
+        max_size: int = DEFAULT_MAX_SIZE,
+        revision_ttl: float = DEFAULT_REVISION_TTL,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.revision_ttl = revision_ttl
+
+    def key(self, dataset_id: str, revision: str) -> str:
+        return hashlib.sha256(f"{dataset_id}@{revision}".encode()).hexdigest()
+
+    def path(self, dataset_id: str, revision: str) -> Path:
+        return self.cache_dir / f"{self.key(dataset_id, revision)}.json"
+
+    def get(self, dataset_id: str, revision: str) -> Optional[dict[str, Any]]:
+        path = self.path(dataset_id, revision)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return entry.get("parsed_results")
+
+    def put(self, dataset_id: str, revision: str, parsed_results: dict[str, Any]):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "dataset_id": dataset_id,
+            "revision": revision,
+            "parsed_results": parsed_results,
+        }
+        atomic_write(self.path(dataset_id, revision), json.dumps(entry))
+        self.evict()
+
+    def resolve(
+        self, dataset_id: str, revision: Optional[str] = None, refresh: bool = False
+    ) -> Optional[str]:
+        """Resolve a branch, tag or None (main) into a commit hash, reusing recent resolutions
+
+        dataset_id (str): The Hugging Face dataset ID.
+        revision (Optional[str]): a branch, tag or commit hash.
+        refresh (bool): if True, ask the Hub even if the revision was resolved recently.
+        RETURNS (Optional[str]): the commit hash, or None if it cannot be resolved (e.g., offline).
+        """
+        if revision and _COMMIT_SHA.match(revision):
+            return revision
+        resolved = self._read_resolution(dataset_id, revision)
+        if (
+            resolved
+            and not refresh
+            and time.time() - resolved["resolved_at"] < self.revision_ttl
+        ):
+            return resolved["sha"]
+        commit_hash = resolve_revision(dataset_id, revision)
+        if commit_hash:
+            entry = {"sha": commit_hash, "resolved_at": time.time()}
+            self._revision_path(dataset_id, revision).parent.mkdir(
+                parents=True, exist_ok=True
+            )
+            atomic_write(self._revision_path(dataset_id, revision), json.dumps(entry))
+        return commit_hash
+
+    def latest(
+        self, dataset_id: str, revision: Optional[str] = None
+    ) -> Optional[tuple[str, dict[str, Any]]]:
+        """The newest cached entry of a dataset, for when its revision can't be resolved
+
+        The last commit `revision` resolved to is tried first, then the most
+        recently used entry of the dataset.
+
+        RETURNS (Optional[tuple[str, dict[str, Any]]]): the commit hash and parsed results, if any.
+        """
+        resolved = self._read_resolution(dataset_id, revision)
+        if resolved:
+            parsed_results = self.get(dataset_id, resolved["sha"])
+            if parsed_results is not None:
+                return resolved["sha"], parsed_results
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        for _, path in sorted(entries, reverse=True):
+            try:
+                with open(path, "r") as f:
+                    entry = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if entry.get("dataset_id") == dataset_id:
+                return entry["revision"], entry["parsed_results"]
+        return None
+
+    def _revision_path(self, dataset_id: str, revision: Optional[str]) -> Path:
+        return (
+            self.cache_dir
+            / "revisions"
+            / f"{self.key(dataset_id, revision or 'main')}.json"
+        )
+
+    def _read_resolution(
+        self, dataset_id: str, revision: Optional[str]
+    ) -> Optional[dict[str, Any]]:
+        try:
+            with open(self._revision_path(dataset_id, revision), "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def evict(self):
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+
+def resolve_revision(dataset_id: str, revision: Optional[str] = None) -> Optional[str]:
+    """Resolve a branch, tag or None (main) into the commit hash of a dataset
+
+    dataset_id (str): The Hugging Face dataset ID.
+    revision (Optional[str]): a branch, tag or commit hash.
+    RETURNS (Optional[str]): the commit hash, or None if it cannot be resolved (e.g., offline).
+    """
+    if revision and _COMMIT_SHA.match(revision):
+        return revision
+
+    from huggingface_hub import HfApi
+
+    try:
+        return HfApi().dataset_info(dataset_id, revision=revision).sha
+    except Exception:
+        return None
@@ -1,28 +1,104 @@
 import json
+import re
 from copy import deepcopy
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Optional
 
 import numpy as np
-from datasets import DownloadMode, load_dataset
-from rich.console import Console
-from rich.table import Table
+from wasabi import msg
 
+from .cache import ResultsCache
 
-def compute_score(hf_path: str) -> dict[str, Any]:
-    parsed_results = parse_outputs(hf_path)
-    filbench_score, category_scores = compute_filbench_score(
-        parsed_results.get("results")
-    )
 
+def compute_score(
+    hf_path: str,
+    cache: Optional[ResultsCache] = None,
+    refresh: bool = False,
+    revision: Optional[str] = None,
+    preview: Optional[dict[str, int]] = None,
+    backend: str = "datasets",
+) -> dict[str, Any]:
+    """Compute the FilBench score and its breakdown for a given model
+
+    hf_path (str): The Hugging Face dataset ID containing the results.
+    cache (Optional[ResultsCache]): if set, reuse parsed results for the same dataset commit.
+    refresh (bool): if True, ignore cached entries and redownload the dataset.
+    revision (Optional[str]): the branch, tag or commit hash of the dataset to score.
+    preview (Optional[dict[str, int]]): the subsample size of each previewed benchmark (see `build_report`).
+    backend (str): "datasets" to load the results config with `parse_outputs`, or "http"
+        to download only the results files (see `fetch.HubFetcher`, which has its own cache).
+    RETURNS (dict[str, Any]): the parsed results together with the category and FilBench scores.
+    """
+    if backend == "http":
+        from .fetch import HubFetcher
+
+        runs = HubFetcher().fetch_runs(hf_path, revision=revision, refresh=refresh)
+        parsed_results = merge_runs(run for _, run in runs)
+        return build_report(parsed_results, preview=preview)
+    if backend != "datasets":
+        raise ValueError(f"Unknown backend: {backend}. Use 'datasets' or 'http'.")
+
+    parsed_results = None
+    commit_hash = None
+    if cache is not None:
+        commit_hash = cache.resolve(hf_path, revision, refresh=refresh)
+        if commit_hash and not refresh:
+            parsed_results = cache.get(hf_path, commit_hash)
+        elif commit_hash is None and not refresh:
+            # The Hub can't be reached: the newest cached results beat a failed download
+            fallback = cache.latest(hf_path, revision)
+            if fallback is not None:
+                cached_hash, parsed_results = fallback
+                msg.warn(
+                    f"Could not resolve the revision of {hf_path}. "
+                    f"Using cached results from commit {cached_hash[:8]}, which may be outdated."
+                )
+
+    if parsed_results is None:
+        parsed_results = parse_outputs(
+            hf_path, force_download=refresh, revision=commit_hash or revision
+        )
+        if cache is not None and commit_hash:
+            cache.put(hf_path, commit_hash, parsed_results)
+
+    return build_report(parsed_results, preview=preview)
+
+
+def build_report(
+    parsed_results: dict[str, Any], preview: Optional[dict[str, int]] = None
+) -> dict[str, Any]:
+    """Add the category and FilBench scores to the output of `parse_outputs`
+
+    parsed_results (dict[str, Any]): the output of `parse_outputs`.
+    preview (Optional[dict[str, int]]): the subsample size of each previewed benchmark
+        (see `filbench preview`). If set, preview runs stand in for the benchmarks
+        that weren't run in full, and the report includes their standard errors.
+    RETURNS (dict[str, Any]): the parsed results together with the category and FilBench scores.
+    """
     model_report = deepcopy(parsed_results)
+    results = parsed_results.get("results")
+    if preview is not None:
+        results, sample_sizes = preview_results(results, preview)
+        estimate = estimate_filbench_score(results, sample_sizes)
+        model_report.update({"results": results, "preview": estimate})
+    filbench_score, category_scores = compute_filbench_score(results)
+
     model_report.update({"category_scores": category_scores})
     model_report.update({"filbench_score": filbench_score})
     return model_report
 
 
+def default_output_path(hf_path: str) -> Path:
+    return Path(f"scores_{hf_path.replace('/', '___')}.json")
+
+
 def pretty_report(model_report: dict[str, Any], output_path: str):
+    from rich.console import Console
+    from rich.table import Table
+
     console = Console()
     config = model_report.get("config", {})
     model_name = config.get("model_name", "Unknown Model")
@@ -43,17 +119,24 @@ def pretty_report(model_report: dict[str, Any], output_path: str):
     )
 
 
-def parse_outputs(dataset_id: str, force_download: bool = False) -> dict[str, Any]:
+def parse_outputs(
+    dataset_id: str, force_download: bool = False, revision: Optional[str] = None
+) -> dict[str, Any]:
     """Parse a dataset ID and output a dataframe containing the relevant fields
 
     Based from: https://huggingface.co/docs/lighteval/en/saving-and-reading-results
 
     dataset_id (str): The Hugging Face dataset ID.
+    force_download (bool): if True, redownload the dataset instead of reusing the local copy.
+    revision (Optional[str]): the branch, tag or commit hash of the dataset.
     RETURNS (dict[str, Any]): A dictionary containing the metrics and versions for each task.
     """
+    from datasets import DownloadMode, load_dataset
+
     ds = load_dataset(
         dataset_id,
         "results",
+        revision=revision,
         trust_remote_code=True,
         download_mode=(
             DownloadMode.FORCE_REDOWNLOAD
@@ -62,20 +145,105 @@ def parse_outputs(dataset_id: str, force_download: bool = False) -> dict[str, An
         ),
     )
 
+    runs = []
+    for run in ds.keys():
+        df = ds[run].to_pandas()
+        runs.append(
+            {
+                "results": json.loads(df.results.iloc[0]),
+                "versions": json.loads(df.versions.iloc[0]),
+            }
+        )
+
+    latest_config = json.loads(ds["latest"].to_pandas().config_general.iloc[0])
+    return merge_runs(runs, config_general=latest_config)
+
+
+# Only these fields of a run are needed to score it
+RUN_FIELDS = ("config_general", "results", "versions", "summary_tasks")
+
+
+def load_runs(
+    dataset_id: str, revision: Optional[str] = None
+) -> list[tuple[str, dict[str, Any]]]:
+    """Load every run of a lighteval results dataset, oldest first
+
+    dataset_id (str): The Hugging Face dataset ID.
+    revision (Optional[str]): the branch, tag or commit hash of the dataset.
+    RETURNS (list[tuple[str, dict[str, Any]]]): the timestamp (split name) and
+        decoded results of each run, with the `latest` alias left out.
+    """
+    from datasets import load_dataset
+
+    ds = load_dataset(dataset_id, "results", revision=revision, trust_remote_code=True)
+    runs = []
+    for split in sorted(ds.keys()):
+        if split == "latest":
+            continue
+        row = ds[split][0]
+        runs.append(
+            (
+                split,
+                {
+                    field: json.loads(row[field])
+                    for field in RUN_FIELDS
+                    if row.get(field)
+                },
+            )
+        )
+    return runs
+
+
+def merge_runs(
+    runs: Iterable[dict[str, Any]], config_general: Optional[dict[str, Any]] = None
+) -> dict[str, Any]:
+    """Merge lighteval runs into a single set of results
+
+    Runs must be ordered from oldest to newest so that the latest run of a task
+    takes precedence over earlier ones. Tasks that were run as sample shards
+    (see `shard_name`) are merged back into a single result once every shard
+    is present.
+
+    runs (Iterable[dict[str, Any]]): decoded lighteval results, each with a `results` and `versions` field.
+    config_general (Optional[dict[str, Any]]): the general config to report. Defaults to the one of the last run.
+    RETURNS (dict[str, Any]): A dictionary containing the metrics and versions for each task.
+    """
     # Save all metrics and versions for each task
     metrics = {}
     versions = {}
-    for run in ds.keys():
-        df = ds[run].to_pandas()
-        for task, result in json.loads(df.results.iloc[0]).items():
+    last_config = {}
+    # Index of the run each result comes from, to resolve full runs vs. shards
+    run_index = {}
+    shards: dict[tuple[str, int], dict[int, tuple[int, dict[str, Any]]]] = {}
+    for idx, run in enumerate(runs):
+        for task, result in run.get("results", {}).items():
             if task != "all":
                 _, benchmark, n_shots = task.split("|")
                 if int(n_shots) == 0:
-                    metrics[benchmark] = result
+                    shard = parse_shard(benchmark)
+                    if shard:
+                        base, index, n_shards = shard
+                        shards.setdefault((base, n_shards), {})[index] = (idx, result)
+                    else:
+                        metrics[benchmark] = result
+                        run_index[benchmark] = idx
 
-        versions.update(json.loads(df.versions.iloc[0]))
+        versions.update(run.get("versions", {}))
+        last_config = run.get("config_general") or last_config
 
-    latest_config = json.loads(ds["latest"].to_pandas().config_general.iloc[0])
+    num_samples = {task.value.benchmark: task.value.num_samples for task in Tasks}
+    for (benchmark, n_shards), parts in shards.items():
+        if sorted(parts) != list(range(n_shards)):
+            continue  # some shards haven't been run yet
+        idx = max(part_idx for part_idx, _ in parts.values())
+        if idx > run_index.get(benchmark, -1):
+            metrics[benchmark] = merge_shards(
+                [parts[shard][1] for shard in range(n_shards)],
+                num_samples=num_samples.get(benchmark),
+            )
+            run_index[benchmark] = idx
+
+    latest_config = config_general if config_general is not None else last_config
     model_config = {
         "model_name": latest_config.get("model_name"),
         "model_dtype": latest_config.get("model_dtype"),
@@ -89,38 +257,228 @@ def parse_outputs(dataset_id: str, force_download: bool = False) -> dict[str, An
     }
 
 
-def compute_filbench_score(scores: dict[str, Any]) -> tuple[float, dict[str, Any]]:
-    results = {}
-    for task in Tasks:
-        task = task.value
-        if scores.get(task.benchmark):
-            score = scores.get(task.benchmark).get(task.metric)
-            if "acc_" in task.metric:
-                score = score * 100.0
-            if "rougeL" in task.metric:
-                score = score * 100.0
-            results[task.benchmark] = score
+# Large tasks can be run in several jobs, each on a contiguous slice of the samples
+_SHARD = re.compile(r"^(?P<benchmark>.+)-shard-(?P<index>\d+)-of-(?P<n_shards>\d+)$")
+
+
+def shard_name(benchmark: str, index: int, n_shards: int) -> str:
+    """Return the lighteval task name of a sample shard, e.g. balita_tgl_mcf-shard-0-of-4"""
+    return f"{benchmark}-shard-{index}-of-{n_shards}"
+
+
+def parse_shard(benchmark: str) -> Optional[tuple[str, int, int]]:
+    """Parse a shard task name into its benchmark, shard index and number of shards"""
+    match = _SHARD.match(benchmark)
+    if not match:
+        return None
+    return match["benchmark"], int(match["index"]), int(match["n_shards"])
+
+
+def shard_sizes(num_samples: int, n_shards: int) -> list[int]:
+    """Split samples into contiguous shards whose sizes differ by at most one"""
+    size, remainder = divmod(num_samples, n_shards)
+    return [size + (index < remainder) for index in range(n_shards)]
+
+
+def merge_shards(
+    shards: list[dict[str, Any]], num_samples: Optional[int] = None
+) -> dict[str, Any]:
+    """Merge the metrics of sample shards into the metrics of the full task
+
+    Means are weighted by the number of samples in each shard, and standard
+    errors are combined as those of a weighted mean of independent shards.
+
+    shards (list[dict[str, Any]]): the metrics of each shard, in shard order.
+    num_samples (Optional[int]): the number of samples of the full task. Shards are weighted equally if not set.
+    RETURNS (dict[str, Any]): the metrics of the full task.
+    """
+    sizes = shard_sizes(num_samples, len(shards)) if num_samples else [1] * len(shards)
+    weights = np.array(sizes, dtype=float) / sum(sizes)
+    merged = {}
+    for metric in shards[0]:
+        values = [shard.get(metric) for shard in shards]
+        if not all(isinstance(value, (int, float)) for value in values):
+            continue
+        values = np.array(values, dtype=float)
+        if metric.endswith("_stderr"):
+            merged[metric] = float(np.sqrt(np.sum((weights * values) ** 2)))
         else:
-            results[task.benchmark] = None
-
-    # Compute weighted average for each category
-    aggregate_results = {}
-    for task_category in TaskCategory:
-        tasks = [task.value for task in Tasks if task.value.category == task_category]
-        total_category = sum([task.num_samples for task in tasks])
-        weighted_total_category = 0
-        for task in tasks:
-            if results[task.benchmark]:
-                score = results[task.benchmark]
-            else:
-                score = 0
-            weighted_total_category += score * task.num_samples
-        aggregate_results[task_category.value] = (
-            weighted_total_category / total_category
-        )
+            merged[metric] = float(weights @ values)
+    return merged
+
+
+# Preview runs evaluate a stratified subsample of a task, e.g. filbench|balita_tgl_mcf-preview|0
+PREVIEW_SUFFIX = "-preview"
+
+
+def preview_name(benchmark: str) -> str:
+    """Return the lighteval task name of a preview, keeping the subset (e.g. include_tgl_mcf-preview:_average)"""
+    name, sep, subset = benchmark.partition(":")
+    return f"{name}{PREVIEW_SUFFIX}{sep}{subset}"
+
+
+def preview_results(
+    results: dict[str, Any], preview: dict[str, int]
+) -> tuple[dict[str, Any], dict[str, int]]:
+    """Substitute preview runs for the benchmarks that weren't run in full
+
+    results (dict[str, Any]): the `results` field of `parse_outputs`.
+    preview (dict[str, int]): the subsample size of each previewed benchmark.
+    RETURNS (tuple[dict[str, Any], dict[str, int]]): the results with previews
+        under their benchmark names, and the number of samples behind each benchmark.
+    """
+    num_samples = {task.value.benchmark: task.value.num_samples for task in Tasks}
+    merged, sample_sizes = dict(results), {}
+    for benchmark, population in num_samples.items():
+        if benchmark in results:
+            sample_sizes[benchmark] = population
+        elif preview_name(benchmark) in results and benchmark in preview:
+            merged[benchmark] = results[preview_name(benchmark)]
+            sample_sizes[benchmark] = min(preview[benchmark], population)
+    return merged, sample_sizes
+
+
+def estimate_filbench_score(
+    scores: dict[str, Any], sample_sizes: dict[str, int]
+) -> dict[str, Any]:
+    """Estimate the FilBench score and its standard error from subsampled task results
+
+    Each task's standard error is the one reported by lighteval, shrunk by the
+    finite population correction since the subsample is drawn without
+    replacement from `Task.num_samples` examples (a task run in full has no
+    sampling error). Errors are propagated through the same category weights
+    as `compute_filbench_score`, assuming tasks are independent.
+
+    scores (dict[str, Any]): the results of each benchmark.
+    sample_sizes (dict[str, int]): the number of samples each result is based on.
+    RETURNS (dict[str, Any]): the estimates and standard errors at every level.
+    """
+    compiled = compile_tasks()
+    values, mask = results_matrix([scores])
+    filbench_scores, category_scores = score_matrix(values, mask)
+    populations = [task.value.num_samples for task in Tasks]
+    stderr = np.zeros(len(compiled.benchmarks))
+    for j, (benchmark, metric) in enumerate(zip(compiled.benchmarks, compiled.metrics)):
+        n, population = sample_sizes.get(benchmark, 0), populations[j]
+        if not mask[0, j] or n >= population or n < 2:
+            continue
+        task_stderr = scores[benchmark].get(f"{metric}_stderr")
+        if task_stderr is None:
+            # Worst case for a metric in [0, 1]
+            task_stderr = np.sqrt(0.25 / (n - 1))
+        stderr[j] = task_stderr * np.sqrt((population - n) / (population - 1))
+    stderr *= compiled.scale
+    category_stderr = np.sqrt((compiled.weights**2) @ stderr**2)
+    filbench_stderr = np.sqrt(np.sum(category_stderr**2)) / len(category_stderr)
+    return {
+        "filbench_score": {
+            "score": float(filbench_scores[0]),
+            "stderr": float(filbench_stderr),
+        },
+        "category_scores": {
+            category: {
+                "score": float(category_scores[0, idx]),
+                "stderr": float(category_stderr[idx]),
+            }
+            for idx, category in enumerate(compiled.categories)
+        },
+        "sample_sizes": {
+            benchmark: sample_sizes[benchmark]
+            for benchmark in compiled.benchmarks
+            if benchmark in sample_sizes
+        },
+    }
+
+
+def compute_filbench_score(scores: dict[str, Any]) -> tuple[float, dict[str, Any]]:
+    values, mask = results_matrix([scores])
+    filbench_scores, category_scores = score_matrix(values, mask)
+    categories = compile_tasks().categories
+    aggregate_results = {
+        category: float(category_scores[0, idx])
+        for idx, category in enumerate(categories)
+    }
+    return float(filbench_scores[0]), aggregate_results
+
+
+@dataclass(frozen=True)
+class CompiledTasks:
+    benchmarks: tuple[str, ...]  # benchmark name of each task column
+    metrics: tuple[str, ...]  # metric of each task column
+    categories: tuple[str, ...]  # category name of each category row
+    scale: np.ndarray  # (n_tasks,) multiplier to bring each metric to a 0-100 scale
+    weights: np.ndarray  # (n_categories, n_tasks) sample weights, each row sums to 1
+
+
+@lru_cache(maxsize=None)
+def compile_tasks() -> CompiledTasks:
+    """Compile the Tasks registry into arrays for scoring many models at once"""
+    tasks = [task.value for task in Tasks]
+    categories = list(TaskCategory)
+    scale = np.array(
+        [
+            100.0 if ("acc_" in task.metric or "rougeL" in task.metric) else 1.0
+            for task in tasks
+        ]
+    )
+    # Each category score is the average of its tasks weighted by number of samples
+    weights = np.array(
+        [
+            [task.num_samples if task.category == category else 0 for task in tasks]
+            for category in categories
+        ],
+        dtype=float,
+    )
+    weights /= weights.sum(axis=1, keepdims=True)
+    scale.setflags(write=False)
+    weights.setflags(write=False)
+    return CompiledTasks(
+        benchmarks=tuple(task.benchmark for task in tasks),
+        metrics=tuple(task.metric for task in tasks),
+        categories=tuple(category.value for category in categories),
+        scale=scale,
+        weights=weights,
+    )
 
-    average = np.mean(list(aggregate_results.values()))
-    return average, aggregate_results
+
+def results_matrix(
+    scores_per_model: list[dict[str, Any]],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Gather the raw metric of each task for several models
+
+    scores_per_model (list[dict[str, Any]]): the `results` field of each model's parsed outputs.
+    RETURNS (tuple[np.ndarray, np.ndarray]): the (n_models, n_tasks) metric values
+        and a boolean mask of the same shape that is True where a value is present.
+    """
+    compiled = compile_tasks()
+    values = np.zeros((len(scores_per_model), len(compiled.benchmarks)))
+    mask = np.zeros(values.shape, dtype=bool)
+    for i, scores in enumerate(scores_per_model):
+        for j, (benchmark, metric) in enumerate(
+            zip(compiled.benchmarks, compiled.metrics)
+        ):
+            result = scores.get(benchmark)
+            score = result.get(metric) if result else None
+            if score is not None:
+                values[i, j] = score
+                mask[i, j] = True
+    return values, mask
+
+
+def score_matrix(values: np.ndarray, mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the FilBench and category scores for a matrix of model results
+
+    Missing tasks count as a score of 0 in their category's weighted average.
+
+    values (np.ndarray): the (n_models, n_tasks) metric values from `results_matrix`.
+    mask (np.ndarray): the (n_models, n_tasks) boolean mask of present values.
+    RETURNS (tuple[np.ndarray, np.ndarray]): the (n_models,) FilBench scores and
+        the (n_models, n_categories) category scores.
+    """
+    compiled = compile_tasks()
+    scaled = np.where(mask, values * compiled.scale, 0.0)
+    category_scores = scaled @ compiled.weights.T
+    return category_scores.mean(axis=1), category_scores
 
 
 class TaskCategory(Enum):
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+from wasabi import msg
+
+from .cache import DEFAULT_CACHE_DIR
+from .compute_score import compile_tasks
+from .details import detail_configs, load_details, sample_metrics
+from .files import atomic_write
+from .metrics import pad_ragged
+
+PREDICTION_DTYPE = np.dtype(np.int16)
+METRIC_DTYPE = np.dtype(np.float32)
+HASH_DTYPE = np.dtype("S32")  # raw sha256 digest of the prompt
+MISSING_PREDICTION = -1
+
+
+@dataclass
+class TaskSamples:
+    """Per-sample arrays of one details config, before they're written to the cube"""
+
+    benchmark: str  # FilBench benchmark the config belongs to
+    metric: str  # metric stored in `metrics`
+    prompt_hashes: np.ndarray  # (n,) sha256 digests of each example
+    gold: np.ndarray  # (n,) gold choice, or -1 for generative tasks
+    predictions: np.ndarray  # (n,) predicted choice, or -1 for generative tasks
+    metrics: np.ndarray  # (n,) per-sample metric value
+
+
+@dataclass
+class CubeTask:
+    """Memory-mapped view of one task in the cube
+
+    Rows of `predictions` and `metrics` follow `models`. Examples that a model
+    didn't evaluate have a prediction of -1 and a NaN metric.
+    """
+
+    name: str  # details config name (e.g., filbench_sib200_tgl_mcf_0)
+    benchmark: str  # FilBench benchmark the config belongs to
+    metric: str  # metric stored in `metrics`
+    models: list[str]  # dataset IDs, one per row
+    prompt_hashes: np.ndarray  # (n_examples,) sha256 digests
+    gold: np.ndarray  # (n_examples,) gold choice
+    predictions: np.ndarray  # (n_models, n_examples) int16 predicted choice
+    metrics: np.ndarray  # (n_models, n_examples) float32 metric value
+
+    def model_index(self, model: str) -> int:
+        return self.models.index(model)
+
+
+class PredictionCube:
+    """Append-only, memory-mappable store of per-sample predictions and metrics
+
+    Each task keeps its examples fixed (those of the first model added), and
+    every model is one row of a raw int16 predictions file and a raw float32
+    metrics file. Adding a model appends a row to each file and then updates
+    `meta.json`, so existing rows are never rewritten and readers only see
+    models whose rows are complete. Re-adding a model overwrites its row in
+    place.
+
+    root/
+    ├── meta.json                   # models, and the shape of each task
+    └── tasks/{config}/
+        ├── prompt_hashes.npy       # (n_examples,) S32
+        ├── gold.npy                # (n_examples,) int16
+        ├── predictions.bin         # (n_models, n_examples) int16
+        └── metrics.bin             # (n_models, n_examples) float32
+    """
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR / "cube"):
+        self.root = Path(root)
+        self.meta_path = self.root / "meta.json"
+        self.meta = self._load_meta()
+
+    def _load_meta(self) -> dict[str, Any]:
+        if self.meta_path.exists():
+            with open(self.meta_path, "r") as f:
+                return json.load(f)
+        return {"models": [], "tasks": {}}
+
+    def _save_meta(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.meta_path, json.dumps(self.meta, indent=2))
+
+    @property
+    def models(self) -> list[str]:
+        return list(self.meta["models"])
+
+    @property
+    def tasks(self) -> list[str]:
+        return list(self.meta["tasks"])
+
+    def task_dir(self, task: str) -> Path:
+        return self.root / "tasks" / task
+
+    def open(self, task: str) -> CubeTask:
+        """Open a task without reading its predictions and metrics into memory"""
+        info = self.meta["tasks"][task]
+        task_dir = self.task_dir(task)
+        shape = (len(info["models"]), info["n_examples"])
+        return CubeTask(
+            name=task,
+            benchmark=info["benchmark"],
+            metric=info["metric"],
+            models=list(info["models"]),
+            prompt_hashes=np.load(task_dir / "prompt_hashes.npy", mmap_mode="r"),
+            gold=np.load(task_dir / "gold.npy", mmap_mode="r"),
+            predictions=_memmap(task_dir / "predictions.bin", PREDICTION_DTYPE, shape),
+            metrics=_memmap(task_dir / "metrics.bin", METRIC_DTYPE, shape),
+        )
+
+    def add_model(self, model: str, samples: dict[str, TaskSamples]):
+        """Add (or replace) the per-sample results of a model
+
+        Samples are matched to the examples of each task by prompt hash. Samples
+        of examples the task doesn't have (e.g. after a prompt format change)
+        are left out with a warning, and a model sharing no example with a
+        task is rejected before anything is written.
+
+        model (str): the dataset ID of the model's results.
+        samples (dict[str, TaskSamples]): the per-sample arrays of each details config.
+        """
+        alignments = {}
+        for task, task_samples in samples.items():
+            if task not in self.meta["tasks"]:
+                continue
+            positions, known = self._align(task, task_samples)
+            if len(known) and not known.any():
+                raise ValueError(
+                    f"None of the prompts of {model} on {task} match the examples "
+                    "in the cube. Were they built with a different prompt format?"
+                )
+            if not known.all():
+                msg.warn(
+                    f"{(~known).sum()} of {len(known)} prompts of {model} on {task} "
+                    "aren't examples of the cube, skipping them."
+                )
+            alignments[task] = positions, known
+        for task, task_samples in samples.items():
+            if task not in self.meta["tasks"]:
+                self._create_task(task, task_samples)
+                alignments[task] = self._align(task, task_samples)
+            self._write_row(model, task, task_samples, *alignments[task])
+        if model not in self.meta["models"]:
+            self.meta["models"].append(model)
+        self._save_meta()
+
+    def task_samples(self, model: str) -> dict[str, list[np.ndarray]]:
+        """Per-sample metric values of a model, as returned by `bootstrap.load_task_samples`"""
+        task_samples: dict[str, list[np.ndarray]] = {}
+        for task in self.tasks:
+            cube_task = self.open(task)
+            if model not in cube_task.models:
+                continue
+            values = np.asarray(cube_task.metrics[cube_task.model_index(model)])
+            task_samples.setdefault(cube_task.benchmark, []).append(
+                values[~np.isnan(values)].astype(float)
+            )
+        return task_samples
+
+    def _create_task(self, task: str, samples: TaskSamples):
+        # Keep the first row of each prompt so that hashes identify examples
+        _, first = np.unique(samples.prompt_hashes, return_index=True)
+        first.sort()
+        task_dir = self.task_dir(task)
+        task_dir.mkdir(parents=True, exist_ok=True)
+        np.save(task_dir / "prompt_hashes.npy", samples.prompt_hashes[first])
+        np.save(task_dir / "gold.npy", samples.gold[first].astype(PREDICTION_DTYPE))
+        for name in ("predictions.bin", "metrics.bin"):
+            (task_dir / name).write_bytes(b"")
+        self.meta["tasks"][task] = {
+            "benchmark": samples.benchmark,
+            "metric": samples.metric,
+            "n_examples": len(first),
+            "models": [],
+        }
+
+    def _align(self, task: str, samples: TaskSamples) -> tuple[np.ndarray, np.ndarray]:
+        """Find the example of the task of each sample, by prompt hash
+
+        RETURNS (tuple[np.ndarray, np.ndarray]): the position of each sample
+            among the examples, and whether the task has its example at all.
+        """
+        hashes = np.load(self.task_dir(task) / "prompt_hashes.npy")
+        if not len(hashes):
+            n = len(samples.prompt_hashes)
+            return np.zeros(n, dtype=np.int64), np.zeros(n, dtype=bool)
+        order = np.argsort(hashes)
+        found = np.searchsorted(hashes[order], samples.prompt_hashes)
+        found = np.minimum(found, len(hashes) - 1)
+        positions = order[found]
+        return positions, hashes[positions] == samples.prompt_hashes
+
+    def _write_row(
+        self,
+        model: str,
+        task: str,
+        samples: TaskSamples,
+        positions: np.ndarray,
+        known: np.ndarray,
+    ):
+        info = self.meta["tasks"][task]
+        task_dir = self.task_dir(task)
+        predictions = np.full(info["n_examples"], MISSING_PREDICTION, PREDICTION_DTYPE)
+        metrics = np.full(info["n_examples"], np.nan, METRIC_DTYPE)
+        predictions[positions[known]] = samples.predictions[known]
+        metrics[positions[known]] = samples.metrics[known]
+
+        for name, row in (("predictions.bin", predictions), ("metrics.bin", metrics)):
+            path = task_dir / name
+            if model in info["models"]:
+                offset = info["models"].index(model) * row.nbytes
+                with open(path, "r+b") as f:
+                    f.seek(offset)
+                    f.write(row.tobytes())
+                continue
+            # Drop bytes left over by an interrupted append before adding a row
+            os.truncate(path, len(info["models"]) * row.nbytes)
+            with open(path, "ab") as f:
+                f.write(row.tobytes())
+
+        if model not in info["models"]:
+            info["models"].append(model)
+
+
+def load_cube_samples(
+    dataset_id: str, revision: Optional[str] = None, n_workers: int = 8
+) -> dict[str, TaskSamples]:
+    """Load the per-sample arrays of every FilBench details config of a model
+
+    dataset_id (str): The Hugging Face dataset ID.
+    revision (Optional[str]): the branch, tag or commit hash of the dataset.
+    n_workers (int): the number of configs to download concurrently.
+    RETURNS (dict[str, TaskSamples]): the per-sample arrays of each details config.
+    """
+    compiled = compile_tasks()
+    metrics = dict(zip(compiled.benchmarks, compiled.metrics))
+    configs = [
+        (benchmark, config)
+        for benchmark, names in detail_configs(dataset_id, revision=revision).items()
+        for config in names
+    ]
+
+    def _load(benchmark: str, config: str) -> TaskSamples:
+        ds = load_details(dataset_id, config, revision=revision)
+        return details_to_samples(ds, benchmark, metrics[benchmark])
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(_load, *pair) for pair in configs]
+        return {
+            config: future.result() for (_, config), future in zip(configs, futures)
+        }
+
+
+def details_to_samples(ds, benchmark: str, metric: str) -> TaskSamples:
+    """Convert a details split into the arrays stored in the cube
+
+    Multiple-choice predictions are the first choice that lighteval marks as
+    the greedy continuation (or 0 if none is), the same rule as
+    `predictions.project_mcf_details`, so that agreement computed from the
+    cube matches the agreement plots. This can differ from the choice with
+    the highest log-probability, which the stored accuracy is based on.
+    Generative tasks only keep their metric values.
+    """
+    columns = ds.select_columns(["example", "predictions", "gold_index"]).to_dict()
+    n = len(ds)
+    prompt_hashes = np.array(
+        [hashlib.sha256(example.encode()).digest() for example in columns["example"]],
+        dtype=HASH_DTYPE,
+    )
+    if "rougeL" in metric:
+        predictions = gold = np.full(n, MISSING_PREDICTION, PREDICTION_DTYPE)
+    else:
+        # Loglikelihood predictions are (logprob, is_greedy) pairs for each choice
+        is_greedy = pad_ragged(
+            [[bool(choice[1]) for choice in pred] for pred in columns["predictions"]],
+            fill=0,
+        )
+        predictions = is_greedy.argmax(axis=1).astype(PREDICTION_DTYPE)
+        gold = np.array(
+            [
+                gold[0] if len(gold) else MISSING_PREDICTION
+                for gold in columns["gold_index"]
+            ],
+            dtype=PREDICTION_DTYPE,
+        )
+    return TaskSamples(
+        benchmark=benchmark,
+        metric=metric,
+        prompt_hashes=prompt_hashes,
+        gold=gold,
+        predictions=predictions,
+        metrics=sample_metrics(ds, metric).astype(METRIC_DTYPE),
+    )
+
+
+def _memmap(path: Path, dtype: np.dtype, shape: tuple[int, int]) -> np.ndarray:
+    if shape[0] * shape[1] == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
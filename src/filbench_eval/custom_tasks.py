@@ -0,0 +1,178 @@
+import dataclasses
+import hashlib
+import importlib.util
+import json
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from .details import format_task
+
+# Relative to the lighteval directory, where lighteval has to be run from
+DEFAULT_BASE_TASKS = "community_tasks/filbench_evals.py"
+SUBSETS_FILE = "subsets.json"
+CUSTOM_TASKS_FILE = "filbench_subsets.py"
+
+_TEMPLATE = """\
+# lighteval custom tasks generated by `filbench {command}`: every FilBench task of
+# {base_tasks}, plus the sample shards and previews listed in {subsets_file}.
+# Run lighteval from the lighteval directory with --custom-tasks {path}
+from pathlib import Path
+
+from filbench_eval.custom_tasks import load_custom_tasks
+
+TASKS_TABLE = load_custom_tasks(
+    Path(__file__).with_name("{subsets_file}"), base_tasks="{base_tasks}"
+)
+"""
+
+
+@dataclass
+class SampleSubset:
+    config: str  # details config of the full task, e.g. filbench_balita_tgl_mcf_0
+    suffix: str  # appended to the task name, e.g. -shard-0-of-4 or -preview
+    start: Optional[int] = None  # first document of a contiguous subset
+    stop: Optional[int] = None  # end (exclusive) of a contiguous subset
+    indices: Optional[list[int]] = None  # documents of a non-contiguous subset
+
+    @property
+    def positions(self) -> Iterable[int]:
+        if self.indices is not None:
+            return self.indices
+        return range(self.start or 0, self.stop or 0)
+
+
+def write_custom_tasks(
+    subsets: list[SampleSubset],
+    output_dir: Path,
+    command: str,
+    base_tasks: str = DEFAULT_BASE_TASKS,
+) -> Path:
+    """Write a lighteval custom tasks file defining sample shards or previews
+
+    lighteval only runs tasks that its custom tasks file defines, so the
+    `<task>-shard-<i>-of-<k>` and `<task>-preview` specs written by `plan` and
+    `preview` need a file of their own. It is saved next to the subsets, and
+    defines every FilBench task as well, so it replaces the usual
+    `--custom-tasks community_tasks/filbench_evals.py`.
+
+    subsets (list[SampleSubset]): the documents of each shard or preview.
+    output_dir (Path): the directory to write the subsets and the custom tasks file to.
+    command (str): the filbench command that generated the file, for its header.
+    base_tasks (str): the FilBench custom tasks file, relative to the lighteval directory.
+    RETURNS (Path): the path of the custom tasks file.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    subsets_path = output_dir / SUBSETS_FILE
+    with open(subsets_path, "w") as f:
+        json.dump([asdict(subset) for subset in subsets], f)
+    path = output_dir / CUSTOM_TASKS_FILE
+    path.write_text(
+        _TEMPLATE.format(
+            command=command,
+            base_tasks=base_tasks,
+            subsets_file=SUBSETS_FILE,
+            path=path.resolve(),
+        )
+    )
+    return path
+
+
+def load_custom_tasks(
+    subsets_path: Path, base_tasks: str = DEFAULT_BASE_TASKS
+) -> list[Any]:
+    """Build the lighteval TASKS_TABLE of the FilBench tasks and of their sample subsets
+
+    Each subset copies the config of its full task under a new name, with a
+    dataset filter that keeps the subset's documents (see `KeepRows`).
+
+    subsets_path (Path): the subsets written by `write_custom_tasks`.
+    base_tasks (str): path to the FilBench custom tasks module.
+    RETURNS (list[Any]): the `LightevalTaskConfig` of every task.
+    """
+    spec = importlib.util.spec_from_file_location("filbench_evals", base_tasks)
+    if spec is None or spec.loader is None:
+        raise FileNotFoundError(
+            f"Could not import the FilBench tasks from {base_tasks}"
+        )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    tasks = list(module.TASKS_TABLE)
+    by_config = {format_task(f"filbench|{task.name}|0"): task for task in tasks}
+    with open(subsets_path, "r") as f:
+        subsets = [SampleSubset(**subset) for subset in json.load(f)]
+    for subset in subsets:
+        base = by_config.get(subset.config)
+        if base is None:
+            raise ValueError(
+                f"No task of {base_tasks} has the details config {subset.config}"
+            )
+        name, sep, rest = base.name.partition(":")
+        tasks.append(
+            dataclasses.replace(
+                base,
+                name=f"{name}{subset.suffix}{sep}{rest}",
+                hf_filter=KeepRows(base, subset.positions),
+            )
+        )
+    return tasks
+
+
+class KeepRows:
+    """Dataset filter that keeps the rows of a task at some positions
+
+    lighteval only passes the row to the filter, not its index, so rows are
+    matched by content: the evaluation splits of the task are loaded once to
+    count how many copies of each row the positions select. Each match uses up
+    one copy, so a row repeated in the dataset is kept as many times as it is
+    selected, and subsets keep their size. This assumes that each row goes
+    through the filter once, as with lighteval's single `Dataset.filter` call.
+    """
+
+    def __init__(self, base: Any, positions: Iterable[int]):
+        self.hf_repo = base.hf_repo
+        self.hf_subset = base.hf_subset
+        self.hf_revision = getattr(base, "hf_revision", None)
+        self.splits = list(base.evaluation_splits)
+        self.base_filter: Optional[Callable[[dict], bool]] = base.hf_filter
+        self.positions = sorted(positions)
+        self._remaining: Optional[Counter[str]] = None
+
+    def __call__(self, row: dict[str, Any]) -> bool:
+        if self.base_filter is not None and not self.base_filter(row):
+            return False
+        if self._remaining is None:
+            self._remaining = self._count_keys()
+        key = row_key(row)
+        if self._remaining[key] <= 0:
+            return False
+        self._remaining[key] -= 1
+        return True
+
+    def _count_keys(self) -> Counter[str]:
+        rows = [
+            row
+            for split in self.splits
+            for row in _load_split(
+                self.hf_repo, self.hf_subset, split, revision=self.hf_revision
+            )
+            if self.base_filter is None or self.base_filter(row)
+        ]
+        return Counter(row_key(rows[idx]) for idx in self.positions if idx < len(rows))
+
+
+def row_key(row: dict[str, Any]) -> str:
+    """Hash the content of a dataset row"""
+    return hashlib.sha256(
+        json.dumps(row, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _load_split(
+    hf_repo: str, hf_subset: Optional[str], split: str, revision: Optional[str] = None
+) -> Iterable[dict[str, Any]]:
+    from datasets import load_dataset
+
+    return load_dataset(hf_repo, hf_subset, split=split, revision=revision)
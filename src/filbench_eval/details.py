@@ -0,0 +1,91 @@
+import json
+from typing import Any, Optional
+
+import numpy as np
+
+from .compute_score import Tasks
+
+
+def format_task(task_name: str) -> str:
+    """Convert a lighteval task name (e.g., filbench|sib200_tgl_mcf|0) into its details config name"""
+    return task_name.replace("|", "_").replace(":", "_")
+
+
+def detail_configs(
+    dataset_id: str, revision: Optional[str] = None
+) -> dict[str, list[str]]:
+    """Map each FilBench benchmark to the per-sample details configs of a results dataset
+
+    Benchmarks that average over subsets (e.g., global_mmlu_all_tgl_mcf:_average)
+    map to one config per subset. Benchmarks without any details are left out.
+
+    dataset_id (str): The Hugging Face dataset ID.
+    revision (Optional[str]): the branch, tag or commit hash of the dataset.
+    RETURNS (dict[str, list[str]]): the zero-shot details configs for each benchmark.
+    """
+    from datasets import get_dataset_config_names
+
+    config_names = get_dataset_config_names(dataset_id, revision=revision)
+    return match_configs(config_names)
+
+
+def match_configs(config_names: list[str]) -> dict[str, list[str]]:
+    configs: dict[str, list[str]] = {}
+    for task in Tasks:
+        name = task.value.benchmark.split(":")[0]
+        prefix = format_task(f"filbench|{name}|")
+        matches = sorted(
+            config
+            for config in config_names
+            if config == f"{prefix}0"
+            or (
+                ":" in task.value.benchmark
+                and config.startswith(prefix)
+                and config.endswith("_0")
+            )
+        )
+        if matches:
+            configs[task.value.benchmark] = matches
+    return configs
+
+
+def load_details(
+    dataset_id: str,
+    config: str,
+    columns: Optional[list[str]] = None,
+    revision: Optional[str] = None,
+):
+    """Load the latest per-sample details split of a task
+
+    dataset_id (str): The Hugging Face dataset ID.
+    config (str): the details config name (e.g., filbench_sib200_tgl_mcf_0).
+    columns (Optional[list[str]]): if set, only keep these columns.
+    revision (Optional[str]): the branch, tag or commit hash of the dataset.
+    RETURNS (datasets.Dataset): the per-sample details.
+    """
+    from datasets import load_dataset
+
+    ds = load_dataset(dataset_id, config, split="latest", revision=revision)
+    if columns:
+        ds = ds.select_columns(columns)
+    return ds
+
+
+def sample_metrics(ds, metric: str) -> np.ndarray:
+    """Extract the per-sample value of a metric from a details split
+
+    ds (datasets.Dataset): the per-sample details with a `metrics` column.
+    metric (str): the metric name (e.g., acc_ or rougeL).
+    RETURNS (np.ndarray): a float array with one value per sample.
+    """
+    column = ds.with_format("arrow")["metrics"].combine_chunks()
+    if hasattr(column, "field"):
+        # Struct column: read the field straight from Arrow memory
+        return column.field(metric).to_numpy(zero_copy_only=False).astype(float)
+    return np.array([_metric_value(row, metric) for row in column.to_pylist()])
+
+
+def _metric_value(row: Any, metric: str) -> float:
+    if isinstance(row, str):
+        row = json.loads(row)
+    return float(row[metric])
@@ -0,0 +1,250 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Optional
+from urllib.parse import quote
+
+from .cache import DEFAULT_CACHE_DIR
+from .compute_score import RUN_FIELDS, merge_runs
+from .files import atomic_write
+from .local import _RESULTS_FILE, run_timestamp
+
+DEFAULT_MAX_CONNECTIONS = 16
+DEFAULT_RETRIES = 3
+
+
+@dataclass
+class FetchResult:
+    dataset_id: str
+    runs: list[tuple[str, dict[str, Any]]] = field(default_factory=list)  # oldest first
+    revision: Optional[str] = None  # commit hash the runs were read from
+    requests: int = 0  # HTTP requests sent
+    not_modified: int = 0  # requests answered with 304 Not Modified
+    bytes: int = 0  # bytes of payload downloaded
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def parsed_results(self) -> dict[str, Any]:
+        """The runs merged like `parse_outputs` does"""
+        return merge_runs(run for _, run in self.runs)
+
+
+class HubFetcher:
+    """Fetch the results files of lighteval datasets over plain HTTP
+
+    `parse_outputs` builds the whole `results` config with `datasets`, when
+    scoring only needs the small `results_*.json` file of each run. For each
+    dataset, this sends a single request for the commit hash and file list of
+    the revision, then downloads only the results files, for many datasets at
+    once over at most `max_connections` connections. Responses are cached on
+    disk with their ETags, and later fetches send conditional requests: an
+    unchanged dataset costs one `304 Not Modified` and no downloads.
+
+    The Hub endpoint defaults to `HF_ENDPOINT`, so a mirror or a local mock
+    server works the same way.
+    """
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        token: Optional[str] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        cache_dir: Path = DEFAULT_CACHE_DIR / "fetch",
+        retries: int = DEFAULT_RETRIES,
+    ):
+        from huggingface_hub import constants, get_token
+
+        self.endpoint = (endpoint or constants.ENDPOINT).rstrip("/")
+        self.token = token or get_token()
+        self.max_connections = max_connections
+        self.cache_dir = Path(cache_dir)
+        self.retries = retries
+
+    def fetch(
+        self,
+        dataset_ids: Iterable[str],
+        revision: Optional[str] = None,
+        refresh: bool = False,
+    ) -> list[FetchResult]:
+        """Fetch the runs of several datasets concurrently
+
+        dataset_ids (Iterable[str]): the Hugging Face dataset IDs.
+        revision (Optional[str]): the branch, tag or commit hash of every dataset.
+        refresh (bool): if True, ignore the cached responses and download everything again.
+        RETURNS (list[FetchResult]): one result per unique dataset, in input order.
+            Failed datasets have an `error` instead of runs.
+        """
+        return asyncio.run(self.fetch_async(dataset_ids, revision, refresh))
+
+    def fetch_runs(
+        self, dataset_id: str, revision: Optional[str] = None, refresh: bool = False
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Fetch the runs of a single dataset, like `load_runs` does, raising on errors"""
+
+        async def _fetch():
+            async with self._session() as session:
+                result = FetchResult(dataset_id)
+                await self._fetch_one(session, result, revision, refresh)
+                return result.runs
+
+        return asyncio.run(_fetch())
+
+    async def fetch_async(
+        self,
+        dataset_ids: Iterable[str],
+        revision: Optional[str] = None,
+        refresh: bool = False,
+    ) -> list[FetchResult]:
+        async with self._session() as session:
+
+            async def _fetch(dataset_id: str) -> FetchResult:
+                result = FetchResult(dataset_id)
+                start = time.perf_counter()
+                try:
+                    await self._fetch_one(session, result, revision, refresh)
+                except Exception as e:
+                    result.runs = []
+                    result.error = f"{type(e).__name__}: {e}"
+                result.elapsed = time.perf_counter() - start
+                return result
+
+            # Skip duplicates so that two requests never write the same cache entry
+            unique = list(dict.fromkeys(dataset_ids))
+            results = await asyncio.gather(*map(_fetch, unique))
+        return results
+
+    def _session(self):
+        from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        return ClientSession(
+            connector=TCPConnector(limit=self.max_connections),
+            headers=headers,
+            timeout=ClientTimeout(total=120),
+        )
+
+    async def _fetch_one(
+        self,
+        session,
+        result: FetchResult,
+        revision: Optional[str],
+        refresh: bool,
+    ):
+        dataset_id = result.dataset_id
+        state = {} if refresh else self._load_state(dataset_id, revision)
+        info_url = f"{self.endpoint}/api/datasets/{dataset_id}/revision/{quote(revision or 'main', safe='')}"
+        status, body, etag = await self._get(
+            session, result, info_url, state.get("etag")
+        )
+        if status == 304:
+            files = state["files"]
+        else:
+            info = json.loads(body)
+            names = [
+                sibling["rfilename"]
+                for sibling in info.get("siblings", [])
+                if _RESULTS_FILE.match(Path(sibling["rfilename"]).name)
+            ]
+            entries = await asyncio.gather(
+                *(
+                    self._fetch_file(
+                        session, result, info["sha"], name, state.get("files", {})
+                    )
+                    for name in names
+                )
+            )
+            files = dict(zip(names, entries))
+            state = {"etag": etag, "sha": info["sha"], "files": files}
+            self._save_state(dataset_id, revision, state)
+        if not files:
+            raise FileNotFoundError(f"No lighteval results files found in {dataset_id}")
+        result.revision = state["sha"]
+        result.runs = [
+            (run_timestamp(Path(name)), files[name]["run"])
+            for name in sorted(
+                files, key=lambda name: (run_timestamp(Path(name)), name)
+            )
+        ]
+
+    async def _fetch_file(
+        self,
+        session,
+        result: FetchResult,
+        sha: str,
+        name: str,
+        cached: dict[str, Any],
+    ) -> dict[str, Any]:
+        url = (
+            f"{self.endpoint}/datasets/{result.dataset_id}/resolve/{sha}/{quote(name)}"
+        )
+        entry = cached.get(name)
+        status, body, etag = await self._get(
+            session, result, url, entry["etag"] if entry else None
+        )
+        if status == 304:
+            return entry
+        run = json.loads(body)
+        return {
+            "etag": etag,
+            "run": {key: run[key] for key in RUN_FIELDS if key in run},
+        }
+
+    async def _get(
+        self, session, result: FetchResult, url: str, etag: Optional[str]
+    ) -> tuple[int, bytes, Optional[str]]:
+        """GET a URL, conditionally on an ETag, retrying on rate limits and server errors"""
+        from aiohttp import ClientConnectionError
+
+        headers = {"If-None-Match": etag} if etag else {}
+        for attempt in range(self.retries + 1):
+            try:
+                async with session.get(url, headers=headers) as response:
+                    result.requests += 1
+                    if response.status == 304:
+                        result.not_modified += 1
+                        return 304, b"", etag
+                    if response.status == 404:
+                        raise FileNotFoundError(f"Not found on the Hub: {url}")
+                    if response.status == 429 or response.status >= 500:
+                        if attempt < self.retries:
+                            await asyncio.sleep(0.5 * 2**attempt)
+                            continue
+                    response.raise_for_status()
+                    body = await response.read()
+                    result.bytes += len(body)
+                    # LFS files keep the ETag of their content in X-Linked-Etag
+                    new_etag = response.headers.get(
+                        "X-Linked-Etag"
+                    ) or response.headers.get("ETag")
+                    return response.status, body, new_etag
+            except (ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(0.5 * 2**attempt)
+        raise RuntimeError(f"Could not fetch {url}")  # unreachable
+
+    def _state_path(self, dataset_id: str, revision: Optional[str]) -> Path:
+        key = hashlib.sha256(f"{dataset_id}@{revision or 'main'}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def _load_state(self, dataset_id: str, revision: Optional[str]) -> dict[str, Any]:
+        try:
+            with open(self._state_path(dataset_id, revision), "r") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return state if isinstance(state.get("files"), dict) else {}
+
+    def _save_state(
+        self, dataset_id: str, revision: Optional[str], state: dict[str, Any]
+    ):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write(self._state_path(dataset_id, revision), json.dumps(state))
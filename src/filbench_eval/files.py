@@ -0,0 +1,41 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+# mkstemp creates owner-only files, so apply the mode `open` would have used instead
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def atomic_path(path: Path) -> Iterator[str]:
+    """Yield a temporary path to write to, then move it over `path` at once
+
+    The temporary file is created next to `path` so that the rename stays on
+    the same filesystem, and it is removed if writing or renaming fails.
+    Readers of `path` never see a partial file. The file keeps the mode of the
+    file it replaces, or gets the default mode of new files.
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        try:
+            mode = path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def atomic_write(path: Path, text: str):
+    """Replace a text file at once, so that readers never see a partial file"""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w") as f:
+            f.write(text)
@@ -0,0 +1,67 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterator
+
+from .compute_score import merge_runs
+
+# lighteval saves each run as results_<YYYY-MM-DDTHH-MM-SS.ffffff>.json
+_RESULTS_FILE = re.compile(r"^results_(?P<timestamp>.+)\.json$")
+
+
+def find_results_files(results_dir: Path) -> list[Path]:
+    """Find all lighteval results files under a directory, oldest run first
+
+    results_dir (Path): the lighteval output directory (or any of its subdirectories).
+    RETURNS (list[Path]): the results files sorted by run timestamp.
+    """
+    files = [
+        path
+        for path in Path(results_dir).rglob("results_*.json")
+        if _RESULTS_FILE.match(path.name)
+    ]
+    return sorted(files, key=lambda path: (run_timestamp(path), str(path)))
+
+
+def run_timestamp(path: Path) -> str:
+    """Return the timestamp of a lighteval results file
+
+    The timestamps are zero-padded ISO dates, so they sort chronologically as strings.
+    """
+    match = _RESULTS_FILE.match(Path(path).name)
+    return match.group("timestamp") if match else ""
+
+
+def iter_local_runs(results_dir: Path) -> Iterator[dict[str, Any]]:
+    """Stream the decoded lighteval results files in a directory, oldest run first"""
+    for path in find_results_files(results_dir):
+        with open(path, "r") as f:
+            yield json.load(f)
+
+
+def parse_results_dir(results_dir: Path) -> dict[str, Any]:
+    """Parse a local lighteval output directory without going through `datasets`
+
+    This produces the same output as `parse_outputs`, so results can be scored
+    before they are pushed to the Hugging Face Hub. When a task was run several
+    times, the latest run (by timestamp) is used.
+
+    results_dir (Path): the lighteval output directory containing `results_*.json` files.
+    RETURNS (dict[str, Any]): A dictionary containing the metrics and versions for each task.
+    """
+    model_names = set()
+
+    def _runs() -> Iterator[dict[str, Any]]:
+        for run in iter_local_runs(results_dir):
+            model_names.add(run.get("config_general", {}).get("model_name"))
+            yield run
+
+    parsed_results = merge_runs(_runs())
+    if not model_names:
+        raise FileNotFoundError(f"No lighteval results files found in {results_dir}")
+    if len(model_names) > 1:
+        raise ValueError(
+            f"Found results for several models in {results_dir}: {sorted(map(str, model_names))}. "
+            "Point --from-dir to the results of a single model."
+        )
+    return parsed_results
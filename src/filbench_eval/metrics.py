@@ -0,0 +1,233 @@
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from .compute_score import compile_tasks
+from .details import detail_configs, format_task, load_details, sample_metrics
+from .rouge import RougeLScorer
+
+DEFAULT_CHUNK_SIZE = 10_000
+DEFAULT_TOLERANCE = 1e-6
+
+
+def pad_ragged(rows: Sequence[Sequence[Any]], fill: float) -> np.ndarray:
+    """Pack a list of variable-length rows into a padded (n_rows, max_len) array"""
+    lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+    total = int(lengths.sum())
+    flat = np.fromiter(
+        (value for row in rows for value in row), dtype=float, count=total
+    )
+    padded = np.full((len(rows), int(lengths.max(initial=0))), fill, dtype=float)
+    row_idx = np.repeat(np.arange(len(rows)), lengths)
+    col_idx = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    padded[row_idx, col_idx] = flat
+    return padded
+
+
+def mcf_accuracy(
+    logprobs: np.ndarray,
+    gold_indices: Sequence[Sequence[int]],
+    choice_lengths: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Per-sample accuracy of a batch of multiple-choice predictions
+
+    The predicted choice is the one with the highest log-probability, optionally
+    normalized by the number of characters of each choice (acc_norm).
+
+    logprobs (np.ndarray): (n_samples, n_choices) log-probabilities padded with -inf.
+    gold_indices (Sequence[Sequence[int]]): the correct choice(s) of each sample.
+    choice_lengths (Optional[np.ndarray]): (n_samples, n_choices) character lengths of each choice.
+    RETURNS (np.ndarray): 1.0 where the prediction is correct, 0.0 otherwise.
+    """
+    scores = logprobs
+    if choice_lengths is not None:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(
+                np.isfinite(logprobs), logprobs / np.maximum(choice_lengths, 1), -np.inf
+            )
+    predicted = scores.argmax(axis=1)
+    gold = pad_ragged(gold_indices, fill=-1)
+    return (gold == predicted[:, None]).any(axis=1).astype(float)
+
+
+def rouge_l(
+    predictions: Sequence[str],
+    references: Sequence[Sequence[str]],
+    scorer: Optional[RougeLScorer] = None,
+) -> np.ndarray:
+    """Per-sample ROUGE-L F-measure, taking the best score across references
+
+    Pass the same scorer across batches to reuse its tokenization cache.
+    """
+    scorer = scorer or RougeLScorer()
+    return scorer.score_max(references, predictions)
+
+
+def compute_sample_metric(
+    batch: dict[str, list[Any]],
+    metric: str,
+    rouge_scorer: Optional[RougeLScorer] = None,
+) -> np.ndarray:
+    """Recompute a metric for a batch of rows from a details split
+
+    batch (dict[str, list[Any]]): columns of the details split (predictions,
+        gold_index, choices and gold).
+    metric (str): acc_, acc_norm or rougeL.
+    rouge_scorer (Optional[RougeLScorer]): the scorer to use for ROUGE-L.
+    RETURNS (np.ndarray): the per-sample metric values.
+    """
+    if "rougeL" in metric:
+        predictions = [pred[0] if len(pred) else "" for pred in batch["predictions"]]
+        return rouge_l(predictions, batch["gold"], scorer=rouge_scorer)
+
+    # Loglikelihood predictions are (logprob, is_greedy) pairs for each choice
+    logprobs = pad_ragged(
+        [[choice[0] for choice in pred] for pred in batch["predictions"]],
+        fill=-np.inf,
+    )
+    choice_lengths = None
+    if metric == "acc_norm":
+        choice_lengths = pad_ragged(
+            [[len(choice) for choice in choices] for choices in batch["choices"]],
+            fill=1,
+        )
+    return mcf_accuracy(logprobs, batch["gold_index"], choice_lengths)
+
+
+@dataclass
+class MetricCheck:
+    benchmark: str  # benchmark name in the results file
+    subset: str  # details config the samples come from
+    metric: str  # metric that was recomputed
+    num_samples: int  # number of samples in the details split
+    recomputed: float  # metric recomputed from predictions
+    stored: Optional[float]  # metric in the aggregated results, if any
+    sample_mismatches: Optional[int]  # samples differing from their stored value, if stored
+
+    def ok(self, tolerance: float = DEFAULT_TOLERANCE) -> bool:
+        return (
+            self.stored is not None
+            and abs(self.recomputed - self.stored) <= tolerance
+            and not self.sample_mismatches
+        )
+
+
+def recompute_metrics(
+    dataset_id: str,
+    results: dict[str, Any],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    tolerance: float = DEFAULT_TOLERANCE,
+    revision: Optional[str] = None,
+) -> list[MetricCheck]:
+    """Recompute every FilBench metric from the per-sample details splits
+
+    Each details split is read in chunks of `chunk_size` rows, so memory use is
+    bounded regardless of the task size. Tasks made of several subsets yield one
+    check per subset plus one for their average.
+
+    dataset_id (str): The Hugging Face dataset ID.
+    results (dict[str, Any]): the `results` field from `parse_outputs`.
+    chunk_size (int): the number of rows processed at once.
+    tolerance (float): the largest allowed difference between metric values.
+    revision (Optional[str]): the branch, tag or commit hash of the dataset.
+    RETURNS (list[MetricCheck]): the recomputed and stored metrics of each task.
+    """
+    compiled = compile_tasks()
+    metrics = dict(zip(compiled.benchmarks, compiled.metrics))
+    # Stored results of subsets are keyed by their lighteval name (e.g., task:subset)
+    stored_by_config = {
+        format_task(f"filbench|{benchmark}|0"): result
+        for benchmark, result in results.items()
+    }
+
+    checks = []
+    for benchmark, configs in detail_configs(dataset_id, revision=revision).items():
+        metric = metrics[benchmark]
+        rouge_scorer = RougeLScorer() if "rougeL" in metric else None
+        subset_checks = []
+        for config in configs:
+            ds = load_details(dataset_id, config, revision=revision)
+            try:
+                # Decodes metrics stored as structs or as JSON strings, like `load_task_samples`
+                stored_values = sample_metrics(ds, metric)
+                sample_mismatches: Optional[int] = 0
+            except KeyError:
+                stored_values, sample_mismatches = None, None
+            total, num_samples = 0.0, 0
+            for batch in ds.iter(batch_size=chunk_size):
+                values = compute_sample_metric(batch, metric, rouge_scorer)
+                if stored_values is not None:
+                    batch_stored = stored_values[
+                        num_samples : num_samples + len(values)
+                    ]
+                    # Samples without a stored value can't be compared
+                    differs = ~np.isclose(values, batch_stored, atol=tolerance, rtol=0)
+                    sample_mismatches += int((differs & ~np.isnan(batch_stored)).sum())
+                total += values.sum()
+                num_samples += len(values)
+
+            stored = (stored_by_config.get(config) or {}).get(metric)
+            subset_checks.append(
+                MetricCheck(
+                    benchmark=benchmark,
+                    subset=config,
+                    metric=metric,
+                    num_samples=num_samples,
+                    recomputed=total / num_samples if num_samples else 0.0,
+                    stored=stored,
+                    sample_mismatches=sample_mismatches,
+                )
+            )
+
+        checks.extend(subset_checks)
+        if ":" in benchmark:
+            # Subset averages are unweighted means of the subset scores
+            checks.append(
+                MetricCheck(
+                    benchmark=benchmark,
+                    subset="_average",
+                    metric=metric,
+                    num_samples=sum(check.num_samples for check in subset_checks),
+                    recomputed=float(
+                        np.mean([check.recomputed for check in subset_checks])
+                    ),
+                    stored=(results.get(benchmark) or {}).get(metric),
+                    sample_mismatches=(
+                        None
+                        if any(c.sample_mismatches is None for c in subset_checks)
+                        else sum(c.sample_mismatches for c in subset_checks)
+                    ),
+                )
+            )
+    return checks
+
+
+def pretty_checks(checks: list[MetricCheck], tolerance: float = DEFAULT_TOLERANCE):
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    table = Table(title="Recomputed FilBench Metrics")
+    table.add_column("Task", justify="left", style="cyan", no_wrap=True)
+    table.add_column("Metric", justify="left")
+    table.add_column("N", justify="right")
+    table.add_column("Recomputed", justify="right", style="magenta")
+    table.add_column("Stored", justify="right")
+    table.add_column("Sample mismatches", justify="right")
+    table.add_column("Status", justify="left")
+    for check in checks:
+        table.add_row(
+            check.benchmark if check.subset == "_average" else check.subset,
+            check.metric,
+            str(check.num_samples),
+            f"{check.recomputed:.6f}",
+            f"{check.stored:.6f}" if check.stored is not None else "-",
+            (
+                str(check.sample_mismatches)
+                if check.sample_mismatches is not None
+                else "-"
+            ),
+            "[green]OK[/green]" if check.ok(tolerance) else "[red]MISMATCH[/red]",
+        )
+    console.print(table)
@@ -0,0 +1,319 @@
+from typing import Any, Optional
+
+import numpy as np
+
+from .bootstrap import CHUNK_ELEMENTS
+from .compute_score import compile_tasks
+from .cube import PredictionCube
+
+DEFAULT_ALPHA = 0.05
+
+
+def cohen_kappa_matrix(predictions: np.ndarray) -> np.ndarray:
+    """Cohen's kappa between the predicted choices of every pair of models
+
+    Predictions are one-hot encoded, so the observed agreement of all pairs is
+    a single matrix product, and the chance agreement is the product of the
+    per-model choice frequencies.
+
+    predictions (np.ndarray): (n_models, n_samples) predicted choice indices.
+    RETURNS (np.ndarray): the (n_models, n_models) kappa matrix.
+    """
+    n_models, n_samples = predictions.shape
+    n_choices = int(predictions.max(initial=0)) + 1
+    one_hot = np.zeros((n_models, n_samples * n_choices), dtype=np.float32)
+    one_hot[
+        np.repeat(np.arange(n_models), n_samples),
+        (np.arange(n_samples) * n_choices + predictions).ravel(),
+    ] = 1.0
+    observed = one_hot @ one_hot.T / n_samples
+    frequencies = one_hot.reshape(n_models, n_samples, n_choices).mean(axis=1)
+    expected = frequencies @ frequencies.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kappa = (observed - expected) / (1 - expected)
+    # Two constant, identical raters agree perfectly
+    return np.where(np.isclose(expected, 1.0), 1.0, kappa)
+
+
+def mcnemar_matrix(correct: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """McNemar's test (with continuity correction) for every pair of models
+
+    correct (np.ndarray): (n_models, n_samples) 1.0 where a model is correct.
+    RETURNS (tuple[np.ndarray, np.ndarray]): the (n_models, n_models) chi-square
+        statistics and p-values.
+    """
+    from scipy.stats import chi2
+
+    correct = correct.astype(np.float64)
+    # only_first[i, j]: samples that model i gets right and model j gets wrong
+    only_first = correct @ (1.0 - correct).T
+    discordant = only_first + only_first.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = (np.abs(only_first - only_first.T) - 1).clip(min=0) ** 2
+        statistic = np.where(discordant > 0, statistic / discordant, 0.0)
+    return statistic, chi2.sf(statistic, df=1)
+
+
+def bootstrap_replicates(
+    subsets: list[np.ndarray],
+    n_resamples: int,
+    rng: np.random.Generator,
+    chunk_elements: int = CHUNK_ELEMENTS,
+) -> np.ndarray:
+    """Paired bootstrap replicates of the score of every model on a task
+
+    Every model is evaluated on the same resampled samples, drawn as multinomial
+    counts so that the means of all models are one matrix product per chunk.
+    Tasks made of several subsets are stratified by subset.
+
+    subsets (list[np.ndarray]): (n_models, n_samples) metric values of each subset.
+    n_resamples (int): the number of bootstrap replicates.
+    rng (np.random.Generator): the random number generator.
+    chunk_elements (int): maximum size of a (resamples, samples) count chunk.
+    RETURNS (np.ndarray): the (n_resamples, n_models) replicate scores.
+    """
+    replicates = np.zeros((n_resamples, subsets[0].shape[0]))
+    for values in subsets:
+        n = values.shape[1]
+        rows_per_chunk = max(1, chunk_elements // n)
+        for start in range(0, n_resamples, rows_per_chunk):
+            stop = min(start + rows_per_chunk, n_resamples)
+            counts = rng.multinomial(n, np.full(n, 1.0 / n), size=stop - start)
+            replicates[start:stop] += counts @ values.T / n
+    return replicates / len(subsets)
+
+
+def bootstrap_p_values(replicates: np.ndarray) -> np.ndarray:
+    """Two-sided paired bootstrap p-values of the score difference of every pair
+
+    replicates (np.ndarray): (n_resamples, n_models) paired replicate scores.
+    RETURNS (np.ndarray): the (n_models, n_models) p-values.
+    """
+    n_models = replicates.shape[1]
+    p_values = np.ones((n_models, n_models))
+    for i in range(n_models):
+        diff = replicates[:, [i]] - replicates
+        tail = np.minimum((diff <= 0).mean(axis=0), (diff >= 0).mean(axis=0))
+        p_values[i] = np.minimum(1.0, 2 * tail)
+    np.fill_diagonal(p_values, 1.0)
+    return p_values
+
+
+def tied_clusters(
+    models: list[str],
+    scores: np.ndarray,
+    p_values: np.ndarray,
+    alpha: float = DEFAULT_ALPHA,
+) -> list[list[str]]:
+    """Group a leaderboard into runs of models that aren't significantly different
+
+    Models are ranked by score, and each cluster starts at the best model not
+    yet assigned and extends down the ranking while the next model is tied
+    (p >= alpha) with every model already in the cluster. Pairs without a
+    p-value (NaN) are never tied.
+
+    models (list[str]): the model names.
+    scores (np.ndarray): the score of each model.
+    p_values (np.ndarray): the pairwise p-values between models.
+    alpha (float): the significance level.
+    RETURNS (list[list[str]]): the clusters, from the best to the worst.
+    """
+    clusters: list[list[int]] = []
+    for idx in np.argsort(-scores, kind="stable"):
+        if clusters and (p_values[idx, clusters[-1]] >= alpha).all():
+            clusters[-1].append(int(idx))
+        else:
+            clusters.append([int(idx)])
+    return [[models[idx] for idx in cluster] for cluster in clusters]
+
+
+def weighted_kappa(kappas: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Weighted mean of the task kappas of every pair of models
+
+    Tasks without a kappa for a pair (generative tasks, or tasks that either
+    model didn't run) are left out, and the weights of the others renormalized.
+
+    kappas (np.ndarray): (n_tasks, n_models, n_models) kappa matrices, NaN where unknown.
+    weights (np.ndarray): (n_tasks,) weight of each task.
+    RETURNS (np.ndarray): the (n_models, n_models) kappa matrix, NaN where no task has a kappa.
+    """
+    known = ~np.isnan(kappas)
+    pair_weights = weights[:, None, None] * known
+    total = pair_weights.sum(axis=0)
+    weighted = (np.where(known, kappas, 0.0) * pair_weights).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, weighted / total, np.nan)
+
+
+def load_benchmark_samples(
+    cube: PredictionCube, models: list[str]
+) -> dict[str, dict[str, Any]]:
+    """Gather the per-sample arrays of every benchmark from a prediction cube
+
+    Only the samples that every model has are kept, so that all comparisons
+    are paired. Models that didn't run a benchmark are left out of it.
+
+    cube (PredictionCube): the prediction cube.
+    models (list[str]): the models to compare.
+    RETURNS (dict[str, dict[str, Any]]): for each benchmark, the metric, the
+        indices of the models that ran it, and the predictions and metric
+        values of each subset.
+    """
+    benchmarks: dict[str, dict[str, Any]] = {}
+    for task in cube.tasks:
+        cube_task = cube.open(task)
+        entry = benchmarks.setdefault(
+            cube_task.benchmark, {"metric": cube_task.metric, "subsets": []}
+        )
+        entry["subsets"].append(cube_task)
+
+    for benchmark, entry in benchmarks.items():
+        present = [
+            idx
+            for idx, model in enumerate(models)
+            if all(model in cube_task.models for cube_task in entry["subsets"])
+        ]
+        predictions, metrics = [], []
+        for cube_task in entry["subsets"]:
+            rows = [cube_task.model_index(models[idx]) for idx in present]
+            values = np.asarray(cube_task.metrics[rows], dtype=np.float64)
+            shared = ~np.isnan(values).any(axis=0)
+            predictions.append(np.asarray(cube_task.predictions[rows])[:, shared])
+            metrics.append(values[:, shared])
+        entry.update(present=present, predictions=predictions, metrics=metrics)
+        del entry["subsets"]
+    return benchmarks
+
+
+def pairwise_report(
+    cube: PredictionCube,
+    models: Optional[list[str]] = None,
+    n_resamples: int = 1000,
+    alpha: float = DEFAULT_ALPHA,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Compare every pair of models on every task, category and the FilBench score
+
+    Multiple-choice tasks get Cohen's kappa on the predicted choices and
+    McNemar's test on correctness. ROUGE-L tasks, categories and the FilBench
+    score get a paired bootstrap test, with task replicates aggregated using
+    the same weights as `compute_filbench_score`. The kappa of a category is
+    the mean of the kappas of its multiple-choice tasks, with the same weights
+    renormalized over the tasks both models ran. A model that didn't run every
+    task of a category (or of FilBench) has no p-values at that level, since
+    its missing tasks would count as scores of 0.
+
+    cube (PredictionCube): the prediction cube with the per-sample results.
+    models (Optional[list[str]]): the models to compare. Defaults to every model in the cube.
+    n_resamples (int): the number of paired bootstrap replicates.
+    alpha (float): the significance level of the tied clusters.
+    seed (int): the random seed.
+    RETURNS (dict[str, Any]): the kappa and p-value matrices and the tied clusters.
+    """
+    models = models or cube.models
+    compiled = compile_tasks()
+    rng = np.random.default_rng(seed)
+    n_models = len(models)
+
+    task_reports: dict[str, dict[str, Any]] = {}
+    scores = np.zeros((n_models, len(compiled.benchmarks)))
+    replicates = np.zeros((n_resamples, n_models, len(compiled.benchmarks)))
+    ran = np.zeros((n_models, len(compiled.benchmarks)), dtype=bool)
+    kappas = np.full((len(compiled.benchmarks), n_models, n_models), np.nan)
+    benchmarks = load_benchmark_samples(cube, models)
+    for task_idx, benchmark in enumerate(compiled.benchmarks):
+        entry = benchmarks.get(benchmark)
+        if not entry or len(entry["present"]) == 0:
+            continue
+        present, metrics = entry["present"], entry["metrics"]
+        if not all(values.shape[1] for values in metrics):
+            continue
+
+        task_replicates = bootstrap_replicates(metrics, n_resamples, rng)
+        task_scores = np.mean([values.mean(axis=1) for values in metrics], axis=0)
+        scores[present, task_idx] = task_scores * compiled.scale[task_idx]
+        replicates[:, present, task_idx] = task_replicates * compiled.scale[task_idx]
+        ran[present, task_idx] = True
+
+        kappa = np.full((n_models, n_models), np.nan)
+        p_values = np.full((n_models, n_models), np.nan)
+        if "rougeL" in entry["metric"]:
+            test = "paired_bootstrap"
+            p_values[np.ix_(present, present)] = bootstrap_p_values(task_replicates)
+        else:
+            test = "mcnemar"
+            predictions = np.concatenate(entry["predictions"], axis=1)
+            kappa[np.ix_(present, present)] = cohen_kappa_matrix(predictions)
+            _, task_p_values = mcnemar_matrix(np.concatenate(metrics, axis=1))
+            p_values[np.ix_(present, present)] = task_p_values
+        kappas[task_idx] = kappa
+        task_reports[benchmark] = {
+            "metric": entry["metric"],
+            "test": test,
+            "num_samples": int(sum(values.shape[1] for values in metrics)),
+            "scores": _to_list(scores[:, task_idx]),
+            "cohen_kappa": _to_list(kappa),
+            "p_values": _to_list(p_values),
+        }
+
+    category_scores = scores @ compiled.weights.T
+    category_replicates = replicates @ compiled.weights.T
+    filbench_scores = category_scores.mean(axis=1)
+    filbench_p_values = _paired(
+        bootstrap_p_values(category_replicates.mean(axis=2)), ran.all(axis=1)
+    )
+    return {
+        "models": models,
+        "n_resamples": n_resamples,
+        "alpha": alpha,
+        "seed": seed,
+        "tasks": task_reports,
+        "category_scores": {
+            category: {
+                "scores": _to_list(category_scores[:, idx]),
+                "cohen_kappa": _to_list(weighted_kappa(kappas, compiled.weights[idx])),
+                "p_values": _to_list(
+                    _paired(
+                        bootstrap_p_values(category_replicates[:, :, idx]),
+                        ran[:, compiled.weights[idx] > 0].all(axis=1),
+                    )
+                ),
+            }
+            for idx, category in enumerate(compiled.categories)
+        },
+        "filbench_score": {
+            "scores": _to_list(filbench_scores),
+            "p_values": _to_list(filbench_p_values),
+        },
+        "tied_clusters": tied_clusters(
+            models, filbench_scores, filbench_p_values, alpha=alpha
+        ),
+    }
+
+
+def pretty_pairwise(report: dict[str, Any]):
+    from rich.console import Console
+    from rich.markup import escape
+    from rich.table import Table
+
+    console = Console()
+    scores = dict(zip(report["models"], report["filbench_score"]["scores"]))
+    table = Table(title=f"Statistically Tied Models (alpha={report['alpha']})")
+    table.add_column("Cluster", justify="right", style="cyan")
+    table.add_column("Model", justify="left")
+    table.add_column("FilBench Score", justify="right", style="magenta")
+    for idx, cluster in enumerate(report["tied_clusters"], start=1):
+        for model in cluster:
+            table.add_row(str(idx), escape(model), f"{scores[model]:.2f}")
+        table.add_section()
+    console.print(table)
+
+
+def _paired(p_values: np.ndarray, complete: np.ndarray) -> np.ndarray:
+    """Keep the p-values of the pairs of models that both ran every task"""
+    return np.where(complete[:, None] & complete[None, :], p_values, np.nan)
+
+
+def _to_list(values: np.ndarray) -> list:
+    """Convert an array to nested lists, with NaN as None so that it's valid JSON"""
+    return np.where(np.isnan(values), None, values).tolist()
@@ -0,0 +1,342 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from .compute_score import (
+    Tasks,
+    compile_tasks,
+    parse_shard,
+    results_matrix,
+    shard_sizes,
+)
+
+SCORE_RANGE = (0.0, 100.0)  # every task metric is scaled to 0-100
+SHRINKAGE = 0.1  # weight of the diagonal when shrinking the reference covariance
+
+
+@dataclass
+class TaskCoverage:
+    benchmark: str  # FilBench benchmark
+    num_samples: int  # canonical number of examples
+    covered: int  # number of examples with results
+    score: Optional[float] = None  # 0-100 score on the covered examples
+    shards: Optional[tuple[list[int], int]] = None  # (present shards, number of shards)
+    stderr: Optional[float] = None  # 0-100 standard error reported by lighteval
+
+    @property
+    def fraction(self) -> float:
+        return self.covered / self.num_samples
+
+    @property
+    def sampling_variance(self) -> float:
+        """Variance of `score` as an estimate of the score on every example
+
+        As in `compute_score.estimate_filbench_score`, the covered examples are
+        treated as drawn without replacement from the task, so lighteval's
+        standard error (or the worst case, if it is missing) is shrunk by the
+        finite population correction. Tasks run in full have no sampling error.
+        """
+        n, population = self.covered, self.num_samples
+        if self.score is None or n >= population or n < 2:
+            return 0.0
+        stderr = self.stderr
+        if stderr is None:
+            # Worst case for a metric in [0, 1]
+            stderr = np.sqrt(0.25 / (n - 1)) * (SCORE_RANGE[1] - SCORE_RANGE[0])
+        return float(stderr**2 * (population - n) / (population - 1))
+
+
+@dataclass
+class ReferenceModel:
+    """Gaussian model of the task scores of complete sweeps, used to impute missing tasks"""
+
+    mean: np.ndarray  # (n_tasks,) mean 0-100 score of each task
+    cov: np.ndarray  # (n_tasks, n_tasks) shrunk covariance of the task scores
+    n_models: int  # number of complete sweeps the model was fitted on
+
+    @classmethod
+    def fit(cls, scores_per_model: list[dict[str, Any]]) -> Optional["ReferenceModel"]:
+        """Fit the model to the results of other models
+
+        Only models with every task are used. The sample covariance is shrunk
+        towards its diagonal so that it stays invertible with few models.
+
+        scores_per_model (list[dict[str, Any]]): the `results` field of each model's report.
+        RETURNS (Optional[ReferenceModel]): the fitted model, or None if fewer than 3 models are complete.
+        """
+        compiled = compile_tasks()
+        values, mask = results_matrix(scores_per_model)
+        complete = values[mask.all(axis=1)] * compiled.scale
+        if len(complete) < 3:
+            return None
+        cov = np.cov(complete, rowvar=False)
+        cov = (1 - SHRINKAGE) * cov + SHRINKAGE * np.diag(np.diag(cov))
+        cov += 1e-6 * np.eye(len(cov))
+        return cls(mean=complete.mean(axis=0), cov=cov, n_models=len(complete))
+
+    def impute(
+        self,
+        values: np.ndarray,
+        observed: np.ndarray,
+        noise: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Conditional mean and covariance of the missing tasks given the observed ones
+
+        Observed scores can be noisy, e.g. when only some shards of a task
+        have run: their noise is added to the covariance of the observed
+        tasks when conditioning, and carried into the returned covariance.
+
+        values (np.ndarray): the (n_tasks,) 0-100 scores, ignored where not observed.
+        observed (np.ndarray): the (n_tasks,) boolean mask of observed tasks.
+        noise (Optional[np.ndarray]): the (n_tasks,) sampling variance of each observed score. Defaults to 0.
+        RETURNS (tuple[np.ndarray, np.ndarray]): the (n_tasks,) scores with the
+            missing ones imputed, and the (n_tasks, n_tasks) covariance of the imputed scores.
+        """
+        missing = ~observed
+        noise = (
+            np.zeros(len(values)) if noise is None else np.where(observed, noise, 0.0)
+        )
+        filled = np.where(observed, values, 0.0)
+        cov = np.diag(noise)
+        if not missing.any():
+            return filled, cov
+        cov_mm = self.cov[np.ix_(missing, missing)]
+        if observed.any():
+            cov_mo = self.cov[np.ix_(missing, observed)]
+            cov_oo = self.cov[np.ix_(observed, observed)] + np.diag(noise[observed])
+            gain = np.linalg.solve(cov_oo, cov_mo.T).T
+            deviation = values[observed] - self.mean[observed]
+            filled[missing] = self.mean[missing] + gain @ deviation
+            cov_mm = cov_mm - gain @ cov_mo.T
+            # The imputed scores inherit part of the noise of the observed ones
+            cov[np.ix_(missing, observed)] = gain * noise[observed]
+            cov[np.ix_(observed, missing)] = (gain * noise[observed]).T
+        else:
+            filled[missing] = self.mean[missing]
+        filled[missing] = np.clip(filled[missing], *SCORE_RANGE)
+        cov[np.ix_(missing, missing)] = cov_mm
+        return filled, cov
+
+
+class PartialScorer:
+    """Anytime scoring of a sweep that is still running
+
+    Runs are added one at a time as they land, oldest first, and only the
+    tasks of each new run are updated. Tasks run as sample shards (see
+    `compute_score.shard_name`) count as partially covered until all their
+    shards are present. Missing samples are bounded by the worst (0) and best
+    (100) possible scores, and missing tasks are imputed from the correlations
+    between tasks in other models' results.
+    """
+
+    def __init__(self, reference: Optional[ReferenceModel] = None):
+        self.reference = reference
+        self.n_runs = 0
+        # benchmark -> (run index, result) of the latest full run
+        self.full: dict[str, tuple[int, dict[str, Any]]] = {}
+        # (benchmark, n_shards) -> {shard index: (run index, result)}
+        self.shards: dict[tuple[str, int], dict[int, tuple[int, dict[str, Any]]]] = {}
+
+    def add_run(self, run: dict[str, Any]):
+        """Add the results of a lighteval run, newer than all the runs added before"""
+        for task, result in run.get("results", {}).items():
+            if task == "all":
+                continue
+            _, benchmark, n_shots = task.split("|")
+            if int(n_shots) != 0:
+                continue
+            shard = parse_shard(benchmark)
+            if shard:
+                base, index, n_shards = shard
+                self.shards.setdefault((base, n_shards), {})[index] = (
+                    self.n_runs,
+                    result,
+                )
+            else:
+                self.full[benchmark] = (self.n_runs, result)
+        self.n_runs += 1
+
+    def add_runs(self, runs: Iterable[dict[str, Any]]):
+        for run in runs:
+            self.add_run(run)
+
+    def coverage(self) -> list[TaskCoverage]:
+        """The covered samples and score of each task, in the order of the Tasks registry"""
+        compiled = compile_tasks()
+        num_samples = [task.value.num_samples for task in Tasks]
+        coverage = []
+        for benchmark, metric, scale, population in zip(
+            compiled.benchmarks, compiled.metrics, compiled.scale, num_samples
+        ):
+            # Candidates are (covered samples, run index, score, shards, stderr)
+            candidates = []
+            if benchmark in self.full:
+                idx, result = self.full[benchmark]
+                if result.get(metric) is not None:
+                    candidates.append(
+                        (population, idx, result[metric] * scale, None, None)
+                    )
+            for (base, n_shards), parts in self.shards.items():
+                present = sorted(
+                    index
+                    for index, (_, result) in parts.items()
+                    if base == benchmark
+                    and index < n_shards
+                    and result.get(metric) is not None
+                )
+                if not present:
+                    continue
+                sizes = shard_sizes(population, n_shards)
+                covered = sum(sizes[index] for index in present)
+                score = (
+                    sum(sizes[index] * parts[index][1][metric] for index in present)
+                    / covered
+                    * scale
+                )
+                # Shards are independent samples, weighted by their size
+                stderrs = [parts[index][1].get(f"{metric}_stderr") for index in present]
+                stderr = None
+                if None not in stderrs:
+                    stderr = scale * np.sqrt(
+                        sum(
+                            (sizes[index] * se / covered) ** 2
+                            for index, se in zip(present, stderrs)
+                        )
+                    )
+                idx = max(parts[index][0] for index in present)
+                candidates.append((covered, idx, score, (present, n_shards), stderr))
+            if candidates:
+                covered, _, score, shards, stderr = max(candidates, key=lambda c: c[:2])
+                coverage.append(
+                    TaskCoverage(
+                        benchmark,
+                        population,
+                        covered,
+                        float(score),
+                        shards,
+                        None if stderr is None else float(stderr),
+                    )
+                )
+            else:
+                coverage.append(TaskCoverage(benchmark, population, 0))
+        return coverage
+
+    def estimate(self) -> dict[str, Any]:
+        """Bounded and imputed estimates of the category and FilBench scores
+
+        RETURNS (dict[str, Any]): the coverage, and the lower bound, upper bound
+            and imputed estimate (with its standard error, if there is a
+            reference model) at every level.
+        """
+        compiled = compile_tasks()
+        coverage = self.coverage()
+        fraction = np.array([task.fraction for task in coverage])
+        scores = np.array([task.score or 0.0 for task in coverage])
+        lower_tasks = fraction * scores + (1 - fraction) * SCORE_RANGE[0]
+        upper_tasks = fraction * scores + (1 - fraction) * SCORE_RANGE[1]
+
+        # The FilBench score is the mean of the category scores
+        weights = np.vstack([compiled.weights, compiled.weights.mean(axis=0)])
+        names = list(compiled.categories) + ["filbench_score"]
+        levels = {
+            name: {
+                "coverage": float(weights[idx] @ fraction),
+                "lower": float(weights[idx] @ lower_tasks),
+                "upper": float(weights[idx] @ upper_tasks),
+                "imputed": None,
+                "stderr": None,
+            }
+            for idx, name in enumerate(names)
+        }
+        if self.reference is not None:
+            observed = fraction > 0
+            noise = np.array([task.sampling_variance for task in coverage])
+            imputed, cov = self.reference.impute(scores, observed, noise=noise)
+            for idx, name in enumerate(names):
+                levels[name]["imputed"] = float(weights[idx] @ imputed)
+                levels[name]["stderr"] = float(
+                    np.sqrt(weights[idx] @ cov @ weights[idx])
+                )
+
+        filbench = levels.pop("filbench_score")
+        return {
+            "coverage": filbench["coverage"],
+            "tasks_done": sum(task.fraction >= 1 for task in coverage),
+            "n_tasks": len(coverage),
+            "n_reference_models": self.reference.n_models if self.reference else 0,
+            "tasks": {
+                task.benchmark: {
+                    "covered": task.covered,
+                    "num_samples": task.num_samples,
+                    "score": task.score,
+                    "shards": list(task.shards[0]) if task.shards else None,
+                    "n_shards": task.shards[1] if task.shards else None,
+                }
+                for task in coverage
+            },
+            "category_scores": levels,
+            "filbench_score": filbench,
+        }
+
+
+def load_reference_results(paths: Iterable[Path]) -> list[dict[str, Any]]:
+    """Load the `results` of other models from reports or a submissions store
+
+    paths (Iterable[Path]): score JSON files, directories containing them, or
+        submissions store directories (see `ingest-submissions`).
+    RETURNS (list[dict[str, Any]]): the `results` field of each report.
+    """
+    from .store import SubmissionsStore
+
+    results = []
+    for path in map(Path, paths):
+        if (path / "index.json").exists():
+            reports = SubmissionsStore(path).leaderboard().column("report").to_pylist()
+            results.extend(json.loads(report).get("results", {}) for report in reports)
+            continue
+        for json_path in sorted(path.rglob("*.json")) if path.is_dir() else [path]:
+            with open(json_path, "r") as f:
+                report = json.load(f)
+            if isinstance(report, dict) and isinstance(report.get("results"), dict):
+                results.append(report["results"])
+    return results
+
+
+def pretty_partial(estimate: dict[str, Any]):
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    console.print(
+        f"[bold]Coverage:[/bold] {estimate['coverage']:.1%} "
+        f"({estimate['tasks_done']}/{estimate['n_tasks']} tasks done)"
+    )
+    table = Table(title="Partial FilBench Scores")
+    table.add_column("Category", justify="left", style="cyan", no_wrap=True)
+    table.add_column("Coverage", justify="right")
+    table.add_column("Worst case", justify="right")
+    table.add_column("Imputed", justify="right", style="magenta")
+    table.add_column("Best case", justify="right")
+    rows = list(estimate["category_scores"].items())
+    rows.append(("FilBench", estimate["filbench_score"]))
+    for name, level in rows:
+        imputed = (
+            f"{level['imputed']:.2f} ± {level['stderr']:.2f}"
+            if level["imputed"] is not None
+            else "-"
+        )
+        table.add_row(
+            name,
+            f"{level['coverage']:.0%}",
+            f"{level['lower']:.2f}",
+            imputed,
+            f"{level['upper']:.2f}",
+        )
+    console.print(table)
+    if not estimate["n_reference_models"]:
+        console.print(
+            "Pass --reference with the reports of at least 3 complete models to impute missing tasks."
+        )
@@ -0,0 +1,282 @@
+import heapq
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .compute_score import Tasks, shard_name, shard_sizes
+from .custom_tasks import SampleSubset
+from .details import format_task
+from .runtimes import RuntimeRecord, canonical_num_samples, task_name
+
+# Rough costs of a lighteval job, used when there is no measured history. These are
+# about the median of the runs reported in the paper, where throughput varies ~5x by task.
+DEFAULT_OVERHEAD = 360.0  # seconds to start lighteval and load the model
+DEFAULT_SAMPLES_PER_SEC = 20.0
+
+
+@dataclass
+class Job:
+    task: str  # lighteval task name
+    spec: str  # lighteval task spec to run, e.g. filbench|balita_tgl_mcf|0|0
+    num_samples: int  # number of examples evaluated by the job
+    seconds: float  # predicted runtime
+    shard: Optional[tuple[int, int]] = None  # (index, number of shards), if sharded
+
+
+@dataclass
+class Schedule:
+    workers: list[list[Job]]  # jobs of each worker, in the order they should run
+    loads: list[float]  # predicted busy time of each worker, in seconds
+
+    @property
+    def makespan(self) -> float:
+        return max(self.loads, default=0.0)
+
+    @property
+    def jobs(self) -> list[Job]:
+        return [job for jobs in self.workers for job in jobs]
+
+    @property
+    def lower_bound(self) -> float:
+        """No schedule of these jobs can finish before this"""
+        seconds = [job.seconds for job in self.jobs]
+        return max(sum(seconds) / len(self.workers), max(seconds, default=0.0))
+
+
+@dataclass
+class RuntimeModel:
+    """Predict the runtime of a job as a fixed overhead plus a per-sample cost"""
+
+    overhead: float = DEFAULT_OVERHEAD  # seconds per job, independent of its size
+    default_seconds_per_sample: float = 1 / DEFAULT_SAMPLES_PER_SEC
+    seconds_per_sample: dict[str, float] = field(default_factory=dict)  # by task
+
+    @classmethod
+    def from_history(
+        cls,
+        records: Iterable[RuntimeRecord],
+        overhead: float = DEFAULT_OVERHEAD,
+        model: Optional[str] = None,
+        include_apportioned: bool = False,
+    ) -> "RuntimeModel":
+        """Fit the per-sample cost of each task to the median of its measured runs
+
+        Tasks without measured runs use the median cost across all runs. Runs
+        that evaluated several tasks are left out by default, like in
+        `throughput_stats`.
+
+        records (Iterable[RuntimeRecord]): the measured runtimes, e.g. from a `RuntimeHistory`.
+        overhead (float): the seconds of each run not spent on samples.
+        model (Optional[str]): if set, only use the runs of this model.
+        include_apportioned (bool): if True, also use the records of runs that evaluated several tasks.
+        RETURNS (RuntimeModel): the fitted runtime model.
+        """
+        costs: dict[str, list[float]] = {}
+        for record in records:
+            if record.apportioned and not include_apportioned:
+                continue
+            if record.num_samples and (model is None or record.model == model):
+                cost = max(record.seconds - overhead, 0.0) / record.num_samples
+                costs.setdefault(record.task, []).append(cost)
+        if not costs:
+            return cls(overhead=overhead)
+        return cls(
+            overhead=overhead,
+            default_seconds_per_sample=float(
+                np.median(
+                    [cost for task_costs in costs.values() for cost in task_costs]
+                )
+            ),
+            seconds_per_sample={
+                task: float(np.median(task_costs)) for task, task_costs in costs.items()
+            },
+        )
+
+    def seconds(self, task: str, num_samples: int) -> float:
+        cost = self.seconds_per_sample.get(task, self.default_seconds_per_sample)
+        return self.overhead + num_samples * cost
+
+
+def default_task_specs() -> list[str]:
+    """Return the lighteval task specs of every task in the registry"""
+    specs = {f"filbench|{task_name(task.value.benchmark)}|0|0" for task in Tasks}
+    return sorted(specs)
+
+
+def read_task_specs(path: Path) -> list[str]:
+    """Read lighteval task specs (e.g. filbench|balita_tgl_mcf|0|0), one per line
+
+    Empty lines and lines starting with '#' are ignored.
+    """
+    with open(path, "r") as f:
+        return [
+            line.strip()
+            for line in f
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+
+def list_schedule(jobs: list[Job], n_workers: int) -> Schedule:
+    """Assign each job, in order, to the worker that becomes free first"""
+    workers: list[list[Job]] = [[] for _ in range(n_workers)]
+    loads = [0.0] * n_workers
+    heap = [(0.0, worker) for worker in range(n_workers)]
+    for job in jobs:
+        load, worker = heapq.heappop(heap)
+        workers[worker].append(job)
+        loads[worker] = load + job.seconds
+        heapq.heappush(heap, (loads[worker], worker))
+    return Schedule(workers=workers, loads=loads)
+
+
+def lpt_schedule(jobs: list[Job], n_workers: int) -> Schedule:
+    """Longest-processing-time-first: list scheduling of the jobs from longest to shortest
+
+    The makespan is at most 4/3 of the optimal one.
+    """
+    return list_schedule(sorted(jobs, key=lambda job: -job.seconds), n_workers)
+
+
+def make_jobs(
+    specs: list[str],
+    runtime_model: Optional[RuntimeModel] = None,
+    n_shards: Optional[dict[str, int]] = None,
+) -> list[Job]:
+    """Turn lighteval task specs into jobs with a predicted runtime
+
+    specs (list[str]): the lighteval task specs to run, e.g. filbench|balita_tgl_mcf|0|0.
+    runtime_model (Optional[RuntimeModel]): predicts the runtime of each job. Defaults to rough estimates.
+    n_shards (Optional[dict[str, int]]): the number of sample shards of each task. Tasks are not sharded by default.
+    RETURNS (list[Job]): one job per task or shard, in the order of the specs.
+    """
+    runtime_model = runtime_model or RuntimeModel()
+    n_shards = n_shards or {}
+    num_samples = canonical_num_samples()
+    jobs = []
+    for spec in specs:
+        task = task_name(spec)
+        if task not in num_samples:
+            raise ValueError(f"Unknown task '{task}' in {spec}")
+        k = n_shards.get(task, 1)
+        if k == 1:
+            seconds = runtime_model.seconds(task, num_samples[task])
+            jobs.append(Job(task, spec, num_samples[task], seconds))
+            continue
+        prefix, _, suffix = spec.split("|", 2)
+        for index, size in enumerate(shard_sizes(num_samples[task], k)):
+            shard_spec = f"{prefix}|{shard_name(task, index, k)}|{suffix}"
+            seconds = runtime_model.seconds(task, size)
+            jobs.append(Job(task, shard_spec, size, seconds, shard=(index, k)))
+    return jobs
+
+
+def plan_tasks(
+    specs: list[str],
+    n_workers: int,
+    runtime_model: Optional[RuntimeModel] = None,
+    max_shards: int = 1,
+) -> Schedule:
+    """Plan which tasks each worker should run so that the whole suite finishes first
+
+    Tasks are scheduled longest first. When `max_shards` > 1, the longest task
+    that can be sharded is repeatedly split into the number of sample shards
+    that shortens the predicted makespan the most, until no split helps. Every shard pays the job overhead
+    again, so small tasks are never split. Tasks with subsets can't be sharded.
+
+    specs (list[str]): the lighteval task specs to run, e.g. filbench|balita_tgl_mcf|0|0.
+    n_workers (int): the number of workers (e.g. GPUs) running jobs in parallel.
+    runtime_model (Optional[RuntimeModel]): predicts the runtime of each job. Defaults to rough estimates.
+    max_shards (int): the largest number of shards a task can be split into.
+    RETURNS (Schedule): the jobs of each worker and their predicted runtimes.
+    """
+    # Only tasks without subsets can be merged back by `merge_runs`
+    shardable = {
+        task_name(task.value.benchmark)
+        for task in Tasks
+        if ":" not in task.value.benchmark
+    }
+    n_shards: dict[str, int] = {}
+    schedule = lpt_schedule(make_jobs(specs, runtime_model), n_workers)
+    while max_shards > 1:
+        candidates = [
+            job
+            for job in schedule.jobs
+            if job.task in shardable and n_shards.get(job.task, 1) < max_shards
+        ]
+        if not candidates:
+            break
+        task = max(candidates, key=lambda job: job.seconds).task
+        # One more shard may not help on its own (e.g. 2 shards on 3 workers), so try them all
+        best = None
+        for k in range(n_shards.get(task, 1) + 1, max_shards + 1):
+            split = {**n_shards, task: k}
+            candidate = lpt_schedule(make_jobs(specs, runtime_model, split), n_workers)
+            if candidate.makespan < (best or schedule).makespan:
+                best, n_best = candidate, split
+        if best is None:
+            break
+        n_shards, schedule = n_best, best
+    return schedule
+
+
+def write_worker_files(schedule: Schedule, output_dir: Path) -> list[Path]:
+    """Write the task specs of each worker to worker_<i>.txt, to be piped into lighteval"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for worker, jobs in enumerate(schedule.workers):
+        path = output_dir / f"worker_{worker}.txt"
+        path.write_text("".join(f"{job.spec}\n" for job in jobs))
+        paths.append(path)
+    return paths
+
+
+def shard_subsets(schedule: Schedule) -> list[SampleSubset]:
+    """List the documents of each sample shard of a schedule, to define them for lighteval"""
+    num_samples = canonical_num_samples()
+    subsets = []
+    shards = [job for job in schedule.jobs if job.shard is not None]
+    for job in sorted(shards, key=lambda job: (job.task, job.shard)):
+        index, k = job.shard
+        start = sum(shard_sizes(num_samples[job.task], k)[:index])
+        subsets.append(
+            SampleSubset(
+                format_task(f"filbench|{job.task}|0"),
+                shard_name("", index, k),
+                start=start,
+                stop=start + job.num_samples,
+            )
+        )
+    return subsets
+
+
+def pretty_schedule(schedule: Schedule, baseline: Optional[Schedule] = None):
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    table = Table(title="Task Schedule")
+    table.add_column("Worker", justify="right", style="cyan")
+    table.add_column("Jobs", justify="left")
+    table.add_column("Predicted time (min)", justify="right")
+    for worker, (jobs, load) in enumerate(zip(schedule.workers, schedule.loads)):
+        names = ", ".join(
+            (
+                job.task
+                if job.shard is None
+                else f"{job.task} ({job.shard[0] + 1}/{job.shard[1]})"
+            )
+            for job in jobs
+        )
+        table.add_row(str(worker), names, f"{load / 60:.1f}")
+    console.print(table)
+    console.print(
+        f"[bold]Predicted makespan:[/bold] {schedule.makespan / 60:.1f} min "
+        f"(lower bound {schedule.lower_bound / 60:.1f} min)"
+    )
+    if baseline is not None:
+        console.print(
+            f"[bold]In file order:[/bold] {baseline.makespan / 60:.1f} min, "
+            f"[bold]sequential:[/bold] {sum(baseline.loads) / 60:.1f} min"
+        )
@@ -0,0 +1,293 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import DEFAULT_CACHE_DIR
+from .details import format_task
+from .files import atomic_path
+
+PREDICTION_COLUMNS = ["prompt_hash", "mcf_predictions", "gold"]
+TEXT_COLUMNS = ["prompt_hash", "instruction", "example"]
+
+
+def details_dataset_id(model_name: str) -> str:
+    """Get the per-sample details dataset of a model (e.g., filbench/details_org__model_private)"""
+    return f"filbench/details_{model_name.replace('/', '__')}_private"
+
+
+def project_mcf_details(df: pd.DataFrame) -> pd.DataFrame:
+    """Reduce a multiple-choice details split to its prompt hash, prediction and gold label
+
+    df (pd.DataFrame): the details split with `example`, `instruction`,
+        `predictions` and `gold_index` columns.
+    RETURNS (pd.DataFrame): the PREDICTION_COLUMNS and TEXT_COLUMNS of each sample.
+    """
+    # fmt: off
+    projected = pd.DataFrame({
+        "prompt_hash": df["example"].map(lambda x: hashlib.sha256(x.encode()).hexdigest()),
+        "instruction": df["instruction"],
+        "example": df["example"],
+        "mcf_predictions": df["predictions"].map(lambda x: np.argmax([bool(idx[1]) for idx in x])),
+        "gold": df["gold_index"].map(lambda x: int(x[0])),
+    })
+    # fmt: on
+    return projected
+
+
+class PredictionsCache:
+    """On-disk Parquet cache of the projected multiple-choice details of each model
+
+    Predictions are stored per (model, task), while the prompt texts are stored
+    once per task since every model shares them.
+
+    root/
+    ├── _texts/{task}.parquet           # prompt_hash, instruction, example
+    └── {model}/{task}.parquet          # prompt_hash, mcf_predictions, gold
+    """
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR / "predictions"):
+        self.root = Path(root)
+
+    def path(self, model_name: str, task_name: str) -> Path:
+        return (
+            self.root
+            / model_name.replace("/", "__")
+            / f"{format_task(task_name)}.parquet"
+        )
+
+    def texts_path(self, task_name: str) -> Path:
+        return self.root / "_texts" / f"{format_task(task_name)}.parquet"
+
+    def get(self, model_name: str, task_name: str) -> Optional[pd.DataFrame]:
+        """The PREDICTION_COLUMNS of a model on a task, without the prompt texts"""
+        path = self.path(model_name, task_name)
+        return pd.read_parquet(path) if path.exists() else None
+
+    def texts(self, task_name: str) -> Optional[pd.DataFrame]:
+        """The TEXT_COLUMNS of the prompts of a task, shared by every model"""
+        texts_path = self.texts_path(task_name)
+        return pd.read_parquet(texts_path) if texts_path.exists() else None
+
+    def put(self, model_name: str, task_name: str, df: pd.DataFrame):
+        # The texts are written first, so that cached predictions always have their texts
+        texts_path = self.texts_path(task_name)
+        texts = df[TEXT_COLUMNS].drop_duplicates("prompt_hash")
+        if texts_path.exists():
+            cached = pd.read_parquet(texts_path)
+            new = texts[~texts["prompt_hash"].isin(cached["prompt_hash"])]
+            texts = pd.concat([cached, new], ignore_index=True) if len(new) else None
+        if texts is not None:
+            _write_parquet(texts, texts_path)
+        _write_parquet(df[PREDICTION_COLUMNS], self.path(model_name, task_name))
+
+
+def load_mcf_predictions(
+    model_names: list[str],
+    task_names: list[str],
+    cache: Optional[PredictionsCache] = None,
+    n_workers: int = 8,
+    refresh: bool = False,
+) -> dict[str, dict[str, pd.DataFrame]]:
+    """Load the multiple-choice predictions of several models on several tasks
+
+    Pairs that aren't cached are downloaded concurrently on a bounded thread
+    pool (the work is dominated by network and disk I/O). Each result is
+    projected to its prompt hash, prediction and gold label, and written to
+    the cache as soon as it arrives so an interrupted run keeps its progress.
+    The prompt texts are only written to the cache, and can be read back once
+    per task with `load_prompt_texts`.
+
+    model_names (list[str]): the models, as in `details_dataset_id`.
+    task_names (list[str]): the lighteval task names (e.g., filbench|sib200_tgl_mcf|0).
+    cache (Optional[PredictionsCache]): the cache to read from and write to.
+    n_workers (int): the maximum number of concurrent downloads.
+    refresh (bool): if set, download every pair again and overwrite the cache.
+    RETURNS (dict[str, dict[str, pd.DataFrame]]): the PREDICTION_COLUMNS of each model, per task.
+    """
+    from rich.progress import Progress
+
+    results: dict[str, dict[str, pd.DataFrame]] = {task: {} for task in task_names}
+    pending = []
+    for task in task_names:
+        for model in model_names:
+            cached = None if (cache is None or refresh) else cache.get(model, task)
+            if cached is not None:
+                results[task][model] = cached
+            else:
+                pending.append((task, model))
+
+    with Progress() as progress:
+        bar = progress.add_task(
+            f"Loading predictions ({len(task_names) * len(model_names) - len(pending)} cached)",
+            total=len(pending),
+        )
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            futures = {
+                executor.submit(_load_one, model, task): (task, model)
+                for task, model in pending
+            }
+            for future in as_completed(futures):
+                task, model = futures[future]
+                df = future.result()
+                if cache is not None:
+                    cache.put(model, task, df)
+                results[task][model] = df[PREDICTION_COLUMNS]
+                progress.advance(bar)
+
+    # Keep the models in the order they were requested
+    return {
+        task: {model: results[task][model] for model in model_names}
+        for task in task_names
+    }
+
+
+def load_prompt_texts(
+    task_names: list[str], cache: PredictionsCache
+) -> dict[str, pd.DataFrame]:
+    """Read the cached prompt texts of each task, e.g. for `build_prediction_tables`
+
+    task_names (list[str]): the lighteval task names.
+    cache (PredictionsCache): the cache that `load_mcf_predictions` wrote to.
+    RETURNS (dict[str, pd.DataFrame]): the TEXT_COLUMNS of each task that has cached texts.
+    """
+    texts = {task: cache.texts(task) for task in task_names}
+    return {task: df for task, df in texts.items() if df is not None}
+
+
+@dataclass
+class PredictionTable:
+    """Predictions of several models on the examples of a task that they all share
+
+    Each prompt is stored once: the text columns (if attached) and the gold
+    labels have one row per example, and the predictions are a dense
+    (n_models, n_examples) int8 matrix, so the table grows by a single byte
+    per example for every model added.
+    """
+
+    task: str  # lighteval task name
+    models: list[str]  # model names, one per row of `predictions`
+    prompt_hashes: np.ndarray  # (n_examples,) prompt hash of each example
+    texts: Optional[
+        pd.DataFrame
+    ]  # (n_examples,) instruction and example text, if attached
+    gold: np.ndarray  # (n_examples,) int8 gold choice
+    predictions: np.ndarray  # (n_models, n_examples) int8 predicted choice
+
+    def __len__(self) -> int:
+        return len(self.prompt_hashes)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Wide table with one column of predictions per model"""
+        df = pd.DataFrame({"prompt_hash": self.prompt_hashes})
+        if self.texts is not None:
+            df[["instruction", "example"]] = self.texts[
+                ["instruction", "example"]
+            ].values
+        df["gold"] = self.gold
+        predictions = pd.DataFrame(self.predictions.T, columns=self.models)
+        return pd.concat([df, predictions], axis=1)
+
+
+def build_prediction_table(
+    task: str,
+    model_dfs: dict[str, pd.DataFrame],
+    texts: Optional[pd.DataFrame] = None,
+) -> PredictionTable:
+    """Join the predictions of several models on the prompts they have in common
+
+    Prompt hashes are interned once to integer IDs (their position in the
+    first model's frame), and every other model is mapped onto those IDs with
+    a single hash lookup. The examples shared by every model are then selected
+    with a count over the IDs, and the prompt texts, if given, are looked up
+    once for the shared examples.
+
+    task (str): the lighteval task name.
+    model_dfs (dict[str, pd.DataFrame]): the `load_mcf_predictions` frame of each model.
+    texts (Optional[pd.DataFrame]): the TEXT_COLUMNS of the task's prompts, e.g. from `load_prompt_texts`.
+    RETURNS (PredictionTable): the predictions on the examples shared by every model.
+    """
+    models = list(model_dfs)
+    base = model_dfs[models[0]].drop_duplicates("prompt_hash")
+    ids = pd.Index(base["prompt_hash"])
+
+    model_ids, model_rows = [], []
+    coverage = np.zeros(len(ids), dtype=np.int64)
+    for model in models:
+        prompt_ids = ids.get_indexer(model_dfs[model]["prompt_hash"])
+        # Keep the first row of each prompt, as the base model does
+        found = np.flatnonzero(prompt_ids >= 0)
+        _, first = np.unique(prompt_ids[found], return_index=True)
+        rows = found[first]
+        model_ids.append(prompt_ids[rows])
+        model_rows.append(rows)
+        coverage[prompt_ids[rows]] += 1
+
+    shared = np.flatnonzero(coverage == len(models))
+    position = np.full(len(ids), -1, dtype=np.int64)
+    position[shared] = np.arange(len(shared))
+
+    predictions = np.zeros((len(models), len(shared)), dtype=np.int8)
+    for idx, model in enumerate(models):
+        keep = position[model_ids[idx]] >= 0
+        values = model_dfs[model]["mcf_predictions"].to_numpy()[model_rows[idx][keep]]
+        predictions[idx, position[model_ids[idx][keep]]] = _to_int8(values, model)
+
+    base = base.iloc[shared]
+    if texts is not None:
+        texts = (
+            texts.drop_duplicates("prompt_hash")
+            .set_index("prompt_hash")
+            .reindex(base["prompt_hash"])[["instruction", "example"]]
+            .reset_index(drop=True)
+        )
+    return PredictionTable(
+        task=task,
+        models=models,
+        prompt_hashes=base["prompt_hash"].to_numpy(),
+        texts=texts,
+        gold=_to_int8(base["gold"].to_numpy(), "gold"),
+        predictions=predictions,
+    )
+
+
+def build_prediction_tables(
+    task_model_results: dict[str, dict[str, pd.DataFrame]],
+    texts: Optional[dict[str, pd.DataFrame]] = None,
+) -> dict[str, PredictionTable]:
+    """Build a `PredictionTable` for every task that has predictions, with its texts if given"""
+    texts = texts or {}
+    return {
+        task: build_prediction_table(task, model_dfs, texts.get(task))
+        for task, model_dfs in task_model_results.items()
+        if model_dfs
+    }
+
+
+def _to_int8(values: np.ndarray, name: str) -> np.ndarray:
+    values = np.asarray(values, dtype=np.int64)
+    if len(values) and (
+        values.min() < np.iinfo(np.int8).min or values.max() > np.iinfo(np.int8).max
+    ):
+        raise ValueError(f"Choice indices of {name} don't fit in int8.")
+    return values.astype(np.int8)
+
+
+def _load_one(model_name: str, task_name: str) -> pd.DataFrame:
+    from datasets import load_dataset
+
+    ds = load_dataset(
+        details_dataset_id(model_name), format_task(task_name), split="latest"
+    )
+    ds = ds.select_columns(["example", "instruction", "predictions", "gold_index"])
+    return project_mcf_details(ds.to_pandas())
+
+
+def _write_parquet(df: pd.DataFrame, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_path(path) as tmp_path:
+        df.to_parquet(tmp_path, index=False)
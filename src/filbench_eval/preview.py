@@ -0,0 +1,232 @@
+import json
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from .compute_score import PREVIEW_SUFFIX, Tasks
+from .cube import PredictionCube
+from .custom_tasks import SampleSubset
+from .details import format_task
+
+DEFAULT_TARGET_STDERR = 2.0  # points, on the 0-100 scale of task scores
+
+
+@dataclass
+class TaskPreview:
+    benchmark: str  # FilBench benchmark
+    num_samples: int  # canonical number of examples (the population)
+    sample_size: int  # number of examples to evaluate
+    stratified: bool  # whether the subsample is stratified by gold label
+    indices: dict[str, list[int]] = field(default_factory=dict)  # by details config
+
+    @property
+    def full(self) -> bool:
+        return self.sample_size >= self.num_samples
+
+    @property
+    def spec(self) -> str:
+        """The lighteval task spec to run"""
+        name = self.benchmark.split(":")[0]
+        return f"filbench|{name}{'' if self.full else PREVIEW_SUFFIX}|0|0"
+
+
+def preview_sample_size(num_samples: int, target_stderr: float) -> int:
+    """Number of examples needed to estimate a task score within a target standard error
+
+    A metric in [0, 1] has a variance of at most 1/4, so n0 = 1/4 / se^2
+    examples drawn with replacement are enough. Drawing without replacement
+    from `num_samples` examples needs fewer (finite population correction).
+
+    num_samples (int): the number of examples of the task.
+    target_stderr (float): the standard error to reach, on the 0-100 scale.
+    RETURNS (int): the sample size, at most `num_samples`.
+    """
+    n0 = 0.25 / (target_stderr / 100) ** 2
+    n = n0 / (1 + (n0 - 1) / num_samples)
+    return int(min(num_samples, np.ceil(n)))
+
+
+def allocate(strata_sizes: np.ndarray, sample_size: int) -> np.ndarray:
+    """Split a sample size across strata in proportion to their size (largest remainder)"""
+    exact = strata_sizes * sample_size / strata_sizes.sum()
+    allocation = np.floor(exact).astype(int)
+    remainder = sample_size - allocation.sum()
+    allocation[np.argsort(allocation - exact, kind="stable")[:remainder]] += 1
+    return np.minimum(allocation, strata_sizes)
+
+
+def stratified_sample(strata: np.ndarray, sample_size: int, seed: int) -> np.ndarray:
+    """Draw examples without replacement, proportionally from each stratum
+
+    strata (np.ndarray): the (n_examples,) stratum of each example.
+    sample_size (int): the number of examples to draw.
+    seed (int): the random seed, so that the same examples are drawn every time.
+    RETURNS (np.ndarray): the sorted positions of the drawn examples.
+    """
+    rng = np.random.default_rng(seed)
+    _, inverse, counts = np.unique(strata, return_inverse=True, return_counts=True)
+    allocation = allocate(counts, min(sample_size, len(strata)))
+    # Stable sort so that positions are grouped by stratum in their original order
+    order = np.argsort(inverse, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    chosen = [
+        order[start + rng.choice(count, size=k, replace=False)]
+        for start, count, k in zip(starts, counts, allocation)
+    ]
+    return np.sort(np.concatenate(chosen))
+
+
+def plan_preview(
+    target_stderr: float = DEFAULT_TARGET_STDERR,
+    seed: int = 0,
+    cube: Optional[PredictionCube] = None,
+) -> list[TaskPreview]:
+    """Pick a deterministic subsample of each task for a preview run
+
+    Examples are stratified by subset and gold label, using the gold labels
+    stored in the prediction cube. Tasks that aren't in the cube are sampled
+    uniformly, except tasks made of several subsets, which are run in full
+    since their subsets are unknown. Category weights don't change: previews
+    are scored with the canonical `Task.num_samples` weights.
+
+    target_stderr (float): the standard error to reach on each task, on the 0-100 scale.
+    seed (int): the random seed.
+    cube (Optional[PredictionCube]): a prediction cube with the gold labels of each task.
+    RETURNS (list[TaskPreview]): the subsample of each task.
+    """
+    previews = []
+    for task in Tasks:
+        benchmark, num_samples = task.value.benchmark, task.value.num_samples
+        sample_size = preview_sample_size(num_samples, target_stderr)
+        configs = sorted(
+            config
+            for config in (cube.tasks if cube is not None else [])
+            if cube.meta["tasks"][config]["benchmark"] == benchmark
+        )
+        # Hash the benchmark name so that each task gets its own stream of samples
+        task_seed = [seed, zlib.crc32(benchmark.encode())]
+        if sample_size >= num_samples:
+            preview = TaskPreview(benchmark, num_samples, num_samples, False)
+        elif configs:
+            golds = [np.asarray(cube.open(config).gold) for config in configs]
+            offsets = np.cumsum([0] + [len(gold) for gold in golds])
+            # One stratum per (subset, gold label)
+            strata = np.concatenate(
+                [idx * 65536 + gold.astype(np.int64) for idx, gold in enumerate(golds)]
+            )
+            positions = stratified_sample(strata, sample_size, task_seed)
+            indices = {
+                config: (positions[(positions >= start) & (positions < end)] - start)
+                .astype(int)
+                .tolist()
+                for config, start, end in zip(configs, offsets[:-1], offsets[1:])
+            }
+            preview = TaskPreview(
+                benchmark, num_samples, len(positions), True, indices=indices
+            )
+        elif ":" not in benchmark:
+            positions = stratified_sample(np.zeros(num_samples), sample_size, task_seed)
+            config = format_task(f"filbench|{benchmark}|0")
+            preview = TaskPreview(
+                benchmark,
+                num_samples,
+                sample_size,
+                False,
+                indices={config: positions.tolist()},
+            )
+        else:
+            preview = TaskPreview(benchmark, num_samples, num_samples, False)
+        previews.append(preview)
+    return previews
+
+
+def write_preview(
+    previews: list[TaskPreview], output_dir: Path, target_stderr: float, seed: int
+) -> tuple[Path, Path]:
+    """Save the subsample of each task and the matching lighteval task list
+
+    RETURNS (tuple[Path, Path]): the paths of the preview.json and tasks.txt files.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    preview_path = output_dir / "preview.json"
+    with open(preview_path, "w") as f:
+        json.dump(
+            {
+                "target_stderr": target_stderr,
+                "seed": seed,
+                "tasks": {preview.benchmark: asdict(preview) for preview in previews},
+            },
+            f,
+        )
+    tasks_path = output_dir / "tasks.txt"
+    tasks_path.write_text("".join(f"{preview.spec}\n" for preview in previews))
+    return preview_path, tasks_path
+
+
+def preview_subsets(previews: list[TaskPreview]) -> list[SampleSubset]:
+    """List the documents of each subsampled task, to define its preview task for lighteval"""
+    return [
+        SampleSubset(config, PREVIEW_SUFFIX, indices=sorted(indices))
+        for preview in previews
+        if not preview.full
+        for config, indices in preview.indices.items()
+    ]
+
+
+def read_preview(path: Path) -> dict[str, int]:
+    """Read the subsample size of each previewed benchmark, as expected by `build_report`"""
+    with open(path, "r") as f:
+        tasks: dict[str, dict[str, Any]] = json.load(f)["tasks"]
+    return {
+        benchmark: task["sample_size"]
+        for benchmark, task in tasks.items()
+        if task["sample_size"] < task["num_samples"]
+    }
+
+
+def pretty_preview(previews: list[TaskPreview], predicted: Optional[float] = None):
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    table = Table(title="Preview Subsamples")
+    table.add_column("Task", justify="left", style="cyan", no_wrap=True)
+    table.add_column("Samples", justify="right")
+    table.add_column("Preview", justify="right")
+    table.add_column("Stratified", justify="left")
+    for preview in previews:
+        table.add_row(
+            preview.benchmark,
+            str(preview.num_samples),
+            "full" if preview.full else str(preview.sample_size),
+            "yes" if preview.stratified else "",
+        )
+    console.print(table)
+    total = sum(preview.num_samples for preview in previews)
+    sampled = sum(preview.sample_size for preview in previews)
+    console.print(
+        f"[bold]Samples:[/bold] {sampled} of {total} ({total / sampled:.1f}x fewer)"
+    )
+    if predicted is not None:
+        console.print(
+            f"[bold]Predicted runtime in a single lighteval job:[/bold] {predicted / 60:.1f} min"
+        )
+
+
+def pretty_estimate(estimate: dict[str, Any]):
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    table = Table(title="Preview Estimates")
+    table.add_column("Category", justify="left", style="cyan", no_wrap=True)
+    table.add_column("Score", justify="right", style="magenta")
+    table.add_column("± Std. Error", justify="right")
+    rows = [("FilBench", estimate["filbench_score"])]
+    rows += list(estimate["category_scores"].items())
+    for name, score in rows:
+        table.add_row(name, f"{score['score']:.2f}", f"{score['stderr']:.2f}")
+    console.print(table)
@@ -0,0 +1,218 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Sequence
+
+import numpy as np
+
+# Pairs whose shorter side fits in one machine word use the bit-parallel kernel
+WORD_BITS = 64
+# Upper bound on the size of the (pairs, len_a, len_b) match tensor per chunk
+CHUNK_ELEMENTS = 2**22
+
+_BITS = np.left_shift(np.uint64(1), np.arange(WORD_BITS, dtype=np.uint64))
+
+
+class RougeLScorer:
+    """Batched ROUGE-L scorer that matches `rouge_score.rouge_scorer.RougeScorer`
+
+    Every distinct string is tokenized once (with the same tokenizer and
+    stemmer as `rouge_score`) and cached as an array of token IDs. Scoring
+    deduplicates the (target, prediction) pairs and computes their longest
+    common subsequence with a bit-parallel kernel that processes many pairs
+    per NumPy operation.
+
+    use_stemmer (bool): whether to apply the Porter stemmer, as in `rouge_score`.
+    n_workers (int): number of worker processes for the LCS computation.
+    """
+
+    def __init__(self, use_stemmer: bool = False, n_workers: int = 1):
+        from rouge_score import tokenizers
+
+        self._tokenizer = tokenizers.DefaultTokenizer(use_stemmer=use_stemmer)
+        self.n_workers = n_workers
+        self._vocab: dict[str, int] = {}
+        self._texts: dict[str, int] = {}
+        self._tokens: list[np.ndarray] = []
+
+    def text_id(self, text: str) -> int:
+        """Tokenize a string (once) and return the ID of its cached token array"""
+        text_id = self._texts.get(text)
+        if text_id is None:
+            tokens = self._tokenizer.tokenize(text)
+            ids = [self._vocab.setdefault(token, len(self._vocab)) for token in tokens]
+            text_id = len(self._tokens)
+            self._texts[text] = text_id
+            self._tokens.append(np.array(ids, dtype=np.int64))
+        return text_id
+
+    def tokenize(self, text: str) -> np.ndarray:
+        return self._tokens[self.text_id(text)]
+
+    def score(self, targets: Sequence[str], predictions: Sequence[str]) -> np.ndarray:
+        """Compute the ROUGE-L F-measure of each (target, prediction) pair
+
+        targets (Sequence[str]): the reference texts.
+        predictions (Sequence[str]): the predicted texts, aligned with the targets.
+        RETURNS (np.ndarray): the F-measure of each pair, as in `RougeScorer.score(target, prediction)`.
+        """
+        if len(targets) != len(predictions):
+            raise ValueError(
+                f"Got {len(targets)} targets but {len(predictions)} predictions."
+            )
+        if len(targets) == 0:
+            return np.zeros(0)
+
+        pair_ids = np.array(
+            [
+                (self.text_id(target), self.text_id(prediction))
+                for target, prediction in zip(targets, predictions)
+            ],
+            dtype=np.int64,
+        )
+        unique_pairs, inverse = np.unique(pair_ids, axis=0, return_inverse=True)
+        target_len = np.array([len(self._tokens[i]) for i in unique_pairs[:, 0]])
+        prediction_len = np.array([len(self._tokens[i]) for i in unique_pairs[:, 1]])
+        lcs = self._lcs(unique_pairs)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = lcs / prediction_len
+            recall = lcs / target_len
+            fmeasure = 2 * precision * recall / (precision + recall)
+        valid = (target_len > 0) & (prediction_len > 0) & (lcs > 0)
+        fmeasure = np.where(valid, fmeasure, 0.0)
+        return fmeasure[inverse.reshape(-1)]
+
+    def score_max(
+        self, references: Sequence[Sequence[str]], predictions: Sequence[str]
+    ) -> np.ndarray:
+        """Compute the best ROUGE-L F-measure of each prediction across its references"""
+        owners = np.repeat(np.arange(len(predictions)), [len(r) for r in references])
+        flat_refs = [ref for refs in references for ref in refs]
+        flat_preds = [predictions[i] for i in owners]
+        best = np.zeros(len(predictions))
+        np.maximum.at(best, owners, self.score(flat_refs, flat_preds))
+        return best
+
+    def _lcs(self, pairs: np.ndarray) -> np.ndarray:
+        # Pack the cached token arrays into one flat array with offsets
+        lengths = np.array([len(tokens) for tokens in self._tokens], dtype=np.int64)
+        offsets = np.cumsum(lengths) - lengths
+        flat = np.concatenate(self._tokens) if self._tokens else np.zeros(0, np.int64)
+        args = (offsets[pairs[:, 0]], lengths[pairs[:, 0]])
+        args += (offsets[pairs[:, 1]], lengths[pairs[:, 1]])
+        if self.n_workers <= 1 or len(pairs) < 2 * self.n_workers:
+            return lcs_lengths(flat, *args)
+
+        chunks = np.array_split(np.arange(len(pairs)), self.n_workers)
+        with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+            results = executor.map(
+                lcs_lengths,
+                [flat] * len(chunks),
+                *[[arg[chunk] for chunk in chunks] for arg in args],
+            )
+            return np.concatenate(list(results))
+
+
+def lcs_lengths(
+    tokens: np.ndarray,
+    start_a: np.ndarray,
+    len_a: np.ndarray,
+    start_b: np.ndarray,
+    len_b: np.ndarray,
+) -> np.ndarray:
+    """Compute the length of the longest common subsequence of many token sequences
+
+    Sequences are slices of a flat token array. Pairs are oriented so that the
+    shorter sequence is encoded as a bit vector, sorted by length so each chunk
+    has little padding, and solved with the bit-parallel LCS algorithm (Allison
+    & Dix, 1986; Hyyrö, 2004): one NumPy operation per token of the longer
+    sequence advances every pair in the chunk. Pairs whose shorter side doesn't
+    fit in a 64-bit word run the same algorithm on Python integers.
+
+    tokens (np.ndarray): the flat array of token IDs.
+    start_a, len_a (np.ndarray): offset and length of the first sequence of each pair.
+    start_b, len_b (np.ndarray): offset and length of the second sequence of each pair.
+    RETURNS (np.ndarray): the LCS length of each pair.
+    """
+    swap = len_a > len_b
+    short_start = np.where(swap, start_b, start_a)
+    short_len = np.where(swap, len_b, len_a)
+    long_start = np.where(swap, start_a, start_b)
+    long_len = np.where(swap, len_a, len_b)
+    lcs = np.zeros(len(short_len), dtype=np.int64)
+
+    order = np.flatnonzero((short_len > 0) & (short_len <= WORD_BITS))
+    order = order[np.lexsort((short_len[order], long_len[order]))]
+    start = 0
+    while start < len(order):
+        # Sorted by length, so the last pair of a chunk sets the padded size
+        stop = start + max(1, CHUNK_ELEMENTS // (WORD_BITS * long_len[order[start]]))
+        stop = min(stop, len(order))
+        stop = start + max(
+            1,
+            min(
+                stop - start, CHUNK_ELEMENTS // (WORD_BITS * long_len[order[stop - 1]])
+            ),
+        )
+        chunk = order[start:stop]
+        lcs[chunk] = _lcs_bit_parallel(
+            _gather(tokens, short_start[chunk], short_len[chunk], fill=-1),
+            _gather(tokens, long_start[chunk], long_len[chunk], fill=-2),
+            short_len[chunk],
+        )
+        start = stop
+
+    for i in np.flatnonzero(short_len > WORD_BITS):
+        a = tokens[short_start[i] : short_start[i] + short_len[i]]
+        b = tokens[long_start[i] : long_start[i] + long_len[i]]
+        lcs[i] = _lcs_bigint(a.tolist(), b.tolist())
+    return lcs
+
+
+def _gather(
+    tokens: np.ndarray, starts: np.ndarray, lengths: np.ndarray, fill: int
+) -> np.ndarray:
+    """Slice many sequences out of a flat array into a padded matrix"""
+    positions = np.arange(lengths.max())
+    index = np.minimum(starts[:, None] + positions, max(len(tokens) - 1, 0))
+    return np.where(positions < lengths[:, None], tokens[index], fill)
+
+
+def _lcs_bit_parallel(a: np.ndarray, b: np.ndarray, len_a: np.ndarray) -> np.ndarray:
+    # match[p, j] has bit i set when a[p, i] == b[p, j]
+    match = np.bitwise_or.reduce(
+        np.where(
+            a[:, :, None] == b[:, None, :], _BITS[: a.shape[1], None], np.uint64(0)
+        ),
+        axis=1,
+    )
+    v = np.full(len(a), np.iinfo(np.uint64).max, dtype=np.uint64)
+    for j in range(b.shape[1]):
+        u = v & match[:, j]
+        v = (v + u) | (v - u)
+
+    mask = np.where(
+        len_a >= WORD_BITS,
+        np.iinfo(np.uint64).max,
+        np.left_shift(np.uint64(1), np.minimum(len_a, WORD_BITS - 1).astype(np.uint64))
+        - np.uint64(1),
+    ).astype(np.uint64)
+    return _popcount(~v & mask)
+
+
+def _popcount(x: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x).astype(np.int64)
+    bits = np.unpackbits(x.astype(np.uint64).view(np.uint8)).reshape(len(x), -1)
+    return bits.sum(axis=1).astype(np.int64)
+
+
+def _lcs_bigint(a: list[int], b: list[int]) -> int:
+    match: dict[int, int] = {}
+    for i, token in enumerate(a):
+        match[token] = match.get(token, 0) | (1 << i)
+    full = (1 << len(a)) - 1
+    v = full
+    for token in b:
+        u = v & match.get(token, 0)
+        v = (v + u) | (v - u)
+    return len(a) - bin(v & full).count("1")
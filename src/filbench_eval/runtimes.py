@@ -0,0 +1,265 @@
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from .cache import DEFAULT_CACHE_DIR
+from .compute_score import PREVIEW_SUFFIX, Tasks, load_runs, parse_shard
+
+
+@dataclass(frozen=True)
+class RuntimeRecord:
+    model: str  # model name (or HF dataset ID) that was evaluated
+    task: str  # lighteval task name, without subsets (e.g. global_mmlu_all_tgl_mcf)
+    run: str  # timestamp of the lighteval run
+    num_samples: int  # number of examples evaluated in the run
+    seconds: float  # wall time spent on the task
+    model_size: Optional[str] = None  # as reported in config_general
+    model_dtype: Optional[str] = None  # as reported in config_general
+    # True if the run evaluated several tasks, so `seconds` is only a share of its wall time
+    apportioned: bool = False
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return (self.model, self.task, self.run)
+
+    @property
+    def samples_per_sec(self) -> float:
+        return self.num_samples / self.seconds if self.seconds > 0 else float("nan")
+
+
+@dataclass
+class TaskThroughput:
+    task: str  # lighteval task name
+    n_runs: int  # number of measured runs
+    num_samples: int  # median number of examples per run
+    median_seconds: float  # median wall time per run
+    median_samples_per_sec: float  # median throughput across runs
+    p10_samples_per_sec: float  # slow runs: 10th percentile of the throughput
+    p90_samples_per_sec: float  # fast runs: 90th percentile of the throughput
+
+
+def task_name(lighteval_task: str) -> str:
+    """Map a lighteval task (e.g. filbench|global_mmlu_all_tgl_mcf:anatomy|0) to its base task name
+
+    Sample shards (e.g. balita_tgl_mcf-shard-0-of-4) and previews (e.g.
+    balita_tgl_mcf-preview) map to the task they are part of.
+    """
+    parts = lighteval_task.split("|")
+    name = parts[1] if len(parts) > 1 else parts[0]
+    shard = parse_shard(name)
+    name = (shard[0] if shard else name).split(":")[0]
+    return name.removesuffix(PREVIEW_SUFFIX)
+
+
+def extract_runtimes(
+    run: dict[str, Any], run_id: str, model: Optional[str] = None
+) -> list[RuntimeRecord]:
+    """Extract the wall time and sample counts of the tasks in a lighteval run
+
+    lighteval records a single start and end time per run, so when a run
+    evaluated several tasks, its wall time is split between them in
+    proportion to their number of examples, and the records are marked as
+    `apportioned`. Sample counts come from `summary_tasks` and fall back to
+    the canonical size of the task.
+
+    run (dict[str, Any]): decoded lighteval results, with `config_general` and `summary_tasks` fields.
+    run_id (str): the timestamp of the run.
+    model (Optional[str]): the model name to record if `config_general` has none.
+    RETURNS (list[RuntimeRecord]): one record per task, or none if the run has no timing information.
+    """
+    config = run.get("config_general") or {}
+    seconds = run_seconds(config)
+    if seconds is None:
+        return []
+
+    num_samples: dict[str, int] = {}
+    for lighteval_task, summary in (run.get("summary_tasks") or {}).items():
+        if lighteval_task == "all":
+            continue
+        counts = [summary.get(key) for key in ("truncated", "non_truncated")]
+        if all(count is not None for count in counts):
+            name = task_name(lighteval_task)
+            num_samples[name] = num_samples.get(name, 0) + int(sum(counts))
+    if not num_samples:
+        canonical = canonical_num_samples()
+        for lighteval_task in run.get("results") or {}:
+            name = task_name(lighteval_task)
+            if lighteval_task != "all" and name in canonical:
+                num_samples[name] = canonical[name]
+    total_samples = sum(num_samples.values())
+    if not total_samples:
+        return []
+
+    return [
+        RuntimeRecord(
+            model=config.get("model_name") or model or "",
+            task=name,
+            run=run_id,
+            num_samples=count,
+            seconds=seconds * count / total_samples,
+            model_size=config.get("model_size"),
+            model_dtype=config.get("model_dtype"),
+            apportioned=len(num_samples) > 1,
+        )
+        for name, count in num_samples.items()
+    ]
+
+
+def run_seconds(config: dict[str, Any]) -> Optional[float]:
+    """Return the wall time of a lighteval run from its `config_general`"""
+    start, end = config.get("start_time"), config.get("end_time")
+    if start is not None and end is not None and float(end) > float(start):
+        return float(end) - float(start)
+    # Older lighteval versions only store the total, as a string (sic)
+    total = config.get("total_evaluation_time_secondes")
+    try:
+        return float(total) if total is not None else None
+    except ValueError:
+        return None
+
+
+def collect_runtimes(
+    dataset_id: str, revision: Optional[str] = None
+) -> list[RuntimeRecord]:
+    """Collect the runtimes of every run in a lighteval results dataset
+
+    Each split of the `results` config is a run, named after its timestamp.
+    Records are keyed by the model name in the run, like `collect_local_runtimes`,
+    and by the dataset ID only if the run has no model name.
+
+    dataset_id (str): The Hugging Face dataset ID.
+    revision (Optional[str]): the branch, tag or commit hash of the dataset.
+    RETURNS (list[RuntimeRecord]): one record per task and run.
+    """
+    records = []
+    for split, run in load_runs(dataset_id, revision=revision):
+        records.extend(extract_runtimes(run, run_id=split, model=dataset_id))
+    return records
+
+
+def collect_local_runtimes(results_dir: Path) -> list[RuntimeRecord]:
+    """Collect the runtimes of the lighteval results files in a local directory"""
+    from .local import find_results_files, run_timestamp
+
+    records = []
+    for path in find_results_files(results_dir):
+        with open(path, "r") as f:
+            run = json.load(f)
+        records.extend(extract_runtimes(run, run_id=run_timestamp(path)))
+    return records
+
+
+class RuntimeHistory:
+    """Append-only history of measured task runtimes
+
+    Records are stored one per line in a JSONL file so that collecting the
+    runtimes of new models only appends to it. A record is identified by its
+    model, task and run, and collecting the same run twice is a no-op.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_DIR / "runtimes.jsonl"):
+        self.path = Path(path)
+
+    def records(self) -> list[RuntimeRecord]:
+        if not self.path.exists():
+            return []
+        records = {}
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    record = RuntimeRecord(**json.loads(line))
+                except (json.JSONDecodeError, TypeError):
+                    continue  # partially written line
+                records[record.key] = record
+        return list(records.values())
+
+    def add(self, records: Iterable[RuntimeRecord]) -> int:
+        """Append new records to the history
+
+        records (Iterable[RuntimeRecord]): the records to add.
+        RETURNS (int): the number of records that were not in the history yet.
+        """
+        seen = {record.key for record in self.records()}
+        new = []
+        for record in records:
+            if record.key not in seen:
+                seen.add(record.key)
+                new.append(record)
+        if new:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # A single write per call so that concurrent collectors don't interleave lines
+            lines = "".join(json.dumps(asdict(record)) + "\n" for record in new)
+            with open(self.path, "a") as f:
+                f.write(lines)
+        return len(new)
+
+
+def throughput_stats(
+    records: Iterable[RuntimeRecord],
+    model: Optional[str] = None,
+    include_apportioned: bool = False,
+) -> dict[str, TaskThroughput]:
+    """Summarize the measured throughput (samples/sec) of each task
+
+    Medians and percentiles are used instead of means so that a single
+    stalled or preempted run doesn't skew the estimates. Runs that evaluated
+    several tasks are left out by default, since their split of the wall time
+    assumes that every task has the same per-sample cost.
+
+    records (Iterable[RuntimeRecord]): the measured runtimes.
+    model (Optional[str]): if set, only use the runs of this model.
+    include_apportioned (bool): if True, also use the records of runs that evaluated several tasks.
+    RETURNS (dict[str, TaskThroughput]): the throughput of each task, sorted by task name.
+    """
+    by_task: dict[str, list[RuntimeRecord]] = {}
+    for record in records:
+        if record.apportioned and not include_apportioned:
+            continue
+        if record.seconds > 0 and (model is None or record.model == model):
+            by_task.setdefault(record.task, []).append(record)
+
+    stats = {}
+    for task in sorted(by_task):
+        runs = by_task[task]
+        throughput = np.array([record.samples_per_sec for record in runs])
+        p10, p50, p90 = np.percentile(throughput, [10, 50, 90])
+        stats[task] = TaskThroughput(
+            task=task,
+            n_runs=len(runs),
+            num_samples=int(np.median([record.num_samples for record in runs])),
+            median_seconds=float(np.median([record.seconds for record in runs])),
+            median_samples_per_sec=float(p50),
+            p10_samples_per_sec=float(p10),
+            p90_samples_per_sec=float(p90),
+        )
+    return stats
+
+
+def canonical_num_samples() -> dict[str, int]:
+    """Return the canonical number of examples of each lighteval task in the registry"""
+    return {task_name(task.value.benchmark): task.value.num_samples for task in Tasks}
+
+
+def pretty_throughput(stats: dict[str, TaskThroughput]):
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    table = Table(title="Measured Task Throughput")
+    table.add_column("Task", justify="left", style="cyan", no_wrap=True)
+    table.add_column("Runs", justify="right")
+    table.add_column("Samples", justify="right")
+    table.add_column("Median time (min)", justify="right")
+    table.add_column("Samples/sec (p10 / p50 / p90)", justify="right")
+    for task in stats.values():
+        table.add_row(
+            task.task,
+            str(task.n_runs),
+            str(task.num_samples),
+            f"{task.median_seconds / 60:.1f}",
+            f"{task.p10_samples_per_sec:.2f} / {task.median_samples_per_sec:.2f} / {task.p90_samples_per_sec:.2f}",
+        )
+    console.print(table)
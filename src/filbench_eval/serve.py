@@ -0,0 +1,251 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .cache import _COMMIT_SHA, ResultsCache
+from .compute_score import compute_filbench_score, compute_score
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_REPORTS = 128  # parsed reports kept in memory
+DEFAULT_TTL = 300.0  # seconds before a report of a branch (not a commit) is reloaded
+
+# Loads the report of (hf_path, revision, refresh)
+Loader = Callable[[str, Optional[str], bool], dict[str, Any]]
+
+
+def default_loader(cache: Optional[ResultsCache] = None) -> Loader:
+    """Load reports with `compute_score`, through the on-disk results cache if set"""
+
+    def load(hf_path: str, revision: Optional[str], refresh: bool) -> dict[str, Any]:
+        return compute_score(hf_path, cache=cache, refresh=refresh, revision=revision)
+
+    return load
+
+
+class ReportService:
+    """Serve model reports from memory, loading each one at most once at a time
+
+    Parsed reports are kept in a least-recently-used cache of `max_reports`
+    entries. Reports of a commit hash never change, while reports of a branch
+    (or of no revision, i.e. main) are reloaded once they are older than
+    `ttl` seconds. Concurrent requests for a report that isn't cached share a
+    single load (single flight), which runs in a thread pool so that the event
+    loop keeps serving cached reports in the meantime.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Loader] = None,
+        max_reports: int = DEFAULT_MAX_REPORTS,
+        ttl: float = DEFAULT_TTL,
+        n_workers: int = 4,
+        store_dir: Optional[Path] = None,
+    ):
+        self.loader = loader or default_loader(ResultsCache())
+        self.max_reports = max_reports
+        self.ttl = ttl
+        self.store_dir = Path(store_dir) if store_dir else None
+        self.executor = ThreadPoolExecutor(max_workers=n_workers)
+        # (hf_path, revision) -> (load time, report)
+        self.reports: OrderedDict[tuple[str, Optional[str]], tuple[float, Any]] = (
+            OrderedDict()
+        )
+        self.inflight: dict[tuple[str, Optional[str]], asyncio.Future] = {}
+        self._leaderboard: Optional[tuple[int, list[dict[str, Any]]]] = None
+        self.stats = {"hits": 0, "misses": 0, "loads": 0, "errors": 0}
+
+    async def report(
+        self, hf_path: str, revision: Optional[str] = None, refresh: bool = False
+    ) -> dict[str, Any]:
+        """Return the report of a model, from memory if possible
+
+        hf_path (str): The Hugging Face dataset ID containing the results.
+        revision (Optional[str]): the branch, tag or commit hash of the dataset.
+        refresh (bool): if True, reload the report even if it is cached.
+        RETURNS (dict[str, Any]): the output of `compute_score`.
+        """
+        key = (hf_path, revision)
+        entry = self.reports.get(key)
+        if entry is not None and not refresh and self._fresh(key, entry[0]):
+            self.reports.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+        self.stats["misses"] += 1
+        future = self.inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, refresh))
+            self.inflight[key] = future
+            future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        # Shield so that a client disconnecting doesn't cancel the shared load
+        return await asyncio.shield(future)
+
+    async def _load(self, key: tuple[str, Optional[str]], refresh: bool) -> Any:
+        loop = asyncio.get_running_loop()
+        self.stats["loads"] += 1
+        try:
+            report = await loop.run_in_executor(
+                self.executor, self.loader, *key, refresh
+            )
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        self.reports[key] = (time.monotonic(), report)
+        self.reports.move_to_end(key)
+        while len(self.reports) > self.max_reports:
+            self.reports.popitem(last=False)
+        return report
+
+    def _fresh(self, key: tuple[str, Optional[str]], loaded_at: float) -> bool:
+        revision = key[1]
+        if revision and _COMMIT_SHA.match(revision):
+            return True
+        return time.monotonic() - loaded_at < self.ttl
+
+    async def leaderboard(self) -> list[dict[str, Any]]:
+        """Rows of the submissions store, or of the reports in memory if there is no store
+
+        RETURNS (list[dict[str, Any]]): one row per model, sorted by FilBench score.
+        """
+        if self.store_dir is None:
+            rows = [
+                {
+                    "hf_path": hf_path,
+                    "revision": revision,
+                    "model_name": report.get("config", {}).get("model_name"),
+                    "filbench_score": report.get("filbench_score"),
+                    **report.get("category_scores", {}),
+                }
+                for (hf_path, revision), (_, report) in self.reports.items()
+            ]
+            return sorted(rows, key=lambda row: -(row["filbench_score"] or 0.0))
+
+        # The store only changes through its index, so reread it only when the index does
+        try:
+            version = (self.store_dir / "index.json").stat().st_mtime_ns
+        except OSError:
+            return []
+        if self._leaderboard is None or self._leaderboard[0] != version:
+            loop = asyncio.get_running_loop()
+            rows = await loop.run_in_executor(self.executor, self._read_store)
+            self._leaderboard = (version, rows)
+        return self._leaderboard[1]
+
+    def _read_store(self) -> list[dict[str, Any]]:
+        from .store import SubmissionsStore
+
+        table = SubmissionsStore(self.store_dir).leaderboard()
+        return table.drop_columns(["report"]).to_pylist()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def make_app(service: ReportService):
+    """Build the aiohttp application of the scoring API
+
+    GET  /health                   -> {"status": "ok"}
+    GET  /score/{hf_path}          -> report of a model (?revision=...&refresh=1)
+    POST /filbench-score           -> scores of {"results": {...}}
+    GET  /leaderboard              -> rows of the leaderboard (?limit=...&q=...)
+    GET  /stats                    -> cache statistics
+    """
+    from aiohttp import web
+
+    routes = web.RouteTableDef()
+
+    def error(status: int, message: str):
+        return web.json_response({"error": message}, status=status)
+
+    @routes.get("/health")
+    async def health(request: web.Request):
+        return web.json_response({"status": "ok"})
+
+    @routes.get("/score/{hf_path:.+}")
+    async def score(request: web.Request):
+        hf_path = request.match_info["hf_path"]
+        revision = request.query.get("revision") or None
+        refresh = request.query.get("refresh", "").lower() in ("1", "true", "yes")
+        try:
+            report = await service.report(hf_path, revision=revision, refresh=refresh)
+        except Exception as e:
+            return error(502, f"Could not load {hf_path}: {type(e).__name__}: {e}")
+        return web.json_response(report)
+
+    @routes.post("/filbench-score")
+    async def filbench_score(request: web.Request):
+        try:
+            body = await request.json()
+            results = body["results"]
+        except Exception:
+            return error(400, 'Expected a JSON body with a "results" object.')
+        problem = _check_results(results)
+        if problem:
+            return error(400, problem)
+        score, category_scores = compute_filbench_score(results)
+        return web.json_response(
+            {"filbench_score": score, "category_scores": category_scores}
+        )
+
+    @routes.get("/leaderboard")
+    async def leaderboard(request: web.Request):
+        try:
+            limit = int(request.query["limit"]) if "limit" in request.query else None
+        except ValueError:
+            return error(400, "limit must be an integer.")
+        query = request.query.get("q", "").lower()
+        rows = await service.leaderboard()
+        if query:
+            rows = [
+                row
+                for row in rows
+                if any(
+                    query in str(row.get(name) or "").lower()
+                    for name in ("hf_id", "hf_path", "model_name")
+                )
+            ]
+        return web.json_response({"rows": rows[:limit]})
+
+    @routes.get("/stats")
+    async def stats(request: web.Request):
+        return web.json_response(
+            {
+                **service.stats,
+                "cached": len(service.reports),
+                "inflight": len(service.inflight),
+            }
+        )
+
+    async def on_cleanup(app: web.Application):
+        service.close()
+
+    app = web.Application()
+    app.add_routes(routes)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def _check_results(results: Any) -> Optional[str]:
+    """Describe what is wrong with the results of a score request, if anything"""
+    if not isinstance(results, dict):
+        return '"results" must map each benchmark to its metrics.'
+    for benchmark, metrics in results.items():
+        if not isinstance(metrics, dict):
+            return f'"results.{benchmark}" must map each metric to a number.'
+        for metric, value in metrics.items():
+            # bool is a subclass of int, but never a metric value
+            if value is not None and (
+                isinstance(value, bool) or not isinstance(value, (int, float))
+            ):
+                return f'"results.{benchmark}.{metric}" must be a number.'
+    return None
+
+
+def serve(service: ReportService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    from aiohttp import web
+
+    web.run_app(make_app(service), host=host, port=port, print=None)
@@ -0,0 +1,285 @@
+import json
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from .cache import DEFAULT_CACHE_DIR
+from .files import atomic_write
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_DELAY = 2.0  # seconds before the first retry
+DEFAULT_MAX_DELAY = 60.0  # cap on the delay between two attempts
+
+STATES = ("pending", "inflight", "done", "failed")
+
+
+@dataclass
+class SpoolOutcome:
+    item_id: str  # ID of the spooled submission
+    path_in_repo: str  # file name in the submissions dataset
+    state: str  # done, failed, or pending if another process claimed it first
+    attempts: int  # number of upload attempts so far, across runs
+    error: Optional[str] = None  # last error, if the upload failed
+    url: Optional[str] = None  # PR or commit URL, if the upload succeeded
+
+
+class SubmissionSpool:
+    """Local queue of submissions waiting to be uploaded to the Hub
+
+    Each submission is a JSON file that moves between state directories with
+    `os.rename`, which is atomic on the same filesystem. Claiming an item
+    renames it from pending/ to inflight/ with the PID of the claiming process
+    in its name, so concurrent workers never upload the same item twice.
+    Items left in inflight/ by a process that died are moved back to pending/
+    on the next drain. Every upload attempt is recorded in the item itself.
+
+    root/
+    ├── pending/{id}.json
+    ├── inflight/{id}.{pid}.json
+    ├── done/{id}.json
+    └── failed/{id}.json
+    """
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR / "spool"):
+        self.root = Path(root)
+        for state in STATES:
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+
+    def enqueue(
+        self,
+        report: dict[str, Any],
+        path_in_repo: str,
+        submissions_dataset: str,
+        commit_message: str,
+        commit_description: Optional[str] = None,
+    ) -> str:
+        """Add a submission to the queue
+
+        report (dict[str, Any]): the report to upload, with its display metadata.
+        path_in_repo (str): the file name in the submissions dataset.
+        submissions_dataset (str): the HF dataset to submit to.
+        commit_message (str): the title of the PR.
+        commit_description (Optional[str]): the description of the PR.
+        RETURNS (str): the ID of the spooled submission.
+        """
+        # Timestamp prefix so that items are drained in the order they were queued
+        item_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        item = {
+            "id": item_id,
+            "created": datetime.now().isoformat(),
+            "submissions_dataset": submissions_dataset,
+            "path_in_repo": path_in_repo,
+            "commit_message": commit_message,
+            "commit_description": commit_description,
+            "report": report,
+            "attempts": [],
+        }
+        self._write(self.root / "pending" / f"{item_id}.json", item)
+        return item_id
+
+    def items(self, state: str) -> list[dict[str, Any]]:
+        items = []
+        for path in sorted((self.root / state).glob("*.json")):
+            try:
+                items.append(self._read(path))
+            except (OSError, json.JSONDecodeError):
+                continue  # moved by another process in the meantime
+        return items
+
+    def recover(self) -> int:
+        """Move items claimed by processes that are no longer running back to pending/
+
+        RETURNS (int): the number of recovered items.
+        """
+        recovered = 0
+        for path in (self.root / "inflight").glob("*.json"):
+            item_id, pid = path.stem.rsplit(".", 1)
+            if _pid_alive(int(pid)):
+                continue
+            try:
+                os.rename(path, self.root / "pending" / f"{item_id}.json")
+                recovered += 1
+            except FileNotFoundError:
+                continue
+        return recovered
+
+    def retry_failed(self) -> int:
+        """Move failed items back to pending/ with a fresh budget of attempts"""
+        retried = 0
+        for path in (self.root / "failed").glob("*.json"):
+            try:
+                item = self._read(path)
+                item["retried_at"] = len(item["attempts"])
+                self._write(path, item)
+                os.rename(path, self.root / "pending" / path.name)
+                retried += 1
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+        return retried
+
+    def claim(self, item_ids: Optional[Iterable[str]] = None) -> Iterator[Path]:
+        """Atomically claim pending items, oldest first, for the current process
+
+        item_ids (Optional[Iterable[str]]): if set, only claim these items.
+        """
+        if item_ids is None:
+            paths = sorted((self.root / "pending").glob("*.json"))
+        else:
+            paths = [
+                self.root / "pending" / f"{item_id}.json"
+                for item_id in sorted(item_ids)
+            ]
+        for path in paths:
+            claimed = self.root / "inflight" / f"{path.stem}.{os.getpid()}.json"
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue  # claimed by another process
+            yield claimed
+
+    def drain(
+        self,
+        api: Optional[Any] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        sleep: Callable[[float], None] = time.sleep,
+        item_ids: Optional[Iterable[str]] = None,
+    ) -> list[SpoolOutcome]:
+        """Upload every pending submission, retrying failures with exponential backoff
+
+        An item moves to done/ after a successful upload, or to failed/ once it
+        has used up `max_attempts` (counted across runs, and reset by
+        `retry_failed`). Interrupted runs can
+        be resumed by draining again.
+
+        api (Optional[Any]): a `submit.HubClient`. Defaults to `huggingface_hub.HfApi()`.
+        max_attempts (int): the number of attempts before an item is marked as failed.
+        base_delay (float): the delay before the first retry, doubled on each retry.
+        max_delay (float): the longest delay between two attempts.
+        sleep (Callable[[float], None]): the function used to wait between attempts.
+        item_ids (Optional[Iterable[str]]): if set, only drain these items (e.g., the
+            one `enqueue` just returned), and leave the rest of the queue alone.
+        RETURNS (list[SpoolOutcome]): the outcome of each item drained in this run.
+        """
+        from huggingface_hub import CommitOperationAdd
+
+        if api is None:
+            from huggingface_hub import HfApi
+
+            api = HfApi()
+
+        self.recover()
+        outcomes = []
+        for path in self.claim(item_ids):
+            item = self._read(path)
+            state, error, url = "failed", None, None
+            while (
+                used := len(item["attempts"]) - item.get("retried_at", 0)
+            ) < max_attempts:
+                if used:
+                    delay = min(max_delay, base_delay * 2 ** (used - 1))
+                    sleep(delay * random.uniform(0.5, 1.0))
+                started = time.time()
+                try:
+                    content = json.dumps(item["report"], indent=2).encode()
+                    commit = api.create_commit(
+                        repo_id=item["submissions_dataset"],
+                        repo_type="dataset",
+                        operations=[
+                            CommitOperationAdd(
+                                path_in_repo=item["path_in_repo"],
+                                path_or_fileobj=content,
+                            )
+                        ],
+                        commit_message=item["commit_message"],
+                        commit_description=item["commit_description"],
+                        create_pr=True,
+                    )
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    item["attempts"].append(_attempt(started, error=error))
+                    # Record the attempt right away in case the process is killed
+                    self._write(path, item)
+                    continue
+                url = getattr(commit, "pr_url", None) or getattr(
+                    commit, "commit_url", None
+                )
+                item["attempts"].append(_attempt(started, url=url))
+                state, error = "done", None
+                break
+
+            self._write(path, item)
+            os.replace(path, self.root / state / f"{item['id']}.json")
+            outcomes.append(
+                SpoolOutcome(
+                    item_id=item["id"],
+                    path_in_repo=item["path_in_repo"],
+                    state=state,
+                    attempts=len(item["attempts"]),
+                    error=error,
+                    url=url,
+                )
+            )
+        return outcomes
+
+    def _read(self, path: Path) -> dict[str, Any]:
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _write(self, path: Path, item: dict[str, Any]):
+        atomic_write(path, json.dumps(item))
+
+
+def pretty_outcomes(outcomes: list[SpoolOutcome]):
+    from rich.console import Console
+    from rich.markup import escape
+    from rich.table import Table
+
+    console = Console()
+    table = Table(title="Submission Uploads")
+    table.add_column("ID", justify="left", style="cyan", no_wrap=True)
+    table.add_column("File", justify="left")
+    table.add_column("Attempts", justify="right")
+    table.add_column("Status", justify="left")
+    for outcome in outcomes:
+        if outcome.state == "done":
+            status = f"[green]done[/green] {escape(outcome.url or '')}"
+        elif outcome.state == "failed":
+            status = f"[red]failed[/red] {escape(outcome.error or '')}"
+        else:
+            status = f"[yellow]{outcome.state}[/yellow]"
+        table.add_row(
+            outcome.item_id,
+            escape(outcome.path_in_repo),
+            str(outcome.attempts),
+            status,
+        )
+    console.print(table)
+
+
+def _attempt(
+    started: float, error: Optional[str] = None, url: Optional[str] = None
+) -> dict[str, Any]:
+    return {
+        "started": datetime.fromtimestamp(started).isoformat(),
+        "elapsed": time.time() - started,
+        "ok": error is None,
+        "error": error,
+        "url": url,
+    }
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # owned by another user, but running
+    return True
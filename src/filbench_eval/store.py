@@ -0,0 +1,169 @@
+import json
+from pathlib import Path
+from typing import Any, Iterable
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from wasabi import msg
+
+from .compute_score import TaskCategory, Tasks
+from .files import atomic_write
+
+METADATA_FIELDS = [
+    ("hash", pa.string()),
+    ("hf_id", pa.string()),
+    ("url", pa.string()),
+    ("contact", pa.string()),
+    ("multilinguality", pa.string()),
+    ("model_type", pa.string()),
+    ("num_params", pa.float64()),
+    ("submission_date", pa.string()),
+]
+
+CONFIG_FIELDS = [
+    ("model_name", pa.string()),
+    ("model_dtype", pa.string()),
+    ("model_size", pa.string()),
+]
+
+
+def submission_schema() -> pa.Schema:
+    """Flat schema of a submission: metadata, scores, and the raw report"""
+    fields = METADATA_FIELDS + CONFIG_FIELDS + [("filbench_score", pa.float64())]
+    fields += [(category.value, pa.float64()) for category in TaskCategory]
+    fields += [(task.value.benchmark, pa.float64()) for task in Tasks]
+    fields += [("source_path", pa.string()), ("report", pa.string())]
+    return pa.schema(fields)
+
+
+class SubmissionsStore:
+    """Local append-only Parquet store of leaderboard submissions
+
+    Every call to `ingest` appends a new Parquet part with the submissions that
+    weren't seen before, and updates an index that maps each model hash
+    (`display_metadata.hash`) to the row of its latest submission. Exporting
+    the leaderboard only reads the rows in that index, so the refresh cost
+    grows with the number of new submissions instead of the whole history.
+
+    root/
+    ├── index.json              # {"latest": {hash: row location}, "ingested": {path: signature}}
+    └── parts/part-00000.parquet
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.parts_dir = self.root / "parts"
+        self.index_path = self.root / "index.json"
+        self.schema = submission_schema()
+        self.index = self._load_index()
+
+    def _load_index(self) -> dict[str, Any]:
+        if self.index_path.exists():
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        return {"latest": {}, "ingested": {}, "num_parts": 0}
+
+    def _save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.index_path, json.dumps(self.index))
+
+    def ingest(self, json_paths: Iterable[Path]) -> int:
+        """Append submissions that were not ingested yet
+
+        A file is ingested again if its modification time or size changed
+        (e.g., after a resubmission).
+
+        json_paths (Iterable[Path]): paths to submitted JSON reports.
+        RETURNS (int): the number of new rows appended to the store.
+        """
+        rows, signatures = [], {}
+        for json_path in json_paths:
+            json_path = Path(json_path)
+            stat = json_path.stat()
+            signature = f"{stat.st_mtime_ns}:{stat.st_size}"
+            key = str(json_path.resolve())
+            if self.index["ingested"].get(key) == signature:
+                continue
+
+            with open(json_path, "r") as f:
+                report = json.load(f)
+            signatures[key] = signature
+            if "display_metadata" not in report:
+                msg.warn(f"Skipping {json_path}: no `display_metadata` field.")
+                continue
+            rows.append(self._to_row(report, source_path=key))
+
+        if rows:
+            part_name = f"part-{self.index['num_parts']:05d}.parquet"
+            self.parts_dir.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pylist(rows, schema=self.schema)
+            pq.write_table(table, self.parts_dir / part_name)
+            self.index["num_parts"] += 1
+
+            latest = self.index["latest"]
+            for row_idx, row in enumerate(rows):
+                current = latest.get(row["hash"])
+                # Ties go to the newest ingest
+                if current is None or row["submission_date"] >= current["date"]:
+                    latest[row["hash"]] = {
+                        "part": part_name,
+                        "row": row_idx,
+                        "date": row["submission_date"],
+                    }
+
+        self.index["ingested"].update(signatures)
+        self._save_index()
+        return len(rows)
+
+    def ingest_dir(self, submissions_dir: Path) -> int:
+        """Append all new JSON reports found under a directory"""
+        return self.ingest(sorted(Path(submissions_dir).rglob("*.json")))
+
+    def leaderboard(self) -> pa.Table:
+        """Return the latest submission of each model, sorted by FilBench score"""
+        rows_per_part: dict[str, list[int]] = {}
+        for location in self.index["latest"].values():
+            rows_per_part.setdefault(location["part"], []).append(location["row"])
+
+        tables = [
+            pq.read_table(self.parts_dir / part).take(sorted(rows))
+            for part, rows in sorted(rows_per_part.items())
+        ]
+        if not tables:
+            return self.schema.empty_table()
+        table = pa.concat_tables(tables)
+        return table.sort_by([("filbench_score", "descending")])
+
+    def export(self, output_path: Path, include_report: bool = False):
+        """Save the current leaderboard as a CSV or Parquet file"""
+        table = self.leaderboard()
+        if not include_report:
+            table = table.drop_columns(["report"])
+        if Path(output_path).suffix == ".parquet":
+            pq.write_table(table, output_path)
+        else:
+            pa_csv.write_csv(table, output_path)
+
+    def _to_row(self, report: dict[str, Any], source_path: str) -> dict[str, Any]:
+        metadata = report.get("display_metadata", {})
+        config = report.get("config", {})
+        category_scores = report.get("category_scores", {})
+        results = report.get("results", {})
+        row = {name: metadata.get(name) for name, _ in METADATA_FIELDS}
+        row.update(
+            {
+                name: str(config[name]) if config.get(name) is not None else None
+                for name, _ in CONFIG_FIELDS
+            }
+        )
+        row["submission_date"] = row["submission_date"] or ""
+        row["filbench_score"] = report.get("filbench_score")
+        for category in TaskCategory:
+            row[category.value] = category_scores.get(category.value)
+        for task in Tasks:
+            result = results.get(task.value.benchmark) or {}
+            row[task.value.benchmark] = result.get(task.value.metric)
+        row["source_path"] = source_path
+        row["report"] = json.dumps(report)
+        return row
@@ -1,21 +1,33 @@
+import csv
 import hashlib
 import json
+import shutil
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Optional, Protocol
 
 import click
 import typer
-from huggingface_hub import HfApi
-from rich.console import Console
-from rich.table import Table
 from wasabi import msg
 
+DEFAULT_SUBMISSIONS_DATASET = "filbench/filbench-results-submission"
+MULTILINGUALITY_CHOICES = ["Multilingual", "SEA-Specific", "Monolingual"]
+MODEL_TYPE_CHOICES = ["Base", "SFT", "Preference-aligned", "Reasoning"]
+# Fields that a report must have before it can be submitted
+REPORT_FIELDS = ["filbench_score", "category_scores", "results"]
+
+if TYPE_CHECKING:
+    from .spool import SubmissionSpool
+
 
 def submit(
     json_path: Path,
-    submissions_dataset: str = "filbench/filbench-results-submission",
+    submissions_dataset: str = DEFAULT_SUBMISSIONS_DATASET,
     dry_run: bool = False,
+    spool: Optional["SubmissionSpool"] = None,
+    api: Optional["HubClient"] = None,
 ) -> dict[str, Any]:
     print(f"Submitting {json_path}...")
     with open(json_path, "r") as f:
@@ -32,25 +44,23 @@ def submit(
         model_url = f"https://huggingface.co/{hf_id}"
         typer.echo(f"Using default URL: {model_url}")
 
-    m_choices = click.Choice(["Multilingual", "SEA-Specific", "Monolingual"])
+    m_choices = click.Choice(MULTILINGUALITY_CHOICES)
     multilinguality: click.Choice = typer.prompt("🌎 Multilinguality", show_choices=True, type=m_choices)
-    t_choices = click.Choice(["Base", "SFT", "Preference-aligned", "Reasoning"])
+    t_choices = click.Choice(MODEL_TYPE_CHOICES)
     model_type: click.Choice = typer.prompt("⭕ Model Type", show_choices=True, type=t_choices)
     num_params: int = typer.prompt("📈 Number of parameters", type=float)
     # fmt: on
 
     results_dict.update(
         {
-            "display_metadata": {
-                "hf_id": hf_id,
-                "url": model_url,
-                "contact": contact,
-                "multilinguality": multilinguality,
-                "model_type": model_type,
-                "num_params": num_params,
-                "submission_date": datetime.now().isoformat(),
-                "hash": hashlib.sha256(f"{hf_id}".encode()).hexdigest(),
-            }
+            "display_metadata": display_metadata(
+                hf_id=hf_id,
+                url=model_url,
+                contact=contact,
+                multilinguality=multilinguality,
+                model_type=model_type,
+                num_params=num_params,
+            )
         }
     )
 
@@ -59,24 +69,346 @@ def submit(
         json.dump(results_dict, f, indent=2)
 
     if not dry_run:
-        msg.info(f"Submitting files to {submissions_dataset}")
-        api = HfApi()
+        from .spool import SubmissionSpool, pretty_outcomes
+
+        # Queue the upload first so that a failed upload can be resumed with
+        # `filbench drain-submissions` instead of answering the prompts again
+        spool = spool or SubmissionSpool()
         commit_message = f"[Submission] FilBench results for {hf_id})"
         commit_description = f"Filbench score: {results_dict.get('filbench_score')},\nCategory Score: {results_dict.get('category_scores')}"
-        api.upload_file(
-            path_or_fileobj=str(json_path),
-            path_in_repo=str(json_path),
-            repo_id=submissions_dataset,
-            repo_type="dataset",
+        item_id = spool.enqueue(
+            results_dict,
+            path_in_repo=Path(json_path).name,
+            submissions_dataset=submissions_dataset,
             commit_message=commit_message,
             commit_description=commit_description,
-            create_pr=True,
         )
+        msg.info(f"Submitting files to {submissions_dataset}")
+        # Only drain our own item: other processes may be uploading the rest of the spool
+        outcomes = spool.drain(api=api, item_ids=[item_id])
+        if not outcomes:
+            msg.info(
+                f"Submission {item_id} was claimed by another `filbench` process. "
+                "Run `filbench drain-submissions` to check on it."
+            )
+            raise typer.Exit(code=0)
+        if outcomes[0].state != "done":
+            pretty_outcomes(outcomes)
+            msg.fail(
+                f"Upload failed. It is kept in {spool.root / 'failed'}; "
+                "run `filbench drain-submissions --retry-failed` to try again.",
+                exits=1,
+            )
 
     return results_dict
 
 
+def display_metadata(
+    hf_id: str,
+    contact: str,
+    multilinguality: str,
+    model_type: str,
+    num_params: float,
+    url: Optional[str] = None,
+) -> dict[str, Any]:
+    """Build the `display_metadata` field of a submission
+
+    The hash only depends on the HF ID so that resubmissions of a model
+    replace its previous entry in the leaderboard.
+    """
+    return {
+        "hf_id": hf_id,
+        "url": url or f"https://huggingface.co/{hf_id}",
+        "contact": contact,
+        "multilinguality": multilinguality,
+        "model_type": model_type,
+        "num_params": num_params,
+        "submission_date": datetime.now().isoformat(),
+        "hash": hashlib.sha256(f"{hf_id}".encode()).hexdigest(),
+    }
+
+
+class HubClient(Protocol):
+    """The part of `huggingface_hub.HfApi` used to push submissions"""
+
+    def create_commit(
+        self,
+        repo_id: str,
+        operations: list[Any],
+        *,
+        commit_message: str,
+        commit_description: Optional[str] = None,
+        repo_type: Optional[str] = None,
+        create_pr: Optional[bool] = None,
+    ) -> Any: ...
+
+
+@dataclass
+class LocalCommitInfo:
+    commit_url: str
+    pr_url: Optional[str] = None
+
+
+class LocalRepoClient:
+    """Stand-in for `HfApi` that commits files into a local directory
+
+    Each repository is a directory under `root`, and every commit writes its
+    files there and appends its message to `root/{repo_id}/commits.jsonl`.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def create_commit(
+        self,
+        repo_id: str,
+        operations: list[Any],
+        *,
+        commit_message: str,
+        commit_description: Optional[str] = None,
+        repo_type: Optional[str] = None,
+        create_pr: Optional[bool] = None,
+    ) -> LocalCommitInfo:
+        repo_dir = self.root / repo_id
+        repo_dir.mkdir(parents=True, exist_ok=True)
+        for operation in operations:
+            path = repo_dir / operation.path_in_repo
+            path.parent.mkdir(parents=True, exist_ok=True)
+            source = operation.path_or_fileobj
+            if isinstance(source, bytes):
+                path.write_bytes(source)
+            elif isinstance(source, (str, Path)):
+                shutil.copyfile(source, path)
+            else:
+                path.write_bytes(source.read())
+
+        commit = {
+            "message": commit_message,
+            "description": commit_description,
+            "files": [operation.path_in_repo for operation in operations],
+            "create_pr": bool(create_pr),
+        }
+        with open(repo_dir / "commits.jsonl", "a") as f:
+            f.write(json.dumps(commit) + "\n")
+        return LocalCommitInfo(commit_url=str(repo_dir))
+
+
+@dataclass
+class BatchSubmission:
+    json_path: Path  # report to submit
+    metadata: dict[str, Any]  # display metadata from the manifest
+    report: dict[str, Any] = field(default_factory=dict)  # report with display_metadata
+    errors: list[str] = field(default_factory=list)  # validation errors
+    elapsed: float = 0.0  # time spent reading, validating and serializing the report
+
+    @property
+    def path_in_repo(self) -> str:
+        # Same as `submit`: reports are stored flat at the root of the dataset
+        return self.json_path.name
+
+
+def read_submission_manifest(manifest_path: Path) -> list[dict[str, Any]]:
+    """Read the display metadata of several submissions from a CSV or YAML file
+
+    Each entry has a `json_path` (relative to the manifest) and the fields asked
+    by `filbench submit`: hf_id, contact, multilinguality, model_type,
+    num_params and, optionally, url. YAML manifests are a list of entries or a
+    mapping with a `submissions` list.
+
+    manifest_path (Path): path to the manifest.
+    RETURNS (list[dict[str, Any]]): the manifest entries.
+    """
+    manifest_path = Path(manifest_path)
+    if manifest_path.suffix in (".yaml", ".yml"):
+        import yaml
+
+        with open(manifest_path, "r") as f:
+            entries = yaml.safe_load(f) or []
+        if isinstance(entries, dict):
+            entries = entries.get("submissions", [])
+    else:
+        with open(manifest_path, "r", newline="") as f:
+            entries = list(csv.DictReader(f))
+
+    for entry in entries:
+        if entry.get("json_path"):
+            entry["json_path"] = manifest_path.parent / entry["json_path"]
+    return entries
+
+
+def prepare_submissions(entries: list[dict[str, Any]]) -> list[BatchSubmission]:
+    """Validate every manifest entry and attach its display metadata to the report
+
+    Nothing is written or pushed here, so a bad entry can be fixed before
+    anything is submitted.
+
+    entries (list[dict[str, Any]]): the entries from `read_submission_manifest`.
+    RETURNS (list[BatchSubmission]): the submissions, with their validation errors.
+    """
+    submissions = []
+    seen: dict[str, Path] = {}
+    for entry in entries:
+        start = time.perf_counter()
+        json_path = Path(entry.get("json_path") or "")
+        submission = BatchSubmission(json_path=json_path, metadata=dict(entry))
+        submission.errors = _validate_metadata(entry)
+        if not entry.get("json_path"):
+            submission.errors.append("missing json_path")
+        elif not json_path.is_file():
+            submission.errors.append(f"{json_path} does not exist")
+        else:
+            try:
+                with open(json_path, "r") as f:
+                    report = json.load(f)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                report = {}
+                submission.errors.append(f"invalid JSON: {e}")
+            else:
+                if not isinstance(report, dict):
+                    submission.errors.append(
+                        f"report must be a JSON object, not {type(report).__name__}"
+                    )
+                    report = {}
+                else:
+                    missing = [key for key in REPORT_FIELDS if key not in report]
+                    if missing:
+                        submission.errors.append(
+                            f"report is missing {', '.join(missing)}"
+                        )
+            if not submission.errors:
+                report["display_metadata"] = display_metadata(
+                    hf_id=entry["hf_id"],
+                    contact=entry["contact"],
+                    multilinguality=entry["multilinguality"],
+                    model_type=entry["model_type"],
+                    num_params=float(entry["num_params"]),
+                    url=entry.get("url") or None,
+                )
+                submission.report = report
+
+        if submission.path_in_repo in seen and entry.get("json_path"):
+            submission.errors.append(
+                f"same file name as {seen[submission.path_in_repo]}"
+            )
+        seen.setdefault(submission.path_in_repo, json_path)
+        submission.elapsed = time.perf_counter() - start
+        submissions.append(submission)
+    return submissions
+
+
+def submit_batch(
+    submissions: list[BatchSubmission],
+    submissions_dataset: str = DEFAULT_SUBMISSIONS_DATASET,
+    api: Optional[HubClient] = None,
+    dry_run: bool = False,
+) -> Optional[Any]:
+    """Push several validated submissions as a single commit (and PR)
+
+    Each report is written back to its JSON file with its display metadata, as
+    `submit` does, and added to the commit as one file operation.
+
+    submissions (list[BatchSubmission]): submissions from `prepare_submissions`.
+    submissions_dataset (str): the HF dataset to submit to.
+    api (Optional[HubClient]): the hub client. Defaults to `huggingface_hub.HfApi()`.
+    dry_run (bool): if set, only write the reports without pushing them.
+    RETURNS (Optional[Any]): the commit info returned by the client, if pushed.
+    """
+    from huggingface_hub import CommitOperationAdd
+
+    invalid = [submission for submission in submissions if submission.errors]
+    if invalid:
+        raise ValueError(f"{len(invalid)} submissions failed validation.")
+
+    operations = []
+    for submission in submissions:
+        start = time.perf_counter()
+        content = json.dumps(submission.report, indent=2)
+        with open(submission.json_path, "w") as f:
+            f.write(content)
+        operations.append(
+            CommitOperationAdd(
+                path_in_repo=submission.path_in_repo,
+                path_or_fileobj=content.encode(),
+            )
+        )
+        submission.elapsed += time.perf_counter() - start
+
+    if dry_run:
+        return None
+
+    if api is None:
+        from huggingface_hub import HfApi
+
+        api = HfApi()
+    hf_ids = [
+        submission.report["display_metadata"]["hf_id"] for submission in submissions
+    ]
+    commit_description = "\n".join(
+        f"{submission.report['display_metadata']['hf_id']}: Filbench score {submission.report.get('filbench_score')}"
+        for submission in submissions
+    )
+    return api.create_commit(
+        repo_id=submissions_dataset,
+        repo_type="dataset",
+        operations=operations,
+        commit_message=f"[Submission] FilBench results for {len(hf_ids)} models",
+        commit_description=commit_description,
+        create_pr=True,
+    )
+
+
+def pretty_batch_submissions(submissions: list[BatchSubmission]):
+    from rich.console import Console
+    from rich.markup import escape
+    from rich.table import Table
+
+    console = Console()
+    table = Table(title="Batch Submission")
+    table.add_column("File", justify="left", style="cyan", no_wrap=True)
+    table.add_column("HF ID", justify="left")
+    table.add_column("FilBench Score", justify="right", style="magenta")
+    table.add_column("Time (s)", justify="right")
+    table.add_column("Status", justify="left")
+    for submission in submissions:
+        score = submission.report.get("filbench_score")
+        table.add_row(
+            escape(str(submission.json_path)),
+            escape(str(submission.metadata.get("hf_id", ""))),
+            f"{score:.2f}" if isinstance(score, (int, float)) else "-",
+            f"{submission.elapsed:.3f}",
+            (
+                "[green]OK[/green]"
+                if not submission.errors
+                else f"[red]{escape('; '.join(submission.errors))}[/red]"
+            ),
+        )
+    console.print(table)
+
+
+def _validate_metadata(entry: dict[str, Any]) -> list[str]:
+    errors = []
+    for key in ("hf_id", "contact", "multilinguality", "model_type", "num_params"):
+        if entry.get(key) in (None, ""):
+            errors.append(f"missing {key}")
+    if (
+        entry.get("multilinguality")
+        and entry["multilinguality"] not in MULTILINGUALITY_CHOICES
+    ):
+        errors.append(f"multilinguality must be one of {MULTILINGUALITY_CHOICES}")
+    if entry.get("model_type") and entry["model_type"] not in MODEL_TYPE_CHOICES:
+        errors.append(f"model_type must be one of {MODEL_TYPE_CHOICES}")
+    if entry.get("num_params") not in (None, ""):
+        try:
+            float(entry["num_params"])
+        except (TypeError, ValueError):
+            errors.append(f"num_params is not a number: {entry['num_params']}")
+    return errors
+
+
 def status(display_metadata: dict[str, Any], submissions_dataset: str, dry_run: bool):
+    from rich.console import Console
+    from rich.table import Table
+
     console = Console()
     table = Table(title="Submission Metadata")
 
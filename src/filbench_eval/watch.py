@@ -0,0 +1,223 @@
+import csv
+import hashlib
+import io
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from .compute_score import (
+    RUN_FIELDS,
+    TaskCategory,
+    build_report,
+    default_output_path,
+    merge_runs,
+)
+from .files import atomic_write
+from .local import find_results_files, run_timestamp
+
+if TYPE_CHECKING:
+    from .fetch import HubFetcher
+
+
+@dataclass
+class SourceState:
+    """What the watcher has seen of a result source so far"""
+
+    source: str  # local results directory or HF dataset ID
+    files: dict[str, Any] = field(
+        default_factory=dict
+    )  # local results file -> signature
+    runs: dict[str, dict[str, Any]] = field(default_factory=dict)  # run key -> run
+    row: Optional[dict[str, Any]] = None  # leaderboard row of the latest report
+
+
+@dataclass
+class PollResult:
+    source: str  # local results directory or HF dataset ID
+    new_runs: int  # number of runs parsed in this poll
+    report_path: Optional[Path] = None  # updated report, if any
+    error: Optional[str] = None  # why the source couldn't be polled
+
+
+class Watcher:
+    """Rescore result sources incrementally as new lighteval runs land
+
+    Sources are local lighteval output directories or HF datasets (including
+    ones served by a local Hub stand-in through `HF_ENDPOINT`). Each poll
+    only stats local results files, or fetches the results files of a dataset
+    with a `HubFetcher` (a single `304 Not Modified` if the dataset didn't
+    change), and parses the runs that are new or changed since the last poll. The
+    parsed runs of each source are kept in a small state file, so rescoring a
+    model never rereads its older runs. Reports and the combined leaderboard
+    are replaced atomically, so readers never see partial files.
+
+    output_dir/
+    ├── leaderboard.csv
+    ├── scores_{model}.json
+    └── .watch/{source hash}.json
+    """
+
+    def __init__(
+        self,
+        sources: list[str],
+        output_dir: Path,
+        fetcher: Optional["HubFetcher"] = None,
+    ):
+        self.output_dir = Path(output_dir)
+        self.state_dir = self.output_dir / ".watch"
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.states = {source: self._load_state(source) for source in sources}
+        self.leaderboard_path = self.output_dir / "leaderboard.csv"
+        self._fetcher = fetcher
+
+    @property
+    def fetcher(self) -> "HubFetcher":
+        # Created on first use, so that watching local directories doesn't need aiohttp
+        if self._fetcher is None:
+            from .fetch import HubFetcher
+
+            self._fetcher = HubFetcher()
+        return self._fetcher
+
+    def poll(self) -> list[PollResult]:
+        """Check every source once, and rescore the ones with new runs
+
+        RETURNS (list[PollResult]): the sources that changed or failed in this poll.
+        """
+        results = []
+        for source, state in self.states.items():
+            try:
+                if Path(source).is_dir():
+                    changed = self._poll_local(state)
+                else:
+                    changed = self._poll_hub(state)
+            except Exception as e:
+                results.append(PollResult(source, 0, error=f"{type(e).__name__}: {e}"))
+                continue
+            if changed is None:
+                continue
+            report_path = None
+            if state.runs:
+                report_path = self._rescore(state)
+            else:
+                state.row = None
+            self._save_state(state)
+            results.append(PollResult(source, changed, report_path=report_path))
+        if any(result.error is None for result in results):
+            self._write_leaderboard()
+        return results
+
+    def watch(
+        self,
+        interval: float = 60.0,
+        callback: Optional[Callable[[list[PollResult]], None]] = None,
+        max_polls: Optional[int] = None,
+    ):
+        """Poll the sources every `interval` seconds until interrupted"""
+        n_polls = 0
+        while max_polls is None or n_polls < max_polls:
+            start = time.monotonic()
+            results = self.poll()
+            if callback is not None:
+                callback(results)
+            n_polls += 1
+            if max_polls is None or n_polls < max_polls:
+                time.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+    def _poll_local(self, state: SourceState) -> Optional[int]:
+        files = {}
+        for path in find_results_files(Path(state.source)):
+            stat = path.stat()
+            files[str(path)] = [stat.st_mtime_ns, stat.st_size]
+        if files == state.files:
+            return None
+        changed = [path for path, sig in files.items() if state.files.get(path) != sig]
+        removed = set(state.files) - set(files)
+        for path in removed:
+            state.runs.pop(_run_key(path), None)
+        for path in changed:
+            with open(path, "r") as f:
+                state.runs[_run_key(path)] = _trim(json.load(f))
+        state.files = files
+        return len(changed)
+
+    def _poll_hub(self, state: SourceState) -> Optional[int]:
+        # The fetcher only downloads results files that it hasn't cached yet
+        runs = dict(self.fetcher.fetch_runs(state.source))
+        if runs.keys() == state.runs.keys():
+            return None  # results files are never rewritten
+        new = len(runs.keys() - state.runs.keys())
+        state.runs = runs
+        return new
+
+    def _rescore(self, state: SourceState) -> Path:
+        runs = [state.runs[timestamp] for timestamp in sorted(state.runs)]
+        report = build_report(merge_runs(runs))
+        model_name = report.get("config", {}).get("model_name")
+        model_id = state.source if not Path(state.source).is_dir() else model_name
+        report_path = self.output_dir / default_output_path(
+            model_id or Path(state.source).name
+        )
+        atomic_write(report_path, json.dumps(report))
+        state.row = {
+            "source": state.source,
+            "model_name": model_name,
+            "filbench_score": report["filbench_score"],
+            **report["category_scores"],
+            "tasks_done": len(report["results"]),
+            "n_runs": len(runs),
+            "report": str(report_path),
+        }
+        return report_path
+
+    def _write_leaderboard(self):
+        categories = [category.value for category in TaskCategory]
+        columns = ["source", "model_name", "filbench_score"] + categories
+        columns += ["tasks_done", "n_runs", "report"]
+        rows = [state.row for state in self.states.values() if state.row]
+        rows.sort(key=lambda row: -row["filbench_score"])
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+        atomic_write(self.leaderboard_path, buffer.getvalue())
+
+    def _state_path(self, source: str) -> Path:
+        return (
+            self.state_dir / f"{hashlib.sha256(source.encode()).hexdigest()[:16]}.json"
+        )
+
+    def _load_state(self, source: str) -> SourceState:
+        try:
+            with open(self._state_path(source), "r") as f:
+                return SourceState(**json.load(f))
+        except (OSError, json.JSONDecodeError, TypeError):
+            return SourceState(source=source)
+
+    def _save_state(self, state: SourceState):
+        atomic_write(self._state_path(state.source), json.dumps(state.__dict__))
+
+
+def _run_key(path: str) -> str:
+    # Sorts by run timestamp first, like `find_results_files`
+    return f"{run_timestamp(Path(path))}|{path}"
+
+
+def _trim(run: dict[str, Any]) -> dict[str, Any]:
+    return {name: run[name] for name in RUN_FIELDS if name in run}
+
+
+def pretty_poll(results: list[PollResult]):
+    from wasabi import msg
+
+    for result in results:
+        if result.error:
+            msg.fail(f"{result.source}: {result.error}")
+        elif result.report_path:
+            msg.good(
+                f"{result.source}: parsed {result.new_runs} new runs, updated {result.report_path}"
+            )
+        else:
+            msg.info(f"{result.source}: no results yet")
@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import json
+import random
+import threading
+from typing import Any, Iterator, Optional
+
+import pytest
+from aiohttp import web
+
+from filbench_eval.compute_score import Tasks
+
+
+class MockHub:
+    """A stand-in for the Hub API serving in-memory datasets
+
+    It serves synthetic lighteval details datasets (results files among many
+    details files) through the two endpoints `fetch.HubFetcher` uses, with
+    ETags and 304 Not Modified responses, and an artificial round-trip delay
+    per request. benchmarks/bench_fetch.py uses it too.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.datasets: dict[str, dict[str, bytes]] = {}  # dataset ID -> path -> content
+        self.runs: dict[str, list[dict[str, Any]]] = (
+            {}
+        )  # dataset ID -> runs, oldest first
+        self.endpoint: Optional[str] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def sha(self, dataset_id: str) -> str:
+        names = "".join(sorted(self.datasets[dataset_id]))
+        return hashlib.sha1(f"{dataset_id}:{names}".encode()).hexdigest()
+
+    def make_app(self) -> web.Application:
+        async def revision(request: web.Request):
+            await self._delay()
+            dataset_id = f"{request.match_info['org']}/{request.match_info['name']}"
+            if dataset_id not in self.datasets:
+                raise web.HTTPNotFound()
+            etag = f'"{self.sha(dataset_id)}"'
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers={"ETag": etag})
+            siblings = [
+                {"rfilename": name} for name in sorted(self.datasets[dataset_id])
+            ]
+            body = {"id": dataset_id, "sha": self.sha(dataset_id), "siblings": siblings}
+            return web.json_response(body, headers={"ETag": etag})
+
+        async def resolve(request: web.Request):
+            await self._delay()
+            dataset_id = f"{request.match_info['org']}/{request.match_info['name']}"
+            content = self.datasets.get(dataset_id, {}).get(request.match_info["path"])
+            if content is None:
+                raise web.HTTPNotFound()
+            etag = f'"{hashlib.md5(content).hexdigest()}"'
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers={"ETag": etag})
+            return web.Response(body=content, headers={"ETag": etag})
+
+        app = web.Application()
+        app.router.add_get("/api/datasets/{org}/{name}/revision/{revision}", revision)
+        app.router.add_get("/datasets/{org}/{name}/resolve/{sha}/{path:.+}", resolve)
+        return app
+
+    async def _delay(self):
+        await asyncio.sleep(self.latency)
+
+    def start(self) -> str:
+        """Serve on a background thread and return the endpoint URL"""
+        self._loop = asyncio.new_event_loop()
+        self._runner = web.AppRunner(self.make_app())
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self.endpoint = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+        return self.endpoint
+
+    def stop(self):
+        """Close the server, release its port and stop its thread"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = self._runner = self._thread = self.endpoint = None
+
+    def add_run(self, rng: random.Random, dataset_id: str, idx: int):
+        """Add a synthetic lighteval run, with its results and details files"""
+        timestamp = f"2025-01-01T00-00-{idx:02d}.000000"
+        run = synthetic_run(rng, dataset_id)
+        name = dataset_id.split("/")[1]
+        files = self.datasets.setdefault(dataset_id, {})
+        files[f"{name}/results_{timestamp}.json"] = json.dumps(run).encode()
+        for task in run["results"]:
+            files[f"{name}/details_{task}_{timestamp}.parquet"] = b"\0" * 4096
+        self.runs.setdefault(dataset_id, []).append(run)
+
+
+def synthetic_run(rng: random.Random, model: str) -> dict[str, Any]:
+    tasks = rng.sample(list(Tasks), k=rng.randint(1, 5))
+    return {
+        "config_general": {"model_name": model, "start_time": 0.0, "end_time": 1.0},
+        "results": {
+            f"filbench|{task.value.benchmark}|0": {task.value.metric: rng.random()}
+            for task in tasks
+        },
+        "versions": {f"filbench|{task.value.benchmark}|0": 0 for task in tasks},
+        # Details payloads that scoring doesn't need
+        "config_tasks": {f"task_{i}": "x" * 200 for i in range(50)},
+    }
+
+
+@pytest.fixture
+def mock_hub() -> Iterator[MockHub]:
+    hub = MockHub()
+    hub.start()
+    yield hub
+    hub.stop()
@@ -0,0 +1,83 @@
+import math
+
+import pytest
+
+from filbench_eval.compute_score import (
+    merge_runs,
+    merge_shards,
+    parse_shard,
+    shard_name,
+    shard_sizes,
+)
+
+# kalahi_tgl_mcf has 150 examples, so 4 shards have 38, 38, 37 and 37 of them
+BENCHMARK = "kalahi_tgl_mcf"
+SHARD_SIZES = [38, 38, 37, 37]
+
+
+def run(results: dict[str, dict[str, float]], model: str = "org/model") -> dict:
+    return {
+        "config_general": {"model_name": model},
+        "results": {f"filbench|{name}|0": metrics for name, metrics in results.items()},
+        "versions": {f"filbench|{name}|0": 0 for name in results},
+    }
+
+
+def shard(index: int, acc: float, stderr: float = 0.1) -> dict:
+    return {shard_name(BENCHMARK, index, 4): {"acc_": acc, "acc__stderr": stderr}}
+
+
+def test_shard_names_round_trip():
+    assert shard_name(BENCHMARK, 2, 4) == "kalahi_tgl_mcf-shard-2-of-4"
+    assert parse_shard(shard_name(BENCHMARK, 2, 4)) == (BENCHMARK, 2, 4)
+    assert parse_shard(BENCHMARK) is None
+    assert shard_sizes(150, 4) == SHARD_SIZES
+
+
+def test_merge_runs_merges_shards_across_runs():
+    accs = [0.2, 0.4, 0.6, 0.8]
+    runs = [
+        run({**shard(0, accs[0]), **shard(1, accs[1])}),
+        run({**shard(3, accs[3]), **shard(2, accs[2])}, model="org/model-v2"),
+    ]
+    merged = merge_runs(runs)
+    weights = [size / 150 for size in SHARD_SIZES]
+    result = merged["results"][BENCHMARK]
+    assert result["acc_"] == pytest.approx(sum(w * a for w, a in zip(weights, accs)))
+    assert result["acc__stderr"] == pytest.approx(
+        math.sqrt(sum((w * 0.1) ** 2 for w in weights))
+    )
+    # Shards aren't reported as tasks of their own
+    assert list(merged["results"]) == [BENCHMARK]
+    assert merged["config"]["model_name"] == "org/model-v2"
+    assert len(merged["versions"]) == 4
+
+
+def test_merge_runs_waits_for_every_shard():
+    merged = merge_runs([run({**shard(0, 0.5), **shard(1, 0.5), **shard(2, 0.5)})])
+    assert merged["results"] == {}
+
+
+def test_merge_runs_keeps_the_latest_of_full_runs_and_shards():
+    shards = run({**shard(0, 0.2), **shard(1, 0.2), **shard(2, 0.2), **shard(3, 0.2)})
+    full = run({BENCHMARK: {"acc_": 0.9}})
+    assert merge_runs([full, shards])["results"][BENCHMARK]["acc_"] == pytest.approx(
+        0.2
+    )
+    assert merge_runs([shards, full])["results"][BENCHMARK]["acc_"] == 0.9
+    # Incomplete shards don't replace an earlier full run
+    assert merge_runs([full, run(shard(0, 0.2))])["results"][BENCHMARK]["acc_"] == 0.9
+
+
+def test_merge_runs_uses_the_latest_run_of_a_shard():
+    runs = [
+        run({**shard(0, 0.0), **shard(1, 0.0), **shard(2, 0.0), **shard(3, 0.0)}),
+        run(shard(0, 1.0)),
+    ]
+    result = merge_runs(runs)["results"][BENCHMARK]
+    assert result["acc_"] == pytest.approx(38 / 150)
+
+
+def test_merge_shards_skips_non_numeric_metrics():
+    merged = merge_shards([{"acc_": 0.5, "note": "a"}, {"acc_": 1.0, "note": "b"}])
+    assert merged == {"acc_": 0.75}
@@ -0,0 +1,79 @@
+import hashlib
+
+import numpy as np
+import pytest
+from datasets import Dataset
+
+from filbench_eval.cube import (
+    HASH_DTYPE,
+    MISSING_PREDICTION,
+    PredictionCube,
+    TaskSamples,
+    details_to_samples,
+)
+from filbench_eval.predictions import project_mcf_details
+
+TASK = "filbench_balita_tgl_mcf_0"
+
+
+def samples(prompts: list[str], predictions: list[int]) -> TaskSamples:
+    return TaskSamples(
+        benchmark="balita_tgl_mcf",
+        metric="acc_",
+        prompt_hashes=np.array(
+            [hashlib.sha256(prompt.encode()).digest() for prompt in prompts],
+            dtype=HASH_DTYPE,
+        ),
+        gold=np.zeros(len(prompts), dtype=np.int16),
+        predictions=np.array(predictions, dtype=np.int16),
+        metrics=np.array([float(pred == 0) for pred in predictions], dtype=np.float32),
+    )
+
+
+def test_add_model_aligns_samples_by_prompt(tmp_path):
+    cube = PredictionCube(tmp_path)
+    cube.add_model("org/a", {TASK: samples(["p0", "p1", "p2"], [0, 1, 2])})
+    cube.add_model("org/b", {TASK: samples(["p2", "p0"], [1, 3])})
+
+    task = cube.open(TASK)
+    assert task.models == ["org/a", "org/b"]
+    assert task.predictions.tolist() == [[0, 1, 2], [3, MISSING_PREDICTION, 1]]
+    assert np.isnan(task.metrics[1, 1])
+
+
+def test_add_model_skips_unknown_prompts(tmp_path, capsys):
+    cube = PredictionCube(tmp_path)
+    cube.add_model("org/a", {TASK: samples(["p0", "p1"], [0, 1])})
+    cube.add_model("org/b", {TASK: samples(["p0", "new"], [1, 1])})
+    assert "1 of 2 prompts of org/b" in capsys.readouterr().out
+    assert cube.open(TASK).predictions[1].tolist() == [1, MISSING_PREDICTION]
+
+
+def test_add_model_rejects_mismatched_prompts(tmp_path):
+    cube = PredictionCube(tmp_path)
+    cube.add_model("org/a", {TASK: samples(["p0", "p1"], [0, 1])})
+    with pytest.raises(ValueError, match="None of the prompts of org/b"):
+        cube.add_model("org/b", {TASK: samples(["q0", "q1"], [0, 1])})
+    assert cube.models == ["org/a"]
+    assert PredictionCube(tmp_path).open(TASK).models == ["org/a"]
+
+
+def test_mcf_predictions_match_the_agreement_plots():
+    details = {
+        "example": ["p0", "p1", "p2"],
+        "instruction": ["", "", ""],
+        # (logprob, is_greedy) for each choice
+        "predictions": [
+            [[-2.0, False], [-1.0, True]],
+            [[-1.0, False], [-3.0, True], [-2.0, True]],
+            [[-1.0, False], [-0.5, False]],
+        ],
+        "gold_index": [[1], [0], [1]],
+        "metrics": [{"acc_": 1.0}, {"acc_": 1.0}, {"acc_": 1.0}],
+    }
+    task_samples = details_to_samples(
+        Dataset.from_dict(details), "balita_tgl_mcf", "acc_"
+    )
+    projected = project_mcf_details(Dataset.from_dict(details).to_pandas())
+    assert task_samples.predictions.tolist() == [1, 1, 0]
+    assert task_samples.predictions.tolist() == projected["mcf_predictions"].tolist()
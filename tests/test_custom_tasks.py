@@ -0,0 +1,131 @@
+import pytest
+
+from filbench_eval import custom_tasks
+from filbench_eval.custom_tasks import load_custom_tasks, write_custom_tasks
+from filbench_eval.plan import RuntimeModel, plan_tasks, shard_subsets
+from filbench_eval.preview import TaskPreview, preview_subsets
+
+BASE_TASKS = """
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass
+class TaskConfig:
+    name: str
+    hf_repo: str
+    hf_subset: Optional[str]
+    evaluation_splits: list
+    hf_filter: Optional[Callable] = None
+
+
+TASKS_TABLE = [
+    TaskConfig("kalahi_tgl_mcf", "org/kalahi", None, ["test"]),
+    TaskConfig("include_tgl_mcf:Accounting", "org/include", "Accounting", ["test"]),
+    TaskConfig(
+        "include_tgl_mcf:History",
+        "org/include",
+        "History",
+        ["test"],
+        hf_filter=lambda row: row["id"] % 2 == 0,
+    ),
+]
+"""
+
+
+@pytest.fixture
+def base_tasks(tmp_path, monkeypatch):
+    # Every dataset has rows with ids 0, 1, ..., 149
+    monkeypatch.setattr(
+        custom_tasks,
+        "_load_split",
+        lambda hf_repo, hf_subset, split, revision=None: [
+            {"id": idx, "split": split} for idx in range(150)
+        ],
+    )
+    path = tmp_path / "filbench_evals.py"
+    path.write_text(BASE_TASKS)
+    return str(path)
+
+
+def kept_ids(task) -> list[int]:
+    return [idx for idx in range(150) if task.hf_filter({"id": idx, "split": "test"})]
+
+
+def test_custom_tasks_define_shards(tmp_path, base_tasks):
+    schedule = plan_tasks(
+        ["filbench|kalahi_tgl_mcf|0|0"], 4, RuntimeModel(overhead=0.0), max_shards=4
+    )
+    subsets = shard_subsets(schedule)
+    assert [subset.suffix for subset in subsets] == [
+        f"-shard-{index}-of-4" for index in range(4)
+    ]
+    path = write_custom_tasks(subsets, tmp_path / "plan", command="plan")
+    tasks = {
+        task.name: task
+        for task in load_custom_tasks(path.with_name("subsets.json"), base_tasks)
+    }
+
+    assert tasks["kalahi_tgl_mcf"].hf_filter is None
+    shards = [
+        kept_ids(tasks[f"kalahi_tgl_mcf-shard-{index}-of-4"]) for index in range(4)
+    ]
+    assert [len(shard) for shard in shards] == [38, 38, 37, 37]
+    assert sum(shards, []) == list(range(150))
+
+
+def test_custom_tasks_split_duplicate_rows(tmp_path, base_tasks, monkeypatch):
+    # Each row appears 3 times in a row, like repeated NLI pairs
+    rows = [{"id": idx // 3, "split": "test"} for idx in range(150)]
+    monkeypatch.setattr(custom_tasks, "_load_split", lambda *args, **kwargs: rows)
+    schedule = plan_tasks(
+        ["filbench|kalahi_tgl_mcf|0|0"], 4, RuntimeModel(overhead=0.0), max_shards=4
+    )
+    path = write_custom_tasks(shard_subsets(schedule), tmp_path, command="plan")
+    tasks = load_custom_tasks(path.with_name("subsets.json"), base_tasks)
+
+    shards = [
+        [row["id"] for row in rows if task.hf_filter(row)]
+        for task in tasks
+        if "-shard-" in task.name
+    ]
+    assert [len(shard) for shard in shards] == [38, 38, 37, 37]
+    assert sorted(sum(shards, [])) == [row["id"] for row in rows]
+
+
+def test_custom_tasks_define_previews(tmp_path, base_tasks):
+    previews = [
+        TaskPreview(
+            "include_tgl_mcf",
+            150,
+            4,
+            True,
+            indices={
+                "filbench_include_tgl_mcf_Accounting_0": [5, 1],
+                # Positions among the rows kept by the task's own filter
+                "filbench_include_tgl_mcf_History_0": [0, 3],
+            },
+        ),
+        TaskPreview("kalahi_tgl_mcf", 150, 150, False),
+    ]
+    path = write_custom_tasks(preview_subsets(previews), tmp_path, command="preview")
+    assert "--custom-tasks" in path.read_text()
+    tasks = {
+        task.name: task
+        for task in load_custom_tasks(path.with_name("subsets.json"), base_tasks)
+    }
+
+    assert kept_ids(tasks["include_tgl_mcf-preview:Accounting"]) == [1, 5]
+    assert kept_ids(tasks["include_tgl_mcf-preview:History"]) == [0, 6]
+    assert "kalahi_tgl_mcf-preview" not in tasks
+
+
+def test_custom_tasks_reject_unknown_tasks(tmp_path, base_tasks):
+    previews = [
+        TaskPreview(
+            "balita_tgl_mcf", 150, 10, False, indices={"filbench_balita_tgl_mcf_0": [0]}
+        )
+    ]
+    path = write_custom_tasks(preview_subsets(previews), tmp_path, command="preview")
+    with pytest.raises(ValueError, match="filbench_balita_tgl_mcf_0"):
+        load_custom_tasks(path.with_name("subsets.json"), base_tasks)
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from filbench_eval.compute_score import merge_runs
+from filbench_eval.fetch import HubFetcher
+
+MODELS = [f"org/details_model_{idx}" for idx in range(4)]
+
+
+@pytest.fixture
+def hub(mock_hub):
+    rng = random.Random(0)
+    for model in MODELS:
+        for idx in range(3):
+            mock_hub.add_run(rng, model, idx)
+    return mock_hub
+
+
+def check(results, hub):
+    assert [result.dataset_id for result in results] == MODELS
+    for result in results:
+        assert result.ok, result.error
+        assert result.revision == hub.sha(result.dataset_id)
+        assert result.parsed_results == merge_runs(hub.runs[result.dataset_id])
+
+
+def test_fetch_cold_then_warm(hub, tmp_path):
+    fetcher = HubFetcher(endpoint=hub.endpoint, cache_dir=tmp_path)
+    cold = fetcher.fetch(MODELS)
+    check(cold, hub)
+    # One request for the file list, then one per results file
+    assert [result.requests for result in cold] == [4] * len(MODELS)
+    assert all(result.not_modified == 0 and result.bytes for result in cold)
+
+    warm = fetcher.fetch(MODELS)
+    check(warm, hub)
+    assert [(result.requests, result.not_modified) for result in warm] == [
+        (1, 1)
+    ] * len(MODELS)
+    assert all(result.bytes == 0 for result in warm)
+
+
+def test_fetch_only_downloads_new_runs(hub, tmp_path):
+    fetcher = HubFetcher(endpoint=hub.endpoint, cache_dir=tmp_path)
+    fetcher.fetch(MODELS)
+    hub.add_run(random.Random(1), MODELS[0], 3)
+
+    results = fetcher.fetch(MODELS)
+    check(results, hub)
+    # The changed file list, then 304s for the old runs and a download of the new one
+    assert (results[0].requests, results[0].not_modified) == (5, 3)
+    assert all(result.requests == 1 for result in results[1:])
+
+
+def test_fetch_refresh_ignores_the_cache(hub, tmp_path):
+    fetcher = HubFetcher(endpoint=hub.endpoint, cache_dir=tmp_path)
+    fetcher.fetch(MODELS[:1])
+    (result,) = fetcher.fetch(MODELS[:1], refresh=True)
+    assert result.not_modified == 0 and result.bytes
+
+
+def test_fetch_reports_errors_per_dataset(hub, tmp_path):
+    fetcher = HubFetcher(endpoint=hub.endpoint, cache_dir=tmp_path, retries=0)
+    missing, found = fetcher.fetch(["org/missing", MODELS[0]])
+    assert not missing.ok and missing.error.startswith("FileNotFoundError")
+    assert missing.runs == []
+    assert found.ok
+
+
+def test_fetch_runs_is_sorted_by_timestamp(hub, tmp_path):
+    fetcher = HubFetcher(endpoint=hub.endpoint, cache_dir=tmp_path)
+    runs = fetcher.fetch_runs(MODELS[1])
+    timestamps = [timestamp for timestamp, _ in runs]
+    assert timestamps == sorted(timestamps) and len(runs) == 3
+    # Only the fields needed for scoring are kept
+    assert all("config_tasks" not in run for _, run in runs)
@@ -0,0 +1,36 @@
+import stat
+
+import pytest
+
+from filbench_eval import files
+from filbench_eval.files import atomic_path, atomic_write
+
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = tmp_path / "state.json"
+    atomic_write(path, "old")
+    atomic_write(path, "new")
+    assert path.read_text() == "new"
+    assert [child.name for child in tmp_path.iterdir()] == ["state.json"]
+
+
+def test_atomic_path_cleans_up_after_failures(tmp_path):
+    path = tmp_path / "table.parquet"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with atomic_path(path) as tmp_path_:
+            with open(tmp_path_, "w") as f:
+                f.write("partial")
+            raise RuntimeError("writer failed")
+    assert path.read_text() == "old"
+    assert [child.name for child in tmp_path.iterdir()] == ["table.parquet"]
+
+
+def test_atomic_write_keeps_file_modes(tmp_path, monkeypatch):
+    monkeypatch.setattr(files, "_UMASK", 0o022)
+    path = tmp_path / "leaderboard.csv"
+    atomic_write(path, "new")
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644
+    path.chmod(0o664)
+    atomic_write(path, "newer")
+    assert stat.S_IMODE(path.stat().st_mode) == 0o664
@@ -0,0 +1,40 @@
+import pytest
+from datasets import Dataset
+
+from filbench_eval import metrics
+from filbench_eval.metrics import recompute_metrics
+
+CONFIG = "filbench_balita_tgl_mcf_0"
+# (logprob, is_greedy) of each choice: the first sample is right, the second wrong
+PREDICTIONS = [[[-1.0, True], [-2.0, False]], [[-1.0, True], [-2.0, False]]]
+
+
+def check(monkeypatch, details: dict, stored: float = 0.5):
+    monkeypatch.setattr(
+        metrics, "detail_configs", lambda *args, **kwargs: {"balita_tgl_mcf": [CONFIG]}
+    )
+    monkeypatch.setattr(
+        metrics, "load_details", lambda *args, **kwargs: Dataset.from_dict(details)
+    )
+    (result,) = recompute_metrics("org/model", {"balita_tgl_mcf": {"acc_": stored}})
+    return result
+
+
+def test_recompute_metrics_counts_sample_mismatches(monkeypatch):
+    details = {
+        "predictions": PREDICTIONS,
+        "gold_index": [[0], [1]],
+        "metrics": [{"acc_": 1.0}, {"acc_": 1.0}],
+    }
+    result = check(monkeypatch, details)
+    assert result.recomputed == 0.5 and result.sample_mismatches == 1
+    assert not result.ok()
+
+
+@pytest.mark.parametrize("stored,ok", [(0.5, True), (0.75, False)])
+def test_recompute_metrics_without_sample_metrics(monkeypatch, stored, ok):
+    details = {"predictions": PREDICTIONS, "gold_index": [[0], [1]]}
+    result = check(monkeypatch, details, stored=stored)
+    # Without per-sample values, only the aggregate is compared
+    assert result.sample_mismatches is None
+    assert result.ok() == ok
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from filbench_eval.compute_score import compile_tasks
+from filbench_eval.cube import HASH_DTYPE, PredictionCube, TaskSamples
+from filbench_eval.pairwise import pairwise_report, weighted_kappa
+
+# Every task of the reading comprehension category
+BENCHMARKS = [
+    "belebele_ceb_mcf",
+    "belebele_fil_mcf",
+    "newsphnli_fil_mcf",
+    "readability_ceb_mcf",
+]
+
+
+def samples(benchmark: str, rng: np.random.Generator, n: int = 50) -> TaskSamples:
+    gold = rng.integers(0, 4, n).astype(np.int16)
+    predictions = np.where(rng.random(n) < 0.7, gold, rng.integers(0, 4, n))
+    return TaskSamples(
+        benchmark=benchmark,
+        metric="acc_",
+        prompt_hashes=np.array(
+            [f"{benchmark}-{idx}".encode() for idx in range(n)], dtype=HASH_DTYPE
+        ),
+        gold=gold,
+        predictions=predictions.astype(np.int16),
+        metrics=(predictions == gold).astype(np.float32),
+    )
+
+
+@pytest.fixture
+def cube(tmp_path):
+    rng = np.random.default_rng(0)
+    cube = PredictionCube(tmp_path)
+    for model in ("org/a", "org/b"):
+        cube.add_model(
+            model,
+            {f"filbench_{name}_0": samples(name, rng) for name in BENCHMARKS},
+        )
+    # org/c only ran one task of the category
+    cube.add_model(
+        "org/c", {f"filbench_{BENCHMARKS[0]}_0": samples(BENCHMARKS[0], rng)}
+    )
+    return cube
+
+
+def test_category_agreement_and_p_values(cube):
+    report = pairwise_report(cube, n_resamples=100)
+    category = report["category_scores"]["READING_COMPREHENSION"]
+    task_kappas = np.array(
+        [report["tasks"][name]["cohen_kappa"] for name in BENCHMARKS], dtype=float
+    )
+
+    compiled = compile_tasks()
+    weights = compiled.weights[compiled.categories.index("READING_COMPREHENSION")]
+    weights = weights[[compiled.benchmarks.index(name) for name in BENCHMARKS]]
+    # Weighted like the category score
+    assert category["cohen_kappa"][0][1] == pytest.approx(
+        weights @ task_kappas[:, 0, 1] / weights.sum()
+    )
+    assert category["cohen_kappa"][0][2] == pytest.approx(task_kappas[0, 0, 2])
+    # org/c would be compared against a score of 0 on the tasks it didn't run
+    assert category["p_values"][0][1] is not None
+    assert category["p_values"][0][2] is None and category["p_values"][2][1] is None
+    # Nobody ran every FilBench task
+    assert all(p is None for row in report["filbench_score"]["p_values"] for p in row)
+
+
+def test_weighted_kappa_skips_unknown_tasks():
+    kappas = np.array([[[1.0, 0.5]], [[np.nan, 0.1]]])
+    assert weighted_kappa(kappas, np.array([3.0, 1.0])).tolist() == [[1.0, 0.4]]
+    assert np.isnan(weighted_kappa(kappas[1:], np.array([1.0]))[0, 0])
@@ -0,0 +1,66 @@
+import math
+
+import numpy as np
+import pytest
+
+from filbench_eval.compute_score import compile_tasks, shard_name
+from filbench_eval.partial import PartialScorer, ReferenceModel
+
+# kalahi_tgl_mcf has 150 examples, so 4 shards have 38, 38, 37 and 37 of them
+BENCHMARK = "kalahi_tgl_mcf"
+
+
+def shards_run(*indices: int, stderr=0.05) -> dict:
+    return {
+        "results": {
+            f"filbench|{shard_name(BENCHMARK, index, 4)}|0": {
+                "acc_": 0.5,
+                "acc__stderr": stderr,
+            }
+            for index in indices
+        }
+    }
+
+
+def reference() -> ReferenceModel:
+    n_tasks = len(compile_tasks().benchmarks)
+    cov = np.full((n_tasks, n_tasks), 50.0) + 50.0 * np.eye(n_tasks)
+    return ReferenceModel(mean=np.full(n_tasks, 50.0), cov=cov, n_models=3)
+
+
+def task_coverage(scorer: PartialScorer):
+    (coverage,) = [task for task in scorer.coverage() if task.benchmark == BENCHMARK]
+    return coverage
+
+
+def test_partially_covered_tasks_have_sampling_variance():
+    scorer = PartialScorer()
+    scorer.add_run(shards_run(0, 1))
+    coverage = task_coverage(scorer)
+    # Two shards of 38 examples, each with a 5-point standard error
+    assert coverage.stderr == pytest.approx(100 * math.sqrt(2 * (0.05 / 2) ** 2))
+    assert coverage.sampling_variance == pytest.approx(
+        coverage.stderr**2 * (150 - 76) / (150 - 1)
+    )
+
+    scorer.add_run(shards_run(2, 3))
+    assert task_coverage(scorer).sampling_variance == 0.0
+
+
+def test_missing_stderr_falls_back_to_the_worst_case():
+    scorer = PartialScorer()
+    scorer.add_run(shards_run(0, stderr=None))
+    coverage = task_coverage(scorer)
+    assert coverage.stderr is None
+    assert coverage.sampling_variance == pytest.approx(
+        100**2 * 0.25 / 37 * (150 - 38) / 149
+    )
+
+
+def test_imputed_stderr_includes_sampling_variance():
+    partial, full = PartialScorer(reference()), PartialScorer(reference())
+    partial.add_run(shards_run(0))
+    full.add_run(shards_run(0, 1, 2, 3))
+    partial_stderr = partial.estimate()["filbench_score"]["stderr"]
+    full_stderr = full.estimate()["filbench_score"]["stderr"]
+    assert partial_stderr > full_stderr
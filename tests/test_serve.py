@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from filbench_eval.compute_score import TaskCategory
+from filbench_eval.serve import ReportService, make_app
+
+
+def post_score(body) -> tuple[int, dict]:
+    async def _post():
+        service = ReportService(loader=lambda *args: {})
+        async with TestClient(TestServer(make_app(service))) as client:
+            response = await client.post("/filbench-score", json=body)
+            return response.status, await response.json()
+
+    return asyncio.run(_post())
+
+
+def test_filbench_score():
+    status, body = post_score({"results": {"balita_tgl_mcf": {"acc_": 0.5}}})
+    assert status == 200
+    assert body["filbench_score"] > 0
+    assert set(body["category_scores"]) == {category.value for category in TaskCategory}
+
+
+@pytest.mark.parametrize(
+    "body,error",
+    [
+        ([], 'Expected a JSON body with a "results" object.'),
+        ({"results": []}, '"results" must map each benchmark to its metrics.'),
+        (
+            {"results": {"balita_tgl_mcf": 5}},
+            '"results.balita_tgl_mcf" must map each metric to a number.',
+        ),
+        (
+            {"results": {"balita_tgl_mcf": {"acc_": "0.5"}}},
+            '"results.balita_tgl_mcf.acc_" must be a number.',
+        ),
+        (
+            {"results": {"balita_tgl_mcf": {"acc_": True}}},
+            '"results.balita_tgl_mcf.acc_" must be a number.',
+        ),
+    ],
+)
+def test_filbench_score_rejects_invalid_results(body, error):
+    assert post_score(body) == (400, {"error": error})
@@ -0,0 +1,150 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from filbench_eval import spool as spool_module
+from filbench_eval.spool import DEFAULT_MAX_ATTEMPTS, SubmissionSpool
+from filbench_eval.submit import LocalRepoClient, submit
+
+DATASET = "org/submissions"
+ANSWERS = ["org/model", "me@example.com", "Multilingual", "SFT", 7.0]
+
+
+class FailingClient:
+    """A hub client whose uploads fail a number of times before going through"""
+
+    def __init__(self, root: Path, failures: int):
+        self.local = LocalRepoClient(root)
+        self.failures = failures
+        self.calls = 0
+
+    def create_commit(self, repo_id, operations, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("503 Service Unavailable")
+        return self.local.create_commit(repo_id, operations, **kwargs)
+
+
+@pytest.fixture
+def report_path(tmp_path: Path) -> Path:
+    path = tmp_path / "reports" / "scores_org__model.json"
+    path.parent.mkdir()
+    report = {"filbench_score": 50.0, "category_scores": {}, "results": {}}
+    path.write_text(json.dumps(report))
+    return path
+
+
+@pytest.fixture
+def prompts(monkeypatch):
+    answers = iter(ANSWERS)
+    monkeypatch.setattr(
+        "filbench_eval.submit.typer.prompt", lambda *args, **kwargs: next(answers)
+    )
+    monkeypatch.setattr("builtins.input", lambda prompt: "")
+
+
+def enqueue(spool: SubmissionSpool, name: str = "scores.json") -> str:
+    return spool.enqueue(
+        {"filbench_score": 1.0},
+        path_in_repo=name,
+        submissions_dataset=DATASET,
+        commit_message="[Submission] test",
+    )
+
+
+def test_submit_uploads_through_spool(tmp_path, report_path, prompts):
+    spool = SubmissionSpool(tmp_path / "spool")
+    api = LocalRepoClient(tmp_path / "hub")
+    output = submit(report_path, DATASET, spool=spool, api=api)
+
+    uploaded = json.loads((tmp_path / "hub" / DATASET / report_path.name).read_text())
+    assert uploaded == output
+    assert uploaded["display_metadata"]["hf_id"] == "org/model"
+    with open(tmp_path / "hub" / DATASET / "commits.jsonl") as f:
+        commits = [json.loads(line) for line in f]
+    assert [commit["files"] for commit in commits] == [[report_path.name]]
+    assert commits[0]["create_pr"]
+    assert len(spool.items("done")) == 1
+    assert not spool.items("pending") and not spool.items("inflight")
+
+
+def test_submit_leaves_other_submissions_pending(tmp_path, report_path, prompts):
+    spool = SubmissionSpool(tmp_path / "spool")
+    other = enqueue(spool, "other.json")
+    submit(report_path, DATASET, spool=spool, api=LocalRepoClient(tmp_path / "hub"))
+    assert [item["id"] for item in spool.items("pending")] == [other]
+    assert [item["path_in_repo"] for item in spool.items("done")] == [report_path.name]
+
+
+def test_submit_keeps_failed_upload(tmp_path, report_path, prompts, monkeypatch):
+    # Don't wait between attempts
+    monkeypatch.setattr(spool_module.random, "uniform", lambda a, b: 0.0)
+    spool = SubmissionSpool(tmp_path / "spool")
+    api = FailingClient(tmp_path / "hub", failures=DEFAULT_MAX_ATTEMPTS)
+    with pytest.raises(SystemExit) as excinfo:
+        submit(report_path, DATASET, spool=spool, api=api)
+    assert excinfo.value.code == 1
+    assert api.calls == DEFAULT_MAX_ATTEMPTS
+    (item,) = spool.items("failed")
+    assert len(item["attempts"]) == DEFAULT_MAX_ATTEMPTS
+    assert not (tmp_path / "hub").exists()
+
+
+def test_drain_backs_off_exponentially(tmp_path):
+    spool = SubmissionSpool(tmp_path / "spool")
+    item_id = enqueue(spool)
+    api = FailingClient(tmp_path / "hub", failures=10)
+    delays = []
+    (outcome,) = spool.drain(
+        api=api, max_attempts=4, base_delay=1.0, max_delay=3.0, sleep=delays.append
+    )
+
+    assert api.calls == 4
+    # Jittered delays of 1, 2 and then 4 seconds capped at 3
+    assert len(delays) == 3
+    for delay, expected in zip(delays, [1.0, 2.0, 3.0]):
+        assert expected / 2 <= delay <= expected
+    assert outcome.state == "failed" and outcome.attempts == 4
+    assert outcome.error == "ConnectionError: 503 Service Unavailable"
+    (item,) = spool.items("failed")
+    assert item["id"] == item_id
+    assert not any(attempt["ok"] for attempt in item["attempts"])
+
+
+def test_drain_retries_until_upload_succeeds(tmp_path):
+    spool = SubmissionSpool(tmp_path / "spool")
+    enqueue(spool)
+    api = FailingClient(tmp_path / "hub", failures=2)
+    (outcome,) = spool.drain(api=api, sleep=lambda delay: None)
+    assert outcome.state == "done" and outcome.attempts == 3
+    assert outcome.url == str(tmp_path / "hub" / DATASET)
+    assert (tmp_path / "hub" / DATASET / "scores.json").exists()
+
+
+def test_retry_failed_gives_a_fresh_budget(tmp_path):
+    spool = SubmissionSpool(tmp_path / "spool")
+    enqueue(spool)
+    spool.drain(
+        api=FailingClient(tmp_path / "hub", failures=10),
+        max_attempts=2,
+        sleep=lambda delay: None,
+    )
+    assert spool.retry_failed() == 1
+    (outcome,) = spool.drain(
+        api=LocalRepoClient(tmp_path / "hub"), max_attempts=2, sleep=lambda delay: None
+    )
+    assert outcome.state == "done" and outcome.attempts == 3
+
+
+def test_recover_items_of_dead_processes(tmp_path):
+    spool = SubmissionSpool(tmp_path / "spool")
+    item_id = enqueue(spool)
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    pending = spool.root / "pending" / f"{item_id}.json"
+    pending.rename(spool.root / "inflight" / f"{item_id}.{process.pid}.json")
+    assert spool.recover() == 1
+    assert pending.exists()
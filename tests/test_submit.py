@@ -0,0 +1,123 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from filbench_eval.submit import (
+    LocalRepoClient,
+    prepare_submissions,
+    read_submission_manifest,
+    submit_batch,
+)
+
+DATASET = "org/submissions"
+METADATA = "hf_id,contact,multilinguality,model_type,num_params"
+
+
+def write_report(path: Path, score: float = 50.0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {"filbench_score": score, "category_scores": {}, "results": {}}
+    path.write_text(json.dumps(report))
+
+
+def write_manifest(tmp_path: Path, rows: list[str]) -> Path:
+    path = tmp_path / "submissions.csv"
+    path.write_text("\n".join([f"json_path,{METADATA}", *rows]) + "\n")
+    return path
+
+
+def errors(tmp_path: Path, rows: list[str]) -> list[list[str]]:
+    entries = read_submission_manifest(write_manifest(tmp_path, rows))
+    return [submission.errors for submission in prepare_submissions(entries)]
+
+
+def test_submit_batch_pushes_one_commit(tmp_path):
+    write_report(tmp_path / "a.json", 50.0)
+    write_report(tmp_path / "nested" / "b.json", 60.0)
+    manifest = write_manifest(
+        tmp_path,
+        [
+            "a.json,org/a,me@example.com,Multilingual,SFT,7",
+            "nested/b.json,org/b,me@example.com,Monolingual,Base,0.5",
+        ],
+    )
+    submissions = prepare_submissions(read_submission_manifest(manifest))
+    assert [submission.errors for submission in submissions] == [[], []]
+
+    submit_batch(submissions, DATASET, api=LocalRepoClient(tmp_path / "hub"))
+    repo_dir = tmp_path / "hub" / DATASET
+    with open(repo_dir / "commits.jsonl") as f:
+        (commit,) = [json.loads(line) for line in f]
+    assert commit["files"] == ["a.json", "b.json"] and commit["create_pr"]
+    uploaded = json.loads((repo_dir / "b.json").read_text())
+    assert uploaded["display_metadata"]["num_params"] == 0.5
+    # Reports are written back with their metadata, like `submit` does
+    assert json.loads((tmp_path / "nested" / "b.json").read_text()) == uploaded
+
+
+def test_submit_batch_dry_run_pushes_nothing(tmp_path):
+    write_report(tmp_path / "a.json")
+    manifest = write_manifest(
+        tmp_path, ["a.json,org/a,me@example.com,Multilingual,SFT,7"]
+    )
+    submissions = prepare_submissions(read_submission_manifest(manifest))
+    api = LocalRepoClient(tmp_path / "hub")
+    assert submit_batch(submissions, DATASET, api=api, dry_run=True) is None
+    assert not (tmp_path / "hub").exists()
+    assert "display_metadata" in json.loads((tmp_path / "a.json").read_text())
+
+
+@pytest.mark.parametrize(
+    "content,error",
+    [
+        (b"[1, 2]", "report must be a JSON object, not list"),
+        (b"null", "report must be a JSON object, not NoneType"),
+        (b"\xff\xfe", "invalid JSON"),
+        (b"{", "invalid JSON"),
+        (b'{"results": {}}', "report is missing filbench_score, category_scores"),
+        (b"{}", "report is missing"),
+    ],
+)
+def test_invalid_reports(tmp_path, content, error):
+    (tmp_path / "report.json").write_bytes(content)
+    (report_errors,) = errors(
+        tmp_path, ["report.json,org/a,me@example.com,Multilingual,SFT,7"]
+    )
+    assert len(report_errors) == 1 and report_errors[0].startswith(error)
+
+
+def test_invalid_metadata(tmp_path):
+    write_report(tmp_path / "a.json")
+    write_report(tmp_path / "other" / "a.json")
+    assert errors(
+        tmp_path,
+        [
+            "a.json,org/a,,Bilingual,SFT,seven",
+            "other/a.json,org/b,me@example.com,Multilingual,SFT,7",
+            "missing.json,org/c,me@example.com,Multilingual,SFT,7",
+        ],
+    ) == [
+        [
+            "missing contact",
+            f"multilinguality must be one of {['Multilingual', 'SEA-Specific', 'Monolingual']}",
+            "num_params is not a number: seven",
+        ],
+        [f"same file name as {tmp_path / 'a.json'}"],
+        [f"{tmp_path / 'missing.json'} does not exist"],
+    ]
+
+
+def test_submit_batch_refuses_invalid_submissions(tmp_path):
+    manifest = write_manifest(
+        tmp_path, ["missing.json,org/a,me@example.com,Multilingual,SFT,7"]
+    )
+    submissions = prepare_submissions(read_submission_manifest(manifest))
+    with pytest.raises(ValueError):
+        submit_batch(submissions, DATASET, api=LocalRepoClient(tmp_path / "hub"))
+
+
+def test_local_repo_client_creates_the_repository(tmp_path):
+    api = LocalRepoClient(tmp_path / "hub")
+    commit = api.create_commit(DATASET, [], commit_message="Empty commit")
+    assert commit.commit_url == str(tmp_path / "hub" / DATASET)
+    assert (tmp_path / "hub" / DATASET / "commits.jsonl").exists()
@@ -0,0 +1,44 @@
+import json
+import random
+
+from filbench_eval.compute_score import build_report, merge_runs
+from filbench_eval.fetch import HubFetcher
+from filbench_eval.watch import Watcher
+
+DATASET = "org/details_model"
+
+
+def test_watch_hub_dataset(tmp_path, mock_hub):
+    hub, rng = mock_hub, random.Random(0)
+    hub.add_run(rng, DATASET, 0)
+    fetcher = HubFetcher(endpoint=hub.endpoint, cache_dir=tmp_path / "fetch")
+    watcher = Watcher([DATASET], tmp_path / "watch", fetcher=fetcher)
+
+    (result,) = watcher.poll()
+    assert result.error is None and result.new_runs == 1
+    report = json.loads(result.report_path.read_text())
+    assert (
+        report["filbench_score"]
+        == build_report(merge_runs(hub.runs[DATASET]))["filbench_score"]
+    )
+    # Nothing changed, so nothing is rescored
+    assert watcher.poll() == []
+
+    hub.add_run(rng, DATASET, 1)
+    hub.add_run(rng, DATASET, 2)
+    (result,) = watcher.poll()
+    assert result.new_runs == 2
+    report = json.loads(result.report_path.read_text())
+    assert report["results"] == merge_runs(hub.runs[DATASET])["results"]
+    with open(watcher.leaderboard_path) as f:
+        assert len(f.readlines()) == 2
+
+    # A new watcher picks up where the last one stopped
+    assert Watcher([DATASET], tmp_path / "watch", fetcher=fetcher).poll() == []
+
+
+def test_watch_reports_unreachable_datasets(tmp_path, mock_hub):
+    fetcher = HubFetcher(endpoint=mock_hub.endpoint, cache_dir=tmp_path, retries=0)
+    (result,) = Watcher(["org/missing"], tmp_path / "watch", fetcher=fetcher).poll()
+    assert result.error.startswith("FileNotFoundError")
+    assert not (tmp_path / "watch" / "leaderboard.csv").exists()